@@ -1,19 +1,45 @@
 
 from pathlib import Path
+from typing import List
 import sys
+import tempfile
+import binascii
+import contextlib
+import csv
+import io
+import os
 import json
+import time
 import typer
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
+from rich.live import Live
+from rich.progress import BarColumn, DownloadColumn, Progress, TextColumn
+from rich.text import Text
 from rich import box
 
 from devutils.modules.qr import generate_qr, ascii_qr
-from devutils.modules.ping import http_ping
-from devutils.modules.base64util import b64_encode, b64_decode
-from devutils.modules.duplicates import find_duplicates
+from devutils.modules.histogram import histogram_rows
+from devutils.modules.httpclient import METHODS, PHASES
+from devutils.modules.loadgen import load_test, parse_duration, parse_rate, stub_server
+from devutils.modules.metrics import PingMetrics, parse_listen, serve_metrics
+from devutils.modules.monitor import monitor, replay_stats
+from devutils.modules.ping import http_ping, load_targets, ping_many
+from devutils.modules.base64util import CODECS, bench_b64, decode_file, decode_stream, encode_file, encode_stream
+from devutils.modules.chunks import HAVE_NUMPY, analyze_chunks
+from devutils.modules.dedupe import ACTIONS, dedupe_group
+from devutils.modules.dupewatch import DuplicateIndex, watch_duplicates
+from devutils.modules.duplicates import HASHERS, READERS, bench_hashers, bench_readers, iter_duplicates
+from devutils.modules.hashcache import HashCache, default_cache_path
+from devutils.modules.imagehash import PHASHES, find_similar_images
+from devutils.modules.inventory import bench_inventory
+from devutils.modules.shards import export_shard, merge_shards
+from devutils.modules.walker import PRUNE_DIRS
 
 app = typer.Typer(add_completion=False, no_args_is_help=True, help="DevUtils CLI")
+bench_app = typer.Typer(no_args_is_help=True, help="Замеры производительности")
+app.add_typer(bench_app, name="bench")
 console = Console()
 
 
@@ -36,14 +62,97 @@ def qr(
     console.print(f"[bold green]Saved:[/bold green] {path}")
 
 
+# больше замеров — без таблицы по сэмплам и без хранения сэмплов: только гистограмма
+SAMPLE_ROWS = 100
+
+
+def _ascii_hist(hist: dict, width: int = 40):
+    rows = histogram_rows([tuple(b) for b in hist["buckets"]], n=min(12, hist["count"]))
+    peak = max((c for _, _, c in rows), default=0)
+    for low, high, c in rows:
+        bar = "█" * round(c * width / peak) if peak else ""
+        console.print(f"{low:9.2f} – {high:9.2f} ms │ [cyan]{bar}[/cyan] {c}", highlight=False)
+
+
+def _latency_line(stats: dict) -> str:
+    return (
+        f"p50={stats['p50_ms']:.1f} p90={stats['p90_ms']:.1f} p99={stats['p99_ms']:.1f} p99.9={stats['p999_ms']:.1f}"
+        f" stddev={stats['stddev_ms']:.1f} jitter={stats['jitter_ms']:.1f}"
+    )
+
+
 @app.command()
 def ping(
-    url: str = typer.Argument(..., help="URL"),
+    urls: List[str] = typer.Argument(None, help="URL (можно несколько)"),
     count: int = typer.Option(4, "-c", help="Количество запросов"),
     timeout: float = typer.Option(3.0, "-w", help="Таймаут, сек"),
     json_output: bool = typer.Option(False, "--json", help="Вывод JSON"),
+    targets_file: Path = typer.Option(None, "--file", "-f", exists=True, dir_okay=False, help="Файл с URL, по одному в строке"),
+    concurrency: int = typer.Option(100, "--concurrency", help="Для многих URL: одновременных запросов всего"),
+    per_host: int = typer.Option(6, "--per-host", help="Для многих URL: одновременных запросов к одному хосту"),
+    keepalive: bool = typer.Option(False, "--keepalive", help="Держать соединение между запросами (чистый TTFB без рукопожатий)"),
+    method: str = typer.Option("GET", "--method", "-m", help=f"{'|'.join(METHODS)}: GET читает тело потоком и выбрасывает"),
+    rate: str = typer.Option(None, "--rate", help="Нагрузка с постоянной частотой, напр. 500/s (открытый цикл)"),
+    duration: str = typer.Option("10s", "--duration", help="Для --rate: длительность, напр. 60s, 5m"),
+    workers: int = typer.Option(64, "--workers", help="Для --rate: одновременных запросов"),
+    monitor_mode: bool = typer.Option(False, "--monitor", help="Опрашивать цели непрерывно (до Ctrl+C)"),
+    interval: str = typer.Option("1s", "--interval", help="Для --monitor: период опроса каждой цели"),
+    window: str = typer.Option("60s", "--window", help="Для --monitor: окно скользящей статистики"),
+    jitter: float = typer.Option(0.1, "--jitter", help="Для --monitor: разброс периода, доля (0..1)"),
+    log_path: Path = typer.Option(None, "--log", dir_okay=False, help="Для --monitor: дописываемый журнал замеров"),
+    replay: Path = typer.Option(None, "--replay", exists=True, dir_okay=False, help="Статистика по журналу --log"),
+    serve_metrics_at: str = typer.Option(None, "--serve-metrics", help="Экспортер Prometheus/OpenMetrics, напр. :9100 (включает --monitor)"),
 ):
-    results = http_ping(url, count=count, timeout=timeout)
+    method = method.upper()
+    if method not in METHODS:
+        raise typer.BadParameter(f"method: {'|'.join(METHODS)}")
+    if replay is not None:
+        try:
+            results = replay_stats(replay)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+        if json_output:
+            console.print_json(data=results)
+        else:
+            console.print(_monitor_table(results, f"Журнал {replay.name}"))
+        raise typer.Exit()
+    targets = load_targets(urls or (), targets_file)
+    if not targets:
+        raise typer.BadParameter("Укажите URL или --file")
+    if rate is not None:
+        if len(targets) > 1:
+            raise typer.BadParameter("--rate: нужен один URL")
+        try:
+            rps, seconds = parse_rate(rate), parse_duration(duration)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+        try:
+            results = load_test(targets[0], rps, seconds, workers=workers, timeout=timeout, keepalive=keepalive, method=method)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+        if json_output:
+            console.print_json(data=results)
+        else:
+            _show_load(targets[0], results)
+        raise typer.Exit()
+    if monitor_mode or serve_metrics_at:
+        try:
+            period, span = parse_duration(interval), parse_duration(window)
+            listen = parse_listen(serve_metrics_at) if serve_metrics_at else None
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+        _monitor(targets, period, span, jitter, timeout, method, keepalive, concurrency, log_path, listen)
+        raise typer.Exit()
+    if len(targets) > 1:
+        _ping_many(targets, count, timeout, concurrency, per_host, json_output, keepalive, method)
+        raise typer.Exit()
+    url = targets[0]
+    try:
+        results = http_ping(
+            url, count=count, timeout=timeout, keepalive=keepalive, method=method, keep_samples=count <= SAMPLE_ROWS,
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
     if json_output:
         console.print_json(data=results)
         raise typer.Exit()
@@ -52,84 +161,593 @@ def ping(
     table.add_column("#")
     table.add_column("Status")
     table.add_column("Time, ms")
+    for phase in PHASES:
+        table.add_column(phase, justify="right")
     for i, r in enumerate(results["samples"], 1):
         st = str(r.get("status", "-"))
         ms = f"{r.get('ms', 0):.1f}"
         color = "green" if r.get("ok") else "red"
-        table.add_row(str(i), f"[{color}]{st}[/{color}]", ms)
-    console.print(table)
+        phases = [f"{r[f'{p}_ms']:.1f}" for p in PHASES]
+        if r["reused"]:
+            phases[:3] = ["[dim]keep-alive[/dim]", "", ""]
+        table.add_row(str(i), f"[{color}]{st}[/{color}]", ms, *phases)
+    if results["samples"]:
+        console.print(table)
+    _ascii_hist(results["histogram"])
 
     stats = results["stats"]
     panel = Panel.fit(
         f"sent={stats['sent']} received={stats['received']} loss={stats['loss']:.0%}\n"
-        f"min={stats['min_ms']:.1f} avg={stats['avg_ms']:.1f} max={stats['max_ms']:.1f}",
+        f"min={stats['min_ms']:.1f} avg={stats['avg_ms']:.1f} max={stats['max_ms']:.1f}\n"
+        f"{_latency_line(stats)}\n"
+        + " ".join(f"{p}={stats[f'avg_{p}_ms']:.1f}" for p in PHASES) + " (avg)",
         title="Summary",
     )
     console.print(panel)
 
 
+def _ping_many(targets, count, timeout, concurrency, per_host, json_output, keepalive, method):
+    try:
+        results = ping_many(
+            targets, count=count, timeout=timeout, concurrency=concurrency, per_host=per_host,
+            keepalive=keepalive, method=method, keep_samples=count <= SAMPLE_ROWS,
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    if json_output:
+        console.print_json(data=results)
+        return
+    table = Table(title=f"HTTP ping: {len(targets)} целей", box=box.SIMPLE)
+    table.add_column("URL")
+    table.add_column("Status")
+    table.add_column("Loss", justify="right")
+    table.add_column("min", justify="right")
+    table.add_column("avg", justify="right")
+    table.add_column("p99", justify="right")
+    table.add_column("max", justify="right")
+    table.add_column("ttfb", justify="right")
+    down = 0
+    for url, res in results.items():
+        stats = res["stats"]
+        last = res["samples"][-1]["status"] if res["samples"] else None
+        color = "green" if stats["received"] == stats["sent"] else "yellow" if stats["received"] else "red"
+        down += not stats["received"]
+        table.add_row(
+            Text(url), f"[{color}]{last if last is not None else '-'}[/{color}]", f"{stats['loss']:.0%}",
+            f"{stats['min_ms']:.1f}", f"{stats['avg_ms']:.1f}", f"{stats['p99_ms']:.1f}", f"{stats['max_ms']:.1f}",
+            f"{stats['avg_ttfb_ms']:.1f}",
+        )
+    console.print(table)
+    console.print(Panel.fit(f"целей={len(targets)} доступны={len(targets) - down} недоступны={down}", title="Summary"))
+
+
+def _monitor_table(results: dict, title: str) -> Table:
+    table = Table(title=title, box=box.SIMPLE)
+    table.add_column("URL")
+    table.add_column("Status")
+    table.add_column("Up", justify="right")
+    table.add_column("n", justify="right")
+    table.add_column("avg", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p99", justify="right")
+    table.add_column("max", justify="right")
+    for url, stats in results.items():
+        up = 1 - stats["loss"]
+        color = "green" if up == 1 else "yellow" if up else "red"
+        last = stats.get("last_status")
+        table.add_row(
+            Text(url), "-" if not last else str(last), f"[{color}]{up:.1%}[/{color}]", str(stats["sent"]),
+            f"{stats['avg_ms']:.1f}", f"{stats['p50_ms']:.1f}", f"{stats['p99_ms']:.1f}", f"{stats['max_ms']:.1f}",
+        )
+    return table
+
+
+def _monitor(targets, interval, window, jitter, timeout, method, keepalive, concurrency, log_path, listen=None):
+    seen = {}
+    metrics = PingMetrics()
+    server = None
+    if listen is not None:
+        try:
+            server = serve_metrics(metrics, *listen)
+        except OSError as e:
+            raise typer.BadParameter(f"--serve-metrics: {e}")
+        console.print(f"[bold]Метрики:[/bold] http://{listen[0]}:{listen[1]}/metrics")
+
+    def on_sample(target, sample):
+        seen.setdefault(target.url, target)
+        metrics.observe(target.url, sample[1], sample[2])
+
+    def render():
+        # таблица строится в потоке Live из кольцевых буферов — без копий истории
+        stats = {url: seen[url].stats(window) for url in targets if url in seen}
+        return _monitor_table(stats, f"Мониторинг: {len(targets)} целей, окно {window:g} с")
+
+    try:
+        with Live(get_renderable=render, console=console, refresh_per_second=2):
+            monitor(
+                targets, interval=interval, window=window, jitter=jitter, timeout=timeout, method=method,
+                keepalive=keepalive, concurrency=concurrency, log_path=log_path,
+                on_sample=on_sample,
+            )
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+def _show_load(url: str, res: dict):
+    _ascii_hist(res["histogram"])
+    lat, svc = res["latency"], res["service"]
+    statuses = " ".join(f"{k}={v}" for k, v in sorted(res["statuses"].items()))
+    color = "green" if res["achieved_rps"] >= res["target_rps"] * 0.95 else "yellow"
+    console.print(Panel.fit(
+        f"target={res['target_rps']:.1f}/s achieved=[{color}]{res['achieved_rps']:.1f}/s[/{color}]"
+        f" за {res['duration_s']:.1f} с, backlog max={res['backlog_max']}\n"
+        f"sent={res['sent']} received={res['received']} loss={res['loss']:.0%} {statuses}\n"
+        f"от плана:  min={lat['min_ms']:.1f} avg={lat['avg_ms']:.1f} max={lat['max_ms']:.1f} {_latency_line(lat)}\n"
+        f"от отправки: min={svc['min_ms']:.1f} avg={svc['avg_ms']:.1f} max={svc['max_ms']:.1f} {_latency_line(svc)}",
+        title=Text(f"Load {url}"),
+    ))
+
+
 @app.command("b64")
 def b64(
     mode: str = typer.Argument(..., help="encode|decode"),
     input_path: Path = typer.Option(None, "--in", help="Входной файл"),
     output_path: Path = typer.Option(None, "--out", help="Выходной файл"),
     text: str = typer.Option(None, "--text", help="Текстовый ввод"),
+    jobs: int = typer.Option(1, "--jobs", "-j", help="Процессов (0 — все ядра); больше 1 — только с --in и --out"),
+    codec: str = typer.Option("b64", "--codec", "-c", help=f"{'|'.join(CODECS)}"),
 ):
     mode = mode.lower()
     if mode not in {"encode", "decode"}:
         raise typer.BadParameter("mode: encode|decode")
+    codec = codec.lower()
+    if codec not in CODECS:
+        raise typer.BadParameter(f"codec: {'|'.join(CODECS)}")
+    if jobs != 1:
+        if not input_path or not output_path or text is not None:
+            raise typer.BadParameter("--jobs: нужны --in и --out (файлы, не поток)")
+        try:
+            (encode_file if mode == "encode" else decode_file)(input_path, output_path, jobs=jobs or None, codec=codec)
+        except (binascii.Error, ValueError) as e:
+            raise typer.BadParameter(f"decode: {e}")
+        console.print(f"[green]Saved:[/green] {output_path}")
+        raise typer.Exit()
 
-    data: bytes
-    if input_path:
-        data = input_path.read_bytes()
-    elif text is not None:
-        data = text.encode()
-    else:
-        data = sys.stdin.buffer.read()
-
-    if mode == "encode":
-        out = b64_encode(data)
-    else:
-        out = b64_decode(data)
+    stream = encode_stream if mode == "encode" else decode_stream
+    # файл или stdin -> файл или stdout потоком, фиксированным буфером: память не зависит от размера
+    with contextlib.ExitStack() as stack:
+        if text is not None:
+            src = io.BytesIO(text.encode())
+        elif input_path:
+            src = stack.enter_context(input_path.open("rb"))
+        else:
+            src = sys.stdin.buffer
+        dst = stack.enter_context(output_path.open("wb")) if output_path else sys.stdout.buffer
+        try:
+            stream(src, dst, codec=codec)
+        except (binascii.Error, ValueError) as e:
+            # ошибка видна только по ходу потока: недописанный файл не оставляем
+            if output_path:
+                output_path.unlink(missing_ok=True)
+            raise typer.BadParameter(f"decode: {e}")
+        dst.flush()
 
     if output_path:
-        output_path.write_bytes(out)
         console.print(f"[green]Saved:[/green] {output_path}")
-    else:
-        sys.stdout.buffer.write(out)
+
+
+FORMATS = ("text", "ndjson", "csv", "json")
+
+
+class _GroupWriter:
+    """Группы прямо в stdout по мере нахождения, без Rich: одна запись на группу (в csv — строка на файл)."""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.out = sys.stdout
+        # имена не в UTF-8 уходят в csv как есть, байтами
+        self.out.reconfigure(errors="surrogateescape")
+        self.first = True
+        if fmt == "csv":
+            self.csv = csv.writer(self.out, lineterminator="\n")
+            self.csv.writerow(("group", "size", "path"))
+        elif fmt == "json":
+            self.out.write("[")
+
+    def write(self, n: int, g, reclaimed=None) -> None:
+        if self.fmt == "csv":
+            self.csv.writerows((n, size, str(p)) for p, size in g)
+        else:
+            rec = {"group": n, "size": g[0][1], "paths": [str(p) for p, _ in g]}
+            if reclaimed is not None:
+                rec["reclaimed"] = reclaimed
+            line = json.dumps(rec)
+            if self.fmt == "json":
+                line = ("\n" if self.first else ",\n") + line
+            else:
+                line += "\n"
+            self.out.write(line)
+        self.first = False
+        self.out.flush()
+
+    def close(self) -> None:
+        if self.fmt == "json":
+            self.out.write("]\n" if self.first else "\n]\n")
+        self.out.flush()
+
+
+def _show_group(n: int, g, action: str, writer=None):
+    if writer is None:
+        console.print(f"[bold cyan]Группа {n}[/bold cyan]  [dim]{g[0][1]} байт[/dim]")
+        for p, _ in g:
+            console.print(f"  {p}", markup=False, highlight=False)
+    freed, errors = dedupe_group(g, action)
+    if writer is not None:
+        writer.write(n, g, None if action == "report" else freed)
+        for p, e in errors:
+            print(f"! {p}: {e.strerror or e}", file=sys.stderr)
+        return freed, len(errors)
+    for p, e in errors:
+        console.print(f"  [red]![/red] {p}: {e.strerror or e}", highlight=False)
+    return freed, len(errors)
+
+
+def _scan_bar(out: Console, enabled: bool) -> Progress:
+    return Progress(
+        TextColumn("{task.description}"), BarColumn(), DownloadColumn(),
+        TextColumn("{task.fields[rate]}"), TextColumn("ETA {task.fields[eta]}"),
+        console=out, transient=True, disable=not enabled,
+    )
+
+
+def _update_bar(bar: Progress, p) -> None:
+    if not bar.tasks:
+        bar.add_task("", total=None, rate="", eta="—")
+    task = bar.tasks[0].id
+    if p.stage == "walk":
+        bar.update(task, description=f"обход: {p.files_walked} файлов")
+        return
+    eta = p.eta
+    bar.update(
+        task, description=p.stage, total=p.bytes_total, completed=p.bytes_done,
+        rate=f"{p.gbps:.2f} GB/s", eta="—" if eta is None else time.strftime("%H:%M:%S", time.gmtime(eta)),
+    )
+
+
+def _watch_dupes(
+    path, min_size, algo, action, cache, exclude, skip_hidden, one_fs, prune, interval, poll,
+    workers, pool, chunk, reader, fadvise, verify, writer=None,
+):
+    index = DuplicateIndex(
+        path, min_size, algo, cache, exclude, skip_hidden, one_fs, prune,
+        chunk=chunk, reader=reader, fadvise=fadvise, verify=verify,
+    )
+    n = 0
+    try:
+        for n, g in enumerate(index.build(workers, pool), 1):
+            _show_group(n, g, action, writer)
+            if action != "report":
+                # за деревом ещё не следим: изменения от действия вносим в индекс сами
+                for p, _ in g:
+                    index.update(str(p))
+        if writer is None:
+            console.print(f"[dim]Групп: {n}. Слежу за изменениями, Ctrl+C — выход[/dim]")
+        for g in watch_duplicates(index, interval=interval, poll=poll):
+            n += 1
+            _show_group(n, g, action, writer)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.close()
+        if writer is not None:
+            writer.close()
 
 
 @app.command()
 def dupes(
     path: Path = typer.Argument(..., exists=True, file_okay=False, dir_okay=True),
     min_size: int = typer.Option(1, help="Мин. размер файла, байт"),
-    algo: str = typer.Option("md5", help="Хеш: md5|sha1|sha256"),
-    delete: bool = typer.Option(False, help="Удалить дубли кроме первого"),
+    algo: str = typer.Option("md5", help=f"Хеш: {'|'.join(HASHERS)}"),
+    delete: bool = typer.Option(False, help="Удалить дубли кроме первого (= --action delete)"),
+    action: str = typer.Option("report", help=f"Что делать с дублями: {'|'.join(ACTIONS)}"),
+    workers: int = typer.Option(1, "--workers", "-j", help="Потоков/процессов для хеширования"),
+    pool: str = typer.Option(None, help="Пул: thread (I/O) | process (CPU); по умолчанию thread, для --chunks — process"),
+    cache_path: Path = typer.Option(default_cache_path(), "--cache", help="SQLite-кеш хешей"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Не использовать кеш хешей"),
+    exclude: List[str] = typer.Option([], "--exclude", "-x", help="Glob-шаблон для исключения (можно несколько)"),
+    skip_hidden: bool = typer.Option(False, "--skip-hidden", help="Пропускать скрытые файлы и каталоги"),
+    one_fs: bool = typer.Option(False, "--one-fs", help="Не выходить за пределы файловой системы"),
+    all_dirs: bool = typer.Option(False, "--all-dirs", help="Заходить в .git, node_modules и т.п."),
+    chunk_kb: int = typer.Option(1024, "--chunk", help="Размер блока чтения, КБ"),
+    reader: str = typer.Option("readinto", help=f"Чтение: {'|'.join(READERS)}"),
+    fadvise: bool = typer.Option(True, "--fadvise/--no-fadvise", help="posix_fadvise: не засорять page cache"),
+    verify: bool = typer.Option(False, "--verify", help="Побайтовое сравнение вместо полного хеша"),
+    show_progress: bool = typer.Option(True, "--progress/--no-progress", help="Прогресс-бар (в stderr для --format)"),
+    stats_json: Path = typer.Option(None, "--stats-json", help="Записать сводку прогона (этапы, тайминги, GB/s) в JSON; только обычный скан"),
+    watch: bool = typer.Option(False, "--watch", help="Следить за каталогом и сообщать о новых дублях"),
+    poll: bool = typer.Option(False, "--poll", help="Для --watch: опрос вместо inotify"),
+    interval: float = typer.Option(2.0, help="Для --watch: период опроса, сек"),
+    export: Path = typer.Option(None, "--export", help="Записать шард-индекс (gzip) для dupes-merge"),
+    host: str = typer.Option(None, help="Для --export: имя хоста в шарде"),
+    chunks: bool = typer.Option(False, "--chunks", help="Общие куски между файлами (content-defined chunking)"),
+    top: int = typer.Option(10, help="Для --chunks: сколько пар файлов показать"),
+    fmt: str = typer.Option("text", "--format", help=f"Вывод: {'|'.join(FORMATS)} (не text — потоком в stdout)"),
+    similar: str = typer.Option(None, "--similar", help=f"Похожие изображения по перцептивному хешу: {'|'.join(PHASHES)}"),
+    distance: int = typer.Option(6, help="Для --similar: макс. расстояние Хэмминга (из 64 бит)"),
 ):
-    groups = find_duplicates(path, min_size=min_size, algo=algo)
-    if not groups:
+    if pool not in {None, "thread", "process"}:
+        raise typer.BadParameter("pool: thread|process")
+    if algo.lower() not in HASHERS:
+        raise typer.BadParameter(f"algo: {'|'.join(HASHERS)}")
+    if reader not in READERS:
+        raise typer.BadParameter(f"reader: {'|'.join(READERS)}")
+    if delete:
+        action = "delete"
+    if action not in ACTIONS:
+        raise typer.BadParameter(f"action: {'|'.join(ACTIONS)}")
+    if fmt not in FORMATS:
+        raise typer.BadParameter(f"format: {'|'.join(FORMATS)}")
+    if stats_json and (watch or export or chunks or similar):
+        raise typer.BadParameter("--stats-json: только для обычного скана, без --watch, --export, --chunks, --similar")
+    prune = () if all_dirs else PRUNE_DIRS
+    chunk_pool, pool = pool or "process", pool or "thread"
+    if chunks:
+        # разбиение на куски без numpy — цикл на Python под GIL: потоки его не ускорят
+        _show_chunks(path, min_size, workers, chunk_pool, exclude, skip_hidden, one_fs, prune, top)
+        raise typer.Exit()
+    if similar:
+        _show_similar(path, similar, distance, min_size, action, workers, exclude, skip_hidden, one_fs, prune, fmt)
+        raise typer.Exit()
+    # кеш хешей нужен только скану, --watch и --export: для остальных режимов файлы базы не создаём
+    cache = None if no_cache else HashCache(cache_path)
+    if watch:
+        _watch_dupes(
+            path, min_size, algo, action, cache, exclude, skip_hidden, one_fs, prune, interval, poll,
+            workers, pool, chunk_kb * 1024, reader, fadvise, verify, None if fmt == "text" else _GroupWriter(fmt),
+        )
+        raise typer.Exit()
+    if export:
+        try:
+            n = export_shard(
+                path, export, min_size=min_size, algo=algo, workers=workers, pool=pool, cache=cache,
+                exclude=exclude, skip_hidden=skip_hidden, one_filesystem=one_fs, prune=prune, host=host,
+            )
+        finally:
+            if cache is not None:
+                cache.close()
+        console.print(f"[green]Шард:[/green] {export} ({n} файлов)")
+        raise typer.Exit()
+
+    stats = {}
+    found = 0
+    reclaimable = reclaimed = failed = 0
+    writer = None if fmt == "text" else _GroupWriter(fmt)
+    last = {}
+    bar = _scan_bar(console if writer is None else Console(stderr=True), show_progress)
+
+    def on_progress(p):
+        last["progress"] = p
+        _update_bar(bar, p)
+
+    try:
+        groups = iter_duplicates(
+            path, min_size=min_size, algo=algo, workers=workers, pool=pool, stats=stats, cache=cache,
+            exclude=exclude, skip_hidden=skip_hidden, one_filesystem=one_fs, prune=prune,
+            chunk=chunk_kb * 1024, reader=reader, fadvise=fadvise, verify=verify, progress=on_progress,
+        )
+        with bar:
+            for found, g in enumerate(groups, 1):
+                freed, errors = _show_group(found, g, action, writer)
+                reclaimable += g[0][1] * (len(g) - 1)
+                reclaimed += freed
+                failed += errors
+    finally:
+        if cache is not None:
+            cache.close()
+        if writer is not None:
+            writer.close()
+    if stats_json:
+        summary = {
+            "root": str(path), "finished": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "algo": algo, "workers": workers, "pool": pool, "reader": reader, "chunk": chunk_kb * 1024,
+            "verify": verify, "stats": stats, "progress": last["progress"].as_dict(),
+        }
+        stats_json.write_text(json.dumps(summary, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    if writer is not None:
+        raise typer.Exit(1 if failed else 0)
+    console.print(Panel.fit(
+        f"files={stats['files']} groups={stats['groups']} duplicates={stats['duplicates']}\n"
+        f"отсеяно: size={stats['size_eliminated']} sample={stats['sample_eliminated']} hash={stats['hash_eliminated']}\n"
+        f"прочитано: sample={stats['bytes_sampled']} full={stats['bytes_hashed']} байт\n"
+        f"кеш: hits={stats['cache_hits']} misses={stats['cache_misses']} жёстких ссылок: {stats['hardlinked']}",
+        title="Этапы",
+    ))
+    if not found:
         console.print("[green]Дубликаты не найдены[/green]")
         raise typer.Exit()
+    if action == "report":
+        console.print(f"[yellow]Можно освободить: {reclaimable} байт[/yellow]")
+    else:
+        console.print(f"[yellow]{action}: освобождено {reclaimed} из {reclaimable} байт, ошибок: {failed}[/yellow]")
 
-    table = Table(title="Дубликаты", box=box.SIMPLE_HEAVY)
-    table.add_column("Группа")
-    table.add_column("Размер")
-    table.add_column("Файлы")
 
-    for i, g in enumerate(groups, 1):
-        size = g[0][1]
-        files = "\\n".join(str(p) for p, _ in g)
-        table.add_row(str(i), str(size), files)
+def _show_chunks(path, min_size, workers, pool, exclude, skip_hidden, one_fs, prune, top):
+    if not HAVE_NUMPY:
+        console.print(
+            "[yellow]numpy не установлен: границы кусков ищутся циклом на Python, "
+            "примерно в 6 раз медленнее (pip install 'devutils\\[fast]')[/yellow]"
+        )
+    r = analyze_chunks(
+        path, min_size=min_size, workers=workers, pool=pool, exclude=exclude,
+        skip_hidden=skip_hidden, one_filesystem=one_fs, prune=prune, top=top,
+    )
+    total = r['total_bytes'] or 1
+    console.print(Panel.fit(
+        f"files={r['files']} chunks={r['chunks']} уникальных={r['unique_chunks']}\n"
+        f"всего {r['total_bytes']} байт, уникальных {r['unique_bytes']}, "
+        f"повторяется {r['shared_bytes']} ({r['shared_bytes'] * 100 / total:.1f}%)",
+        title="Куски",
+    ))
+    if not r['pairs']:
+        console.print("[green]Общих кусков между файлами нет[/green]")
+        return
+    table = Table(title="Пары с наибольшим пересечением", box=box.SIMPLE)
+    table.add_column("Файл A")
+    table.add_column("Файл B")
+    table.add_column("Общих байт", justify="right")
+    for a, b, n in r['pairs']:
+        table.add_row(Text(a), Text(b), str(n))
     console.print(table)
 
-    if delete:
-        for g in groups:
-            for p, _ in g[1:]:
-                try:
-                    p.unlink(missing_ok=True)
-                except Exception:
-                    pass
-        console.print("[yellow]Дубли удалены[/yellow]")
+
+def _show_similar(path, method, distance, min_size, action, workers, exclude, skip_hidden, one_fs, prune, fmt="text"):
+    if method not in PHASHES:
+        raise typer.BadParameter(f"similar: {'|'.join(PHASHES)}")
+    # похожие — не одинаковые: заменять ссылками или удалять автоматически нельзя
+    if action != "report":
+        raise typer.BadParameter("--similar работает только с --action report")
+    found = 0
+    groups = find_similar_images(
+        path, method=method, distance=distance, min_size=min_size, workers=workers,
+        exclude=exclude, skip_hidden=skip_hidden, one_filesystem=one_fs, prune=prune,
+    )
+    if fmt != "text":
+        writer = _GroupWriter(fmt)
+        try:
+            for found, g in enumerate(groups, 1):
+                writer.write(found, g)
+        finally:
+            writer.close()
+        return
+    for found, g in enumerate(groups, 1):
+        console.print(f"[bold cyan]Группа {found}[/bold cyan]")
+        for p, size in g:
+            console.print(f"  {p}  ({size} байт)", markup=False, highlight=False)
+    if not found:
+        console.print("[green]Похожих изображений не найдено[/green]")
+
+
+@app.command("dupes-merge")
+def dupes_merge(
+    shards: List[Path] = typer.Argument(..., exists=True, dir_okay=False, help="Шарды от dupes --export"),
+):
+    try:
+        groups = merge_shards(shards)
+        found = 0
+        for found, g in enumerate(groups, 1):
+            console.print(f"[bold cyan]Группа {found}[/bold cyan]  [dim]{g[0][2]} байт[/dim]")
+            for host, p, _ in g:
+                console.print(f"  {host}:{p}", markup=False, highlight=False)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    if not found:
+        console.print("[green]Дубликаты не найдены[/green]")
+
+
+@bench_app.command("hash")
+def bench_hash(
+    size_mb: int = typer.Option(256, "--size", help="Объём буфера, МБ"),
+    rounds: int = typer.Option(3, help="Повторов на хешер"),
+):
+    table = Table(title="Хешеры", box=box.SIMPLE)
+    table.add_column("Алгоритм")
+    table.add_column("GB/s", justify="right")
+    results = bench_hashers(size_mb * 1024 * 1024, rounds)
+    for name, gbps in sorted(results.items(), key=lambda kv: kv[1], reverse=True):
+        table.add_row(name, f"{gbps:.2f}")
+    console.print(table)
+
+
+@bench_app.command("read")
+def bench_read(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="Файл для чтения"),
+    algo: str = typer.Option("md5", help=f"Хеш: {'|'.join(HASHERS)}"),
+    chunk_kb: int = typer.Option(1024, "--chunk", help="Размер блока чтения, КБ"),
+    rounds: int = typer.Option(3, help="Повторов на способ"),
+    cold: bool = typer.Option(False, "--cold", help="Сбрасывать page cache файла перед прогоном"),
+):
+    if algo.lower() not in HASHERS:
+        raise typer.BadParameter(f"algo: {'|'.join(HASHERS)}")
+    table = Table(title=f"Чтение {path.name}", box=box.SIMPLE)
+    table.add_column("Способ")
+    table.add_column("GB/s", justify="right")
+    results = bench_readers(path, algo, chunk_kb * 1024, rounds, cold)
+    for name, gbps in sorted(results.items(), key=lambda kv: kv[1], reverse=True):
+        table.add_row(name, f"{gbps:.2f}")
+    console.print(table)
+
+
+@bench_app.command("memory")
+def bench_memory(
+    files: int = typer.Option(1_000_000, help="Синтетических записей"),
+    per_dir: int = typer.Option(1000, help="Файлов на каталог"),
+):
+    table = Table(title="Память инвентаря", box=box.SIMPLE)
+    table.add_column("Структура")
+    table.add_column("Байт/файл", justify="right")
+    for name, per_file in bench_inventory(files, per_dir).items():
+        table.add_row(name, f"{per_file:.1f}")
+    console.print(table)
+
+
+@bench_app.command("load")
+def bench_load(
+    rate: str = typer.Option("500/s", "--rate", help="Частота запросов"),
+    duration: str = typer.Option("5s", "--duration", help="Длительность"),
+    delay_ms: float = typer.Option(0.0, "--delay-ms", help="Задержка ответа заглушки, мс"),
+    workers: int = typer.Option(64, "--workers", help="Одновременных запросов"),
+):
+    try:
+        rps, seconds = parse_rate(rate), parse_duration(duration)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    with stub_server(delay_ms / 1000) as url:
+        results = load_test(url, rps, seconds, workers=workers)
+    _show_load(url, results)
+
+
+@bench_app.command("b64")
+def bench_base64(
+    path: Path = typer.Argument(None, exists=True, dir_okay=False, help="Файл (по умолчанию — случайные данные)"),
+    size_mb: int = typer.Option(512, "--size", help="Объём случайного файла, МБ"),
+    jobs: str = typer.Option(None, "--jobs", help="Список числа процессов, напр. 1,2,4,8 (по умолчанию — степени двойки до числа ядер)"),
+    rounds: int = typer.Option(1, help="Повторов на точку"),
+    codec: str = typer.Option("b64", "--codec", help=f"{'|'.join(CODECS)}"),
+):
+    if codec.lower() not in CODECS:
+        raise typer.BadParameter(f"codec: {'|'.join(CODECS)}")
+    if jobs:
+        try:
+            counts = [int(j) for j in jobs.split(",")]
+        except ValueError:
+            raise typer.BadParameter("jobs: N,N,...")
+    else:
+        cores = os.cpu_count() or 1
+        counts = sorted({1 << k for k in range(cores.bit_length())} | {cores})
+    with tempfile.TemporaryDirectory() as tmp:
+        if path is None:
+            path = Path(tmp) / "random.bin"
+            with path.open("wb") as f:
+                for _ in range(size_mb):
+                    f.write(os.urandom(1024 * 1024))
+        size = path.stat().st_size
+        results = bench_b64(path, counts, rounds, codec.lower())
+    table = Table(title=f"{codec.lower()}, {size / 1e9:.2f} GB", box=box.SIMPLE)
+    table.add_column("Процессов", justify="right")
+    table.add_column("encode GB/s", justify="right")
+    table.add_column("decode GB/s", justify="right")
+    table.add_column("Ускорение enc/dec", justify="right")
+    enc0, dec0 = results[counts[0]]
+    for n, (enc, dec) in results.items():
+        table.add_row(str(n), f"{enc:.2f}", f"{dec:.2f}", f"×{enc / enc0:.2f} / ×{dec / dec0:.2f}")
+    console.print(table)
 
 
 if __name__ == "__main__":
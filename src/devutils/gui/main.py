@@ -1,9 +1,12 @@
+import os
 from pathlib import Path
 from PySide6 import QtWidgets, QtGui, QtCore
 from devutils.modules.qr import generate_qr
-from devutils.modules.ping import http_ping
-from devutils.modules.base64util import b64_encode, b64_decode
-from devutils.modules.duplicates import find_duplicates
+from devutils.modules.httpclient import METHODS, PHASES, check_proxies
+from devutils.modules.ping import http_ping, load_targets, ping_many
+from devutils.modules.base64util import CODECS, decode_bytes, encode_bytes
+from devutils.modules.duplicates import HASHERS, iter_duplicates
+from devutils.modules.imagehash import PHASHES, find_similar_images
 
 
 class Header(QtWidgets.QWidget):
@@ -250,7 +253,11 @@ class PingWidget(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
         self.url = QtWidgets.QLineEdit('https://example.com')
+        self.url.setPlaceholderText('Один или несколько URL через пробел')
         self.url.setMinimumHeight(36)
+        load_btn = QtWidgets.QPushButton('Из файла')
+        load_btn.setMinimumHeight(36)
+        load_btn.clicked.connect(self._load_targets)
         self.count = QtWidgets.QSpinBox()
         self.count.setRange(1, 100)
         self.count.setValue(4)
@@ -260,9 +267,14 @@ class PingWidget(QtWidgets.QWidget):
         self.timeout.setValue(3.0)
         self.timeout.setSingleStep(0.1)
         self.timeout.setMinimumHeight(36)
-
-        self.table = QtWidgets.QTableWidget(0, 3)
-        self.table.setHorizontalHeaderLabels(['#', 'Статус', 'мс'])
+        self.keepalive = QtWidgets.QCheckBox('Keep-alive')
+        self.keepalive.setToolTip('Держать соединение: после первого запроса — чистое время сервера')
+        self.method = QtWidgets.QComboBox()
+        self.method.addItems(list(METHODS))
+        self.method.setMinimumHeight(36)
+
+        self.table = QtWidgets.QTableWidget(0, 3 + len(PHASES))
+        self.table.setHorizontalHeaderLabels(['#', 'Статус', 'мс', *PHASES])
         self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
         self.table.setMinimumHeight(280)
 
@@ -278,11 +290,15 @@ class PingWidget(QtWidgets.QWidget):
         form.setHorizontalSpacing(12)
         form.setVerticalSpacing(10)
         form.addWidget(QtWidgets.QLabel('URL'), 0, 0)
-        form.addWidget(self.url, 0, 1, 1, 3)
+        form.addWidget(self.url, 0, 1, 1, 2)
+        form.addWidget(load_btn, 0, 3)
         form.addWidget(QtWidgets.QLabel('Запросов'), 1, 0)
         form.addWidget(self.count, 1, 1)
         form.addWidget(QtWidgets.QLabel('Таймаут, сек'), 1, 2)
         form.addWidget(self.timeout, 1, 3)
+        form.addWidget(QtWidgets.QLabel('Метод'), 2, 0)
+        form.addWidget(self.method, 2, 1)
+        form.addWidget(self.keepalive, 2, 2, 1, 2)
 
         layout = QtWidgets.QVBoxLayout(self)
         layout.setContentsMargins(18, 18, 18, 18)
@@ -296,18 +312,60 @@ class PingWidget(QtWidgets.QWidget):
         bottom.addWidget(run_btn)
         layout.addLayout(bottom)
 
+    def _load_targets(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, 'Файл с URL', '', 'Text (*.txt);;All (*)')
+        if path:
+            self.url.setText(' '.join(load_targets(path=Path(path))))
+
+    def _run_many(self, targets):
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(['URL', 'Получено', 'avg, мс', 'ttfb, мс'])
+        results = ping_many(
+            targets, self.count.value(), self.timeout.value(),
+            keepalive=self.keepalive.isChecked(), method=self.method.currentText(),
+        )
+        down = 0
+        for i, (url, res) in enumerate(results.items()):
+            stats = res['stats']
+            down += not stats['received']
+            self.table.insertRow(i)
+            self.table.setItem(i, 0, QtWidgets.QTableWidgetItem(url))
+            self.table.setItem(i, 1, QtWidgets.QTableWidgetItem(f"{stats['received']}/{stats['sent']}"))
+            self.table.setItem(i, 2, QtWidgets.QTableWidgetItem(f"{stats['avg_ms']:.1f}"))
+            self.table.setItem(i, 3, QtWidgets.QTableWidgetItem(f"{stats['avg_ttfb_ms']:.1f}"))
+        self.summary.setText(f"Целей: {len(targets)} • Доступны: {len(targets) - down} • Недоступны: {down}")
+        QtWidgets.QApplication.instance().activeWindow().statusBar().showMessage('Пинг выполнен', 3000)
+
     def _run(self):
         self.table.setRowCount(0)
         self.summary.setText('')
-        res = http_ping(self.url.text(), self.count.value(), self.timeout.value())
+        targets = load_targets(self.url.text().replace(',', ' ').split())
+        try:
+            check_proxies(targets)
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, 'HTTP Ping', f'Ошибка: {e}')
+            return
+        if len(targets) > 1:
+            self._run_many(targets)
+            return
+        self.table.setColumnCount(3 + len(PHASES))
+        self.table.setHorizontalHeaderLabels(['#', 'Статус', 'мс', *PHASES])
+        res = http_ping(
+            targets[0] if targets else '', self.count.value(), self.timeout.value(),
+            keepalive=self.keepalive.isChecked(), method=self.method.currentText(),
+        )
         for i, s in enumerate(res['samples'], 1):
             self.table.insertRow(self.table.rowCount())
             self.table.setItem(i-1, 0, QtWidgets.QTableWidgetItem(str(i)))
             self.table.setItem(i-1, 1, QtWidgets.QTableWidgetItem(str(s.get('status'))))
             self.table.setItem(i-1, 2, QtWidgets.QTableWidgetItem(f"{s.get('ms',0):.1f}"))
+            for j, phase in enumerate(PHASES, 3):
+                self.table.setItem(i-1, j, QtWidgets.QTableWidgetItem(f"{s[f'{phase}_ms']:.1f}"))
         stats = res['stats']
         self.summary.setText(f"Отправлено: {stats['sent']} • Получено: {stats['received']} • Потери: {stats['loss']*100:.0f}% | "
-                             f"min: {stats['min_ms']:.1f} ms • avg: {stats['avg_ms']:.1f} ms • max: {stats['max_ms']:.1f} ms")
+                             f"min: {stats['min_ms']:.1f} ms • avg: {stats['avg_ms']:.1f} ms • max: {stats['max_ms']:.1f} ms | "
+                             f"p50: {stats['p50_ms']:.1f} ms • p99: {stats['p99_ms']:.1f} ms • jitter: {stats['jitter_ms']:.1f} ms | "
+                             f"ttfb: {stats['avg_ttfb_ms']:.1f} ms")
         QtWidgets.QApplication.instance().activeWindow().statusBar().showMessage('Пинг выполнен', 3000)
 
 
@@ -322,6 +380,11 @@ class Base64Widget(QtWidgets.QWidget):
         self.out_edit.setReadOnly(True)
         self.out_edit.setMinimumHeight(260)
 
+        self.codec = QtWidgets.QComboBox()
+        for name, codec in CODECS.items():
+            self.codec.addItem(f'{name} — {codec.help}', name)
+        self.codec.setMinimumHeight(36)
+
         encode_btn = QtWidgets.QPushButton('Кодировать')
         decode_btn = QtWidgets.QPushButton('Декодировать')
         load_btn = QtWidgets.QPushButton('Открыть…')
@@ -346,6 +409,7 @@ class Base64Widget(QtWidgets.QWidget):
         hb = QtWidgets.QHBoxLayout()
         hb.addWidget(encode_btn)
         hb.addWidget(decode_btn)
+        hb.addWidget(self.codec)
         hb.addStretch()
         hb.addWidget(load_btn)
         hb.addWidget(save_btn)
@@ -353,12 +417,12 @@ class Base64Widget(QtWidgets.QWidget):
 
     def _encode(self):
         data = self.in_edit.toPlainText().encode()
-        self.out_edit.setPlainText(b64_encode(data).decode())
+        self.out_edit.setPlainText(encode_bytes(data, self.codec.currentData()).decode())
         QtWidgets.QApplication.instance().activeWindow().statusBar().showMessage('Текст закодирован', 3000)
 
     def _decode(self):
         try:
-            data = b64_decode(self.in_edit.toPlainText().encode())
+            data = decode_bytes(self.in_edit.toPlainText().encode(), self.codec.currentData())
             try:
                 self.out_edit.setPlainText(data.decode())
             except UnicodeDecodeError:
@@ -393,8 +457,16 @@ class DuplicatesWidget(QtWidgets.QWidget):
         self.min_size.setValue(1)
         self.min_size.setMinimumHeight(36)
         self.algo = QtWidgets.QComboBox()
-        self.algo.addItems(['md5', 'sha1', 'sha256'])
+        self.algo.addItems(list(HASHERS))
         self.algo.setMinimumHeight(36)
+        self.mode = QtWidgets.QComboBox()
+        self.mode.addItems(['Точные копии'] + [f'Похожие изображения ({m})' for m in PHASHES])
+        self.mode.setMinimumHeight(36)
+        self.distance = QtWidgets.QSpinBox()
+        self.distance.setRange(0, 32)
+        self.distance.setValue(6)
+        self.distance.setMinimumHeight(36)
+        self.distance.setToolTip('Макс. расстояние Хэмминга между хешами изображений')
 
         self.table = QtWidgets.QTableWidget(0, 3)
         self.table.setHorizontalHeaderLabels(['Группа', 'Размер', 'Файл'])
@@ -402,6 +474,11 @@ class DuplicatesWidget(QtWidgets.QWidget):
         self.table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(2, QtWidgets.QHeaderView.Stretch)
         self.table.setMinimumHeight(320)
+        self.progress = QtWidgets.QProgressBar()
+        self.progress.setRange(0, 1000)
+        self.progress.setTextVisible(True)
+        self.progress.setFormat('')
+        self.progress.setMinimumHeight(24)
 
         run = QtWidgets.QPushButton('Сканировать')
         run.setProperty('primary', True)
@@ -419,6 +496,10 @@ class DuplicatesWidget(QtWidgets.QWidget):
         opts.addWidget(self.min_size)
         opts.addWidget(QtWidgets.QLabel('Алгоритм'))
         opts.addWidget(self.algo)
+        opts.addWidget(QtWidgets.QLabel('Режим'))
+        opts.addWidget(self.mode)
+        opts.addWidget(QtWidgets.QLabel('Расстояние'))
+        opts.addWidget(self.distance)
         opts.addStretch()
         opts.addWidget(run)
 
@@ -427,6 +508,7 @@ class DuplicatesWidget(QtWidgets.QWidget):
         layout.setSpacing(12)
         layout.addLayout(top)
         layout.addLayout(opts)
+        layout.addWidget(self.progress)
         layout.addWidget(self.table)
 
     def _browse(self):
@@ -434,13 +516,36 @@ class DuplicatesWidget(QtWidgets.QWidget):
         if path:
             self.dir_edit.setText(path)
 
+    def _on_progress(self, p):
+        if p.stage == 'walk':
+            self.progress.setRange(0, 0)
+            self.progress.setFormat(f'Обход: {p.files_walked} файлов')
+        else:
+            self.progress.setRange(0, 1000)
+            self.progress.setValue(p.bytes_done * 1000 // p.bytes_total if p.bytes_total else 1000)
+            eta = '—' if p.eta is None else f'{p.eta:.0f} с'
+            self.progress.setFormat(f'{p.stage}: %p%  {p.gbps:.2f} GB/s  осталось {eta}')
+        QtWidgets.QApplication.processEvents()
+
     def _scan(self):
         self.table.setRowCount(0)
+        self.progress.setRange(0, 1000)
+        self.progress.setValue(0)
+        self.progress.setFormat('%p%')
         root = Path(self.dir_edit.text())
         if not root.exists():
             QtWidgets.QMessageBox.warning(self, 'Дубликаты', 'Путь не найден')
             return
-        groups = find_duplicates(root, min_size=self.min_size.value(), algo=self.algo.currentText())
+        mode = self.mode.currentIndex()
+        if mode:
+            groups = find_similar_images(
+                root, method=PHASHES[mode - 1], distance=self.distance.value(),
+                min_size=self.min_size.value(), workers=os.cpu_count() or 1,
+            )
+        else:
+            groups = iter_duplicates(
+                root, min_size=self.min_size.value(), algo=self.algo.currentText(), progress=self._on_progress,
+            )
         row = 0
         for gi, g in enumerate(groups, 1):
             for p, size in g:
@@ -449,6 +554,9 @@ class DuplicatesWidget(QtWidgets.QWidget):
                 self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(str(size)))
                 self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(str(p)))
                 row += 1
+            # группы приходят по мере готовности — даём таблице перерисоваться
+            QtWidgets.QApplication.processEvents()
+        self.progress.setValue(1000)
         QtWidgets.QApplication.instance().activeWindow().statusBar().showMessage('Поиск завершён', 3000)
 
 
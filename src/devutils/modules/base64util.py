@@ -1,5 +1,21 @@
-
+from __future__ import annotations
 import base64
+import binascii
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from devutils.modules.pools import make_executor
+
+
+# блок чтения потока; кодеры сами переносят невыровненный хвост между кусками
+CHUNK = 768 * 1024
+# участок файла на один процесс при --jobs (выравнивается по группе кодека)
+REGION = 32 * CHUNK
+_WHITESPACE = b' \t\r\n\v\f'
+_SPACES = tuple(bytes((c,)) for c in _WHITESPACE)
 
 
 def b64_encode(data: bytes) -> bytes:
@@ -8,3 +24,343 @@ def b64_encode(data: bytes) -> bytes:
 
 def b64_decode(data: bytes) -> bytes:
     return base64.b64decode(data)
+
+
+class Codec:
+    """Описание кодека: block байт входа кодируются ровно в group символов.
+
+    encode/decode работают с целыми группами (и с последней неполной).
+    wrap — длина строки вывода (0 — одной строкой). partial — можно ли
+    декодировать неполную последнюю группу (base85, base64 без '=').
+    expand — предобработка ввода перед выравниванием (ascii85: 'z' -> '!!!!!').
+    alphabet — допустимые символы: остальные декодер выбрасывает до
+    выравнивания, как base64.b64decode без validate; без alphabet
+    выбрасываются только пробелы, а чужой символ — ошибка декодирования.
+    """
+
+    __slots__ = ('name', 'block', 'group', 'encode', 'decode', 'wrap', 'partial', 'expand', 'alphabet', 'junk', 'help')
+
+    def __init__(
+        self,
+        name: str,
+        block: int,
+        group: int,
+        encode: Callable[[bytes], bytes],
+        decode: Callable[[bytes], bytes],
+        wrap: int = 0,
+        partial: bool = False,
+        expand: Optional[Callable[[bytes], bytes]] = None,
+        alphabet: Optional[bytes] = None,
+        help: str = '',
+    ):
+        if wrap % group:
+            raise ValueError("wrap: кратно group")
+        self.name = name
+        self.block = block
+        self.group = group
+        self.encode = encode
+        self.decode = decode
+        self.wrap = wrap
+        self.partial = partial
+        self.expand = expand
+        self.alphabet = alphabet
+        # дополнение алфавита — то, что удаляет translate
+        self.junk = None if alphabet is None else bytes(c for c in range(256) if c not in alphabet)
+        self.help = help
+
+    def encoder(self) -> Encoder:
+        return Encoder(self)
+
+    def decoder(self) -> Decoder:
+        return Decoder(self)
+
+
+def _b64(data: bytes) -> bytes:
+    return binascii.b2a_base64(data, newline=False)
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    # JWT и т.п. часто без '=': добиваем до группы
+    return base64.urlsafe_b64decode(bytes(data) + b'=' * (-len(data) % 4))
+
+
+_B64 = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+CODECS: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec) -> Codec:
+    """Добавить кодек в реестр (CLI --codec и GUI берут список отсюда)."""
+    CODECS[codec.name] = codec
+    return codec
+
+
+for _codec in (
+    Codec('b64', 3, 4, _b64, binascii.a2b_base64, alphabet=_B64 + b'+/=', help='Base64 (RFC 4648)'),
+    Codec('b64url', 3, 4, base64.urlsafe_b64encode, _b64url_decode, partial=True, alphabet=_B64 + b'-_=',
+          help='Base64 для URL: -_ вместо +/'),
+    Codec('mime', 3, 4, _b64, binascii.a2b_base64, wrap=76, alphabet=_B64 + b'+/=',
+          help='Base64 строками по 76 символов (MIME)'),
+    Codec('b32', 5, 8, base64.b32encode, base64.b32decode, help='Base32 (RFC 4648)'),
+    Codec('b85', 4, 5, base64.b85encode, base64.b85decode, partial=True, help='Base85 (git, Mercurial)'),
+    Codec('a85', 4, 5, base64.a85encode, base64.a85decode, partial=True,
+          expand=lambda data: data.replace(b'z', b'!!!!!'), help='Ascii85 (Adobe, без <~ ~>)'),
+    Codec('hex', 1, 2, binascii.hexlify, binascii.unhexlify, help='Шестнадцатеричный'),
+):
+    register_codec(_codec)
+
+
+def get_codec(name: str) -> Codec:
+    codec = CODECS.get(name.lower())
+    if codec is None:
+        raise ValueError(f"codec: {'|'.join(CODECS)}")
+    return codec
+
+
+class Encoder:
+    """Кодирование по кускам: хвост куска, не кратный block байтам, переносится в следующий.
+    При wrap строки режутся по wrap символов с учётом уже выведенной части строки."""
+
+    __slots__ = ('codec', '_tail', '_col')
+
+    def __init__(self, codec: Codec):
+        self.codec = codec
+        self._tail = b''
+        self._col = 0
+
+    def update(self, data: bytes) -> bytes:
+        if self._tail:
+            data = self._tail + data
+        cut = len(data) - len(data) % self.codec.block
+        self._tail = bytes(data[cut:])
+        return self._wrap(self.codec.encode(data[:cut]) if cut else b'')
+
+    def final(self) -> bytes:
+        tail, self._tail = self._tail, b''
+        out = self._wrap(self.codec.encode(tail) if tail else b'')
+        if self._col:
+            self._col = 0
+            out += b'\n'
+        return out
+
+    def _wrap(self, out: bytes) -> bytes:
+        wrap = self.codec.wrap
+        if not wrap or not out:
+            return out
+        # сначала дописать начатую строку, дальше целые строки одним join
+        first = min(wrap - self._col, len(out))
+        lines = [out[:first]]
+        lines += [out[i:i + wrap] for i in range(first, len(out), wrap)]
+        col = self._col + first if len(lines) == 1 else len(lines[-1])
+        if col == wrap:
+            lines.append(b'')
+            col = 0
+        self._col = col
+        return b'\n'.join(lines)
+
+
+class Decoder:
+    """Декодирование по кускам: пробелы и переводы строк (для кодеков с alphabet —
+    все символы не из алфавита) выбрасываются, хвост, не кратный group символам,
+    переносится в следующий кусок."""
+
+    __slots__ = ('codec', '_tail')
+
+    def __init__(self, codec: Codec):
+        self.codec = codec
+        self._tail = b''
+
+    def update(self, data: bytes) -> bytes:
+        data = bytes(data)
+        codec = self.codec
+        if codec.alphabet is not None:
+            # удаление всего алфавита почти всегда даёт b'' и намного дешевле
+            # фильтрации: полный translate — только если чужие символы есть
+            if data.translate(None, codec.alphabet):
+                data = data.translate(None, codec.junk)
+        # translate дорогой, а в однострочном вводе пробелов обычно нет: сначала быстрый поиск
+        elif any(c in data for c in _SPACES):
+            data = data.translate(None, _WHITESPACE)
+        if codec.expand is not None:
+            data = codec.expand(data)
+        if self._tail:
+            data = self._tail + data
+        cut = len(data) - len(data) % codec.group
+        self._tail = data[cut:]
+        return codec.decode(memoryview(data)[:cut]) if cut else b''
+
+    def final(self) -> bytes:
+        tail, self._tail = self._tail, b''
+        if not tail:
+            return b''
+        if not self.codec.partial:
+            raise binascii.Error(f"обрезанный ввод: {len(tail)} лишних символов в конце")
+        return self.codec.decode(tail)
+
+
+def encode_bytes(data: bytes, codec: str = 'b64') -> bytes:
+    enc = get_codec(codec).encoder()
+    return enc.update(data) + enc.final()
+
+
+def decode_bytes(data: bytes, codec: str = 'b64') -> bytes:
+    dec = get_codec(codec).decoder()
+    return dec.update(data) + dec.final()
+
+
+def _pump(coder, src: BinaryIO, dst: BinaryIO, chunk: int) -> int:
+    # один буфер на весь поток: память постоянна при любом размере входа
+    buf = bytearray(chunk)
+    view = memoryview(buf)
+    written = 0
+    while True:
+        n = src.readinto(buf)
+        if not n:
+            break
+        out = coder.update(view[:n])
+        dst.write(out)
+        written += len(out)
+    out = coder.final()
+    dst.write(out)
+    return written + len(out)
+
+
+def encode_stream(src: BinaryIO, dst: BinaryIO, chunk: int = CHUNK, codec: str = 'b64') -> int:
+    """Кодирование из src в dst блоками по chunk байт за O(chunk) памяти; возвращает число записанных байт."""
+    return _pump(get_codec(codec).encoder(), src, dst, chunk)
+
+
+def decode_stream(src: BinaryIO, dst: BinaryIO, chunk: int = CHUNK, codec: str = 'b64') -> int:
+    """Обратное к encode_stream; переводы строк во входе допускаются. binascii.Error — на битом вводе.
+
+    Ошибка обнаруживается по ходу чтения (обрезанный ввод — только в конце),
+    так что к этому моменту в dst уже записано начало результата.
+    decode_file и CLI с --out в таком случае удаляют выходной файл.
+    """
+    return _pump(get_codec(codec).decoder(), src, dst, chunk)
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> None:
+    if hasattr(os, 'pwrite'):
+        while data:
+            n = os.pwrite(fd, data, offset)
+            data = data[n:]
+            offset += n
+    else:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+
+def _code_region(args: Tuple[str, str, str, str, int, int, int, Optional[int]]) -> int:
+    # один участок: mmap входа, кодирование блоками CHUNK, запись в свою позицию выхода
+    mode, name, src, dst, start, end, at, expect = args
+    codec = get_codec(name)
+    with open(src, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        if mode == 'decode' and any(m.find(c, start, end) >= 0 for c in _SPACES):
+            raise ValueError("пробелы или переводы строк во входе")
+        coder = codec.encoder() if mode == 'encode' else codec.decoder()
+        fd = os.open(dst, os.O_WRONLY)
+        written = 0
+        try:
+            for a in range(start, end, CHUNK):
+                out = coder.update(m[a:min(a + CHUNK, end)])
+                _pwrite(fd, out, at + written)
+                written += len(out)
+            out = coder.final()
+            _pwrite(fd, out, at + written)
+            written += len(out)
+        finally:
+            os.close(fd)
+    # декодеры молча пропускают чужие символы, ascii85 сжимает нули в 'z' — тогда
+    # выход участка другой длины и смещения следующих съедут
+    if expect is not None and written != expect:
+        raise ValueError("длина участка не совпала с ожидаемой")
+    return written
+
+
+def _plan(mode: str, codec: Codec, src: Path, region: int) -> List[Tuple[int, int, int]]:
+    """Участки (начало, конец, позиция в выходе), выровненные по группе кодека и строке wrap."""
+    size = src.stat().st_size
+    if mode == 'encode':
+        # вход участка — целое число строк вывода (или групп без wrap)
+        unit = codec.wrap // codec.group * codec.block if codec.wrap else codec.block
+        out = codec.wrap + 1 if codec.wrap else codec.group
+    else:
+        unit, out = codec.group, codec.block
+        with open(src, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            # перевод строки в конце (echo, base64 -w0 ...; echo) не мешает разбиению
+            while size and m[size - 1] in _WHITESPACE:
+                size -= 1
+    region = max(unit, region // unit * unit)
+    return [(a, min(a + region, size), a // unit * out) for a in range(0, size, region)]
+
+
+def _code_file(mode: str, src: Path, dst: Path, jobs: Optional[int], region: int, codec: str) -> int:
+    jobs = jobs or os.cpu_count() or 1
+    src, dst = Path(src), Path(dst)
+    spec = get_codec(codec)
+    parts = _plan(mode, spec, src, region) if jobs > 1 and src.stat().st_size > region else []
+    if len(parts) > 1:
+        # выход растёт pwrite-ами участков; итоговый размер — по последнему
+        open(dst, 'wb').close()
+        executor = make_executor(min(jobs, len(parts)), 'process')
+        try:
+            # до начала следующего участка — ровно столько должен занять выход текущего
+            ends = [p[2] for p in parts[1:]] + [None]
+            args = [(mode, spec.name, str(src), str(dst), *p, e if e is None else e - p[2]) for p, e in zip(parts, ends)]
+            sizes = list(executor.map(_code_region, args))
+            total = parts[-1][2] + sizes[-1]
+            os.truncate(dst, total)
+            return total
+        except ValueError:
+            # переносы строк или 'z' во входе — позиции не вычислить заранее, идём потоком
+            pass
+        finally:
+            executor.shutdown()
+    stream = encode_stream if mode == 'encode' else decode_stream
+    try:
+        with open(src, 'rb') as f, open(dst, 'wb') as o:
+            return stream(f, o, codec=codec)
+    except ValueError:
+        # не оставлять начало результата под видом готового файла
+        dst.unlink(missing_ok=True)
+        raise
+
+
+def encode_file(src: Path, dst: Path, jobs: Optional[int] = None, region: int = REGION, codec: str = 'b64') -> int:
+    """Кодирование файла в файл на jobs процессах (по умолчанию — все ядра); возвращает размер выхода.
+
+    Вход делится на участки по region байт (кратно группе кодека, с wrap —
+    целым строкам), каждый процесс кодирует свой участок через mmap и пишет
+    результат pwrite по заранее известному смещению, так что порядок
+    сохраняется без склейки.
+    """
+    return _code_file('encode', src, dst, jobs, region, codec)
+
+
+def decode_file(src: Path, dst: Path, jobs: Optional[int] = None, region: int = REGION, codec: str = 'b64') -> int:
+    """Обратное к encode_file. Параллельно — только вход одной строкой;
+    с переводами строк (mime) или 'z' (a85) декодируется потоком в одном процессе.
+    То же при кодировании a85 с нулевыми группами: длина выхода заранее неизвестна."""
+    return _code_file('decode', src, dst, jobs, region, codec)
+
+
+def bench_b64(path: Path, jobs: List[int], rounds: int = 1, codec: str = 'b64') -> Dict[int, Tuple[float, float]]:
+    """Масштабирование по числу процессов: {jobs: (encode GB/s, decode GB/s)} по размеру исходного файла."""
+    path = Path(path)
+    size = path.stat().st_size
+    enc, dec = path.with_name(path.name + '.enc'), path.with_name(path.name + '.out')
+    result = {}
+    try:
+        for n in jobs:
+            best = [float('inf'), float('inf')]
+            for _ in range(rounds):
+                for k, (fn, a, b) in enumerate(((encode_file, path, enc), (decode_file, enc, dec))):
+                    t0 = time.perf_counter()
+                    fn(a, b, jobs=n, codec=codec)
+                    best[k] = min(best[k], time.perf_counter() - t0)
+            result[n] = (size / best[0] / 1e9, size / best[1] / 1e9)
+    finally:
+        for p in (enc, dec):
+            if p.exists():
+                p.unlink()
+    return result
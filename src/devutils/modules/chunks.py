@@ -0,0 +1,200 @@
+
+from __future__ import annotations
+import heapq
+import mmap
+import os
+import random
+from array import array
+from hashlib import blake2b
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from devutils.modules.duplicates import build_inventory
+from devutils.modules.pools import make_executor
+from devutils.modules.walker import PRUNE_DIRS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# без numpy поиск границ кусков идёт побайтовым циклом на Python (в разы медленнее)
+HAVE_NUMPY = np is not None
+
+
+# FastCDC-подобное разбиение: gear-хеш h = (h << 1) + GEAR[b]; граница там, где
+# младшие 16 бит h нулевые (в среднем раз в 64 КиБ), в пределах MIN..MAX
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+MASK = 0xFFFF
+BLOCK = 16 * 1024 * 1024
+PAIR_CAP = 64
+
+_rng = random.Random(0x5EED_CDC)
+GEAR = tuple(_rng.getrandbits(16) for _ in range(256))
+del _rng
+
+
+def _candidates_py(view: memoryview) -> Iterator[int]:
+    gear = GEAR
+    h = 0
+    for i, b in enumerate(view):
+        h = ((h << 1) + gear[b]) & MASK
+        if not h:
+            yield i + 1
+
+
+def _candidates_np(view: memoryview) -> Iterator[int]:
+    # младшие 16 бит gear-хеша зависят только от 16 последних байт:
+    # h[i] = sum(GEAR[b[i-k]] << k, k < 16); считаем удвоением за 4 векторных шага
+    gear = np.array(GEAR, dtype=np.uint32)
+    n = len(view)
+    for start in range(0, n, BLOCK):
+        ctx = min(start, 15)
+        b = np.frombuffer(view[start - ctx:min(start + BLOCK, n)], dtype=np.uint8)
+        s = gear[b]
+        for step in (1, 2, 4, 8):
+            shifted = np.zeros_like(s)
+            shifted[step:] = s[:-step] << step
+            s = (s + shifted) & MASK
+        for i in np.flatnonzero(s[ctx:] == 0):
+            yield start + int(i) + 1
+
+
+def _select_cuts(candidates: Iterable[int], n: int) -> List[int]:
+    cuts = []
+    last = 0
+    for pos in candidates:
+        while pos - last > MAX_CHUNK:
+            last += MAX_CHUNK
+            cuts.append(last)
+        if pos - last >= MIN_CHUNK:
+            cuts.append(pos)
+            last = pos
+    while n - last > MAX_CHUNK:
+        last += MAX_CHUNK
+        cuts.append(last)
+    if last < n:
+        cuts.append(n)
+    return cuts
+
+
+def chunk_file(path: str, use_numpy: bool = True) -> Tuple[array, array]:
+    """Разбить файл на куски по содержимому: (64-битные хеши, размеры)."""
+    hashes = array('Q')
+    sizes = array('I')
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return hashes, sizes
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            find = _candidates_np if use_numpy and np is not None else _candidates_py
+            last = 0
+            for cut in _select_cuts(find(view), len(view)):
+                digest = blake2b(view[last:cut], digest_size=8).digest()
+                hashes.append(int.from_bytes(digest, 'little'))
+                sizes.append(cut - last)
+                last = cut
+    return hashes, sizes
+
+
+def _try_chunk_file(path: str) -> Optional[Tuple[array, array]]:
+    try:
+        return chunk_file(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _repeats(hashes: array, sizes: array) -> Tuple[int, int, Sequence[int], List[Tuple[int, int]]]:
+    """Куски, упорядоченные по хешу: (число уникальных, их байты, порядок, серии [a, b) повторов).
+
+    Сортировка стабильная, поэтому внутри серии id файлов идут по возрастанию.
+    """
+    n = len(hashes)
+    if not n:
+        return 0, 0, [], []
+    if np is not None:
+        h = np.frombuffer(hashes, dtype=np.uint64)
+        order = np.argsort(h, kind='stable')
+        sh = h[order]
+        starts = np.flatnonzero(np.r_[True, sh[1:] != sh[:-1]])
+        ends = np.r_[starts[1:], n]
+        unique = int(np.frombuffer(sizes, dtype=np.uint32)[order[starts]].sum(dtype=np.uint64))
+        multi = np.flatnonzero(ends - starts > 1)
+        return len(starts), unique, order, list(zip(starts[multi].tolist(), ends[multi].tolist()))
+    order = sorted(range(n), key=hashes.__getitem__)
+    count = unique = a = 0
+    runs = []
+    for b in range(1, n + 1):
+        if b == n or hashes[order[b]] != hashes[order[a]]:
+            count += 1
+            unique += sizes[order[a]]
+            if b - a > 1:
+                runs.append((a, b))
+            a = b
+    return count, unique, order, runs
+
+
+def analyze_chunks(
+    root: Path,
+    min_size: int = 1,
+    workers: int = 1,
+    pool: str = 'process',
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = False,
+    one_filesystem: bool = False,
+    prune: Iterable[str] = PRUNE_DIRS,
+    top: int = 10,
+) -> dict:
+    """Блочная дедупликация: сколько байт повторяется между файлами и какие пары пересекаются сильнее всего.
+
+    Таблица кусков — три плоских массива (хеш, размер, id файла), 16 байт на
+    кусок; после обхода она один раз сортируется по хешу (с numpy — argsort,
+    иначе sorted по индексам, заметно медленнее и с временным списком), и
+    по Python-циклу проходят только серии повторов. Куски, общие для больше
+    чем PAIR_CAP файлов (нули в образах ВМ), учитываются в shared_bytes,
+    но не в парах.
+    """
+    inv = build_inventory(root, min_size, None, exclude, skip_hidden, one_filesystem, prune, workers)
+    paths = (inv.path(i) for i in range(len(inv)))
+    hashes = array('Q')
+    sizes = array('I')
+    fids = array('I')
+    result = dict.fromkeys(('files', 'chunks', 'unique_chunks', 'total_bytes', 'unique_bytes', 'shared_bytes'), 0)
+
+    executor = make_executor(workers, pool)
+    try:
+        chunked = executor.map(_try_chunk_file, paths) if executor is not None else map(_try_chunk_file, paths)
+        # map сохраняет порядок, так что id файлов в массиве идут по возрастанию
+        for fid, res in enumerate(chunked):
+            if res is None:
+                continue
+            result['files'] += 1
+            hashes.extend(res[0])
+            sizes.extend(res[1])
+            fids.extend(array('I', (fid,)) * len(res[0]))
+            result['total_bytes'] += sum(res[1])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    result['chunks'] = len(hashes)
+    result['unique_chunks'], result['unique_bytes'], order, runs = _repeats(hashes, sizes)
+    result['shared_bytes'] = result['total_bytes'] - result['unique_bytes']
+    overlap: Dict[Tuple[int, int], int] = {}
+    for a, b in runs:
+        ids: List[int] = []
+        for k in range(a, b):
+            fid = fids[order[k]]
+            if not ids or ids[-1] != fid:
+                ids.append(fid)
+                if len(ids) > PAIR_CAP:
+                    break
+        if len(ids) > PAIR_CAP:
+            continue
+        size = sizes[order[a]]
+        for pair in combinations(ids, 2):
+            overlap[pair] = overlap.get(pair, 0) + size
+    best = heapq.nlargest(top, overlap.items(), key=lambda kv: kv[1])
+    result['pairs'] = [(inv.path(a), inv.path(b), n) for (a, b), n in best]
+    return result
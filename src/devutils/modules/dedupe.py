@@ -0,0 +1,84 @@
+
+from __future__ import annotations
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+
+ACTIONS = ('report', 'delete', 'hardlink', 'reflink', 'symlink')
+
+# ioctl FICLONE (linux/fs.h): общий экстент вместо копии на btrfs/xfs/bcachefs
+FICLONE = 0x40049409
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(f"reflink не поддерживается на этой платформе: {dst}") from None
+    with open(src, 'rb') as s, open(dst, 'xb') as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+def _hardlink(src: Path, dst: Path) -> None:
+    os.link(src, dst)
+
+
+def _symlink(src: Path, dst: Path) -> None:
+    os.symlink(os.path.abspath(src), dst)
+
+
+def _replace(keep: Path, dup: Path, make: Callable[[Path, Path], None], copy_meta: bool) -> None:
+    # создаём замену рядом под временным именем и атомарно подменяем rename'ом:
+    # dup в любой момент либо старый файл, либо готовая ссылка
+    tmp = dup.with_name(f".{dup.name}.devutils-{os.getpid()}.tmp")
+    try:
+        make(keep, tmp)
+        if copy_meta:
+            shutil.copystat(dup, tmp)
+        os.replace(tmp, dup)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def dedupe_group(group: Sequence[Tuple[Path, int]], action: str = 'report') -> Tuple[int, List[Tuple[Path, OSError]]]:
+    """Применить action ко всем файлам группы, кроме первого (оригинала).
+
+    Возвращает реально освобождённые байты и ошибки по файлам. Файл,
+    у которого есть другие жёсткие ссылки, место не освобождает.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"action: {'|'.join(ACTIONS)}")
+    reclaimed = 0
+    errors = []
+    if action == 'report' or len(group) < 2:
+        return reclaimed, errors
+    keep = group[0][0]
+    try:
+        keep_st = keep.stat()
+    except OSError as e:
+        return reclaimed, [(keep, e)]
+    for dup, size in group[1:]:
+        try:
+            st = dup.lstat()
+            if (st.st_dev, st.st_ino) == (keep_st.st_dev, keep_st.st_ino):
+                continue
+            if action == 'delete':
+                dup.unlink()
+            elif action == 'hardlink':
+                _replace(keep, dup, _hardlink, copy_meta=False)
+            elif action == 'reflink':
+                _replace(keep, dup, _reflink, copy_meta=True)
+            else:
+                _replace(keep, dup, _symlink, copy_meta=False)
+        except OSError as e:
+            errors.append((dup, e))
+            continue
+        if st.st_nlink == 1:
+            reclaimed += size
+    return reclaimed, errors
@@ -0,0 +1,373 @@
+
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from devutils.modules.duplicates import CHUNK, READERS, ScanProgress, compare_group, hash_file, hasher, iter_duplicates
+from devutils.modules.hashcache import HashCache, Stamp
+from devutils.modules.walker import PRUNE_DIRS, path_filter, walk_entries
+
+
+# linux/inotify.h
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_EVENT = struct.Struct('iIII')
+_WATCH_MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+Group = List[Tuple[Path, int]]
+
+
+class DuplicateIndex:
+    """Индекс дубликатов, который можно обновлять по одному пути.
+
+    build() — обычный скан через iter_duplicates (выборка, пул, кеш); после
+    него индекс хранит stat-ключ каждого файла и корзины по размеру, а члены
+    найденных групп помечены номером группы вместо хеша. Полные хеши
+    считаются лениво, когда в корзину приходит новый файл: для помеченной
+    группы — один на группу. update(path) пересчитывает только корзину
+    размера этого файла. Первым в группе (его оставляет dedupe_group) идёт
+    файл, попавший в индекс раньше остальных.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        min_size: int = 1,
+        algo: str = 'md5',
+        cache: Optional[HashCache] = None,
+        exclude: Iterable[str] = (),
+        skip_hidden: bool = False,
+        one_filesystem: bool = False,
+        prune: Iterable[str] = PRUNE_DIRS,
+        chunk: int = CHUNK,
+        reader: str = 'readinto',
+        fadvise: bool = True,
+        verify: bool = False,
+    ):
+        hasher(algo)
+        if reader not in READERS:
+            raise ValueError(f"reader: {'|'.join(READERS)}")
+        self.root = os.fspath(root)
+        self.min_size = min_size
+        self.algo = algo
+        self.cache = cache
+        self.chunk = chunk
+        self.reader = reader
+        self.fadvise = fadvise
+        self.verify = verify
+        self._walk_opts = (tuple(exclude), skip_hidden, one_filesystem, tuple(prune))
+        self.allows = path_filter(self.root, exclude, skip_hidden, prune)
+        self._stamps: Dict[str, Stamp] = {}
+        self._by_size: Dict[int, Set[str]] = {}
+        self._digests: Dict[str, str] = {}
+        self._tokens: Dict[str, int] = {}
+        self._order: Dict[str, int] = {}
+        self._seq = 0
+
+    def scan(self) -> Dict[str, Stamp]:
+        exclude, skip_hidden, one_filesystem, prune = self._walk_opts
+        out = {}
+        for top, name, st in walk_entries(self.root, exclude, skip_hidden, one_filesystem, prune):
+            if st.st_size >= self.min_size:
+                out[os.path.join(top, name)] = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        return out
+
+    def build(
+        self,
+        workers: int = 1,
+        pool: str = 'thread',
+        progress: Optional[Callable[[ScanProgress], None]] = None,
+    ) -> Iterator[Group]:
+        """Первичный скан; отдаёт группы по мере нахождения, как iter_duplicates."""
+        # порядок — по имени, как внутри групп iter_duplicates
+        for p, stamp in sorted(self.scan().items()):
+            self._add(p, stamp)
+        exclude, skip_hidden, one_filesystem, prune = self._walk_opts
+        groups = iter_duplicates(
+            self.root, self.min_size, self.algo, workers, pool, None, self.cache, exclude, skip_hidden,
+            one_filesystem, prune, self.chunk, self.reader, self.fadvise, self.verify, progress,
+        )
+        for n, g in enumerate(groups):
+            for p, _ in g:
+                if str(p) in self._stamps:
+                    self._tokens[str(p)] = n
+            yield g
+
+    def groups(self) -> Iterator[Group]:
+        for size in sorted(self._by_size, reverse=True):
+            yield from self._groups_of(size)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._stamps
+
+    def paths_under(self, directory: str) -> List[str]:
+        prefix = os.path.join(directory, '')
+        return [p for p in self._stamps if p.startswith(prefix)]
+
+    def remove(self, path: str) -> None:
+        stamp = self._stamps.pop(path, None)
+        if stamp is None:
+            return
+        self._digests.pop(path, None)
+        self._tokens.pop(path, None)
+        self._order.pop(path, None)
+        bucket = self._by_size.get(stamp[2])
+        if bucket is not None:
+            bucket.discard(path)
+            if not bucket:
+                del self._by_size[stamp[2]]
+
+    def update(self, path: str) -> List[Group]:
+        """Перечитать stat пути; вернуть его группу, если она появилась или изменила состав.
+
+        Смена только mtime или атрибутов (touch, chmod) группу повторно не отдаёт.
+        """
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
+            self.remove(path)
+            return []
+        if not stat.S_ISREG(st.st_mode) or st.st_size < self.min_size or not self.allows(path):
+            self.remove(path)
+            return []
+        stamp = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        if self._stamps.get(path) == stamp:
+            return []
+        before = self._members(path)
+        order = self._order.get(path)
+        self.remove(path)
+        self._add(path, stamp, order)
+        groups = [g for g in self._resolve(st.st_size) if any(str(p) == path for p, _ in g)]
+        if groups and {str(p) for p, _ in groups[0]} == before:
+            return []
+        if self.verify:
+            groups = self._compare(groups, path)
+        return groups
+
+    def _add(self, path: str, stamp: Stamp, order: Optional[int] = None) -> None:
+        if order is None:
+            self._seq += 1
+            order = self._seq
+        self._order[path] = order
+        self._stamps[path] = stamp
+        self._by_size.setdefault(stamp[2], set()).add(path)
+
+    def _members(self, path: str) -> Set[str]:
+        stamp = self._stamps.get(path)
+        if stamp is not None:
+            for g in self._groups_of(stamp[2]):
+                paths = {str(p) for p, _ in g}
+                if path in paths:
+                    return paths
+        return set()
+
+    def _compare(self, groups: List[Group], path: str) -> List[Group]:
+        # совпадение хешей подтверждаем побайтово, как iter_duplicates(verify=True)
+        out = []
+        for g in groups:
+            size = g[0][1]
+            parts, _ = compare_group([str(p) for p, _ in g], self.chunk)
+            out.extend([(Path(p), size) for p in part] for part in parts if path in part)
+        return out
+
+    def _digest(self, path: str) -> Optional[str]:
+        h = self._digests.get(path)
+        if h is not None:
+            return h
+        stamp = self._stamps[path]
+        if self.cache is not None:
+            h = self.cache.get(stamp, self.algo, 'digest')
+        if h is None:
+            try:
+                h = hash_file(path, self.algo, self.chunk, self.reader, self.fadvise)
+            except OSError:
+                return None
+            if self.cache is not None:
+                self.cache.put_many([(stamp, h)], self.algo, 'digest')
+        self._digests[path] = h
+        return h
+
+    def _resolve(self, size: int) -> List[Group]:
+        bucket = self._by_size.get(size, ())
+        if len(bucket) < 2:
+            for p in bucket:
+                self._digests.pop(p, None)
+                self._tokens.pop(p, None)
+            return []
+        # у группы из build() хеш одинаков у всех членов: читаем один файл
+        tokens: Dict[int, List[str]] = {}
+        for p in sorted(bucket, key=self._order.__getitem__):
+            t = self._tokens.pop(p, None)
+            if t is not None:
+                tokens.setdefault(t, []).append(p)
+        for members in tokens.values():
+            h = None
+            for p in members:
+                h = self._digest(p)
+                if h is not None:
+                    break
+            if h is not None:
+                for p in members:
+                    self._digests[p] = h
+        for p in sorted(bucket, key=self._order.__getitem__):
+            self._digest(p)
+        return list(self._groups_of(size))
+
+    def _groups_of(self, size: int) -> Iterator[Group]:
+        by_digest: Dict[object, List[str]] = {}
+        inodes = set()
+        for p in sorted(self._by_size.get(size, ()), key=self._order.__getitem__):
+            h = self._digests.get(p)
+            if h is None:
+                h = self._tokens.get(p)
+            stamp = self._stamps[p]
+            if h is None or stamp[:2] in inodes:
+                continue
+            inodes.add(stamp[:2])
+            by_digest.setdefault(h, []).append(p)
+        for same in by_digest.values():
+            if len(same) > 1:
+                yield [(Path(p), size) for p in same]
+
+
+class _Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        self._dirs: Dict[int, str] = {}
+
+    def add(self, directory: str) -> None:
+        wd = self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def read(self, timeout: float) -> List[Tuple[str, int]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b'\0'))
+            pos += length
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if mask & IN_Q_OVERFLOW:
+                events.append(('', mask))
+            elif directory is not None:
+                events.append((os.path.join(directory, name) if name else directory, mask))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _watch_inotify(index: DuplicateIndex, settle: float, stop: threading.Event) -> Iterator[Group]:
+    ino = _Inotify()
+    try:
+        exclude, skip_hidden, one_filesystem, prune = index._walk_opts
+
+        def add_tree(top: str) -> None:
+            ino.add(top)
+            for dirpath, dirnames, _ in os.walk(top):
+                dirnames[:] = [d for d in dirnames if index.allows(os.path.join(dirpath, d), is_dir=True)]
+                for d in dirnames:
+                    ino.add(os.path.join(dirpath, d))
+
+        add_tree(index.root)
+        while not stop.is_set():
+            events = ino.read(0.5)
+            if not events:
+                continue
+            # события пачкой: короткая пауза, чтобы слить серию записей в файл
+            deadline = time.monotonic() + settle
+            while time.monotonic() < deadline:
+                events.extend(ino.read(max(0.0, deadline - time.monotonic())))
+            dirty: Dict[str, int] = {}
+            for path, mask in events:
+                dirty[path] = dirty.get(path, 0) | mask
+            if any(mask & IN_Q_OVERFLOW for mask in dirty.values()):
+                # события потеряны, в том числе о новых каталогах: сначала заново
+                # ставим наблюдение на всё дерево (на старые каталоги — no-op), потом сверяем
+                add_tree(index.root)
+                yield from _apply_rescan(index)
+                continue
+            for path, mask in dirty.items():
+                if mask & IN_ISDIR:
+                    if mask & (IN_MOVED_FROM | IN_DELETE | IN_DELETE_SELF):
+                        for p in index.paths_under(path):
+                            index.remove(p)
+                    if mask & (IN_CREATE | IN_MOVED_TO) and os.path.isdir(path) and index.allows(path, is_dir=True):
+                        add_tree(path)
+                        for top, name, _ in walk_entries(path, exclude, skip_hidden, one_filesystem, prune):
+                            yield from index.update(os.path.join(top, name))
+                elif path in index or index.allows(path):
+                    yield from index.update(path)
+    finally:
+        ino.close()
+
+
+def _apply_rescan(index: DuplicateIndex) -> Iterator[Group]:
+    current = index.scan()
+    for p in [p for p in index._stamps if p not in current]:
+        index.remove(p)
+    for p, stamp in current.items():
+        if index._stamps.get(p) != stamp:
+            yield from index.update(p)
+
+
+def _watch_poll(index: DuplicateIndex, interval: float, stop: threading.Event) -> Iterator[Group]:
+    # без inotify: раз в interval повторный обход дерева — только stat, без чтения файлов
+    while not stop.wait(interval):
+        yield from _apply_rescan(index)
+
+
+def watch_duplicates(
+    index: DuplicateIndex,
+    interval: float = 2.0,
+    poll: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[Group]:
+    """Бесконечно отдаёт группы, которые появились или изменили состав после build().
+
+    На Linux изменения приходят от inotify, иначе (или при poll=True) дерево
+    переобходится раз в interval секунд. Остановка — stop.set().
+    """
+    if stop is None:
+        stop = threading.Event()
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            yield from _watch_inotify(index, min(interval, 0.5), stop)
+            return
+        except (OSError, AttributeError):
+            pass
+    yield from _watch_poll(index, interval, stop)
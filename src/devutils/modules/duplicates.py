@@ -1,63 +1,650 @@
 
 from __future__ import annotations
+import errno
+import mmap
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from functools import partial
 from pathlib import Path
-from hashlib import md5, sha1, sha256
-from typing import List, Tuple
+from hashlib import blake2b, md5, sha1, sha256
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from devutils.modules.hashcache import HashCache, Stamp
+from devutils.modules.inventory import Inventory
+from devutils.modules.pools import make_executor
+from devutils.modules.walker import PRUNE_DIRS, walk_entries
 
 
 CHUNK = 1024 * 1024
+SAMPLE = 4096
+BATCH = 256
+# сколько файлов одной группы compare_group держит открытыми одновременно
+MAX_OPEN = 64
+DROP_EVERY = 64 * 1024 * 1024
+READERS = ('readinto', 'mmap', 'read')
+STAT_KEYS = (
+    'files', 'size_eliminated', 'sample_eliminated', 'hash_eliminated', 'groups', 'duplicates',
+    'bytes_sampled', 'bytes_hashed', 'cache_hits', 'cache_misses', 'hardlinked',
+)
 
+_local = threading.local()
 
-def _hasher(name: str):
-    name = name.lower()
-    if name == 'md5':
-        return md5
-    if name == 'sha1':
-        return sha1
-    if name == 'sha256':
-        return sha256
-    return md5
 
+# имя -> фабрика объекта с update()/hexdigest(); для дедупликации криптостойкость
+# не нужна, так что xxh3/blake3 (если установлены) — самые быстрые варианты
+HASHERS: Dict[str, Callable[[], Any]] = {
+    'md5': md5,
+    'sha1': sha1,
+    'sha256': sha256,
+    'blake2b': blake2b,
+}
 
-def _hash_file(p: Path, algo: str) -> str:
-    h = _hasher(algo)()
-    with p.open('rb') as f:
-        while True:
-            b = f.read(CHUNK)
-            if not b:
-                break
-            h.update(b)
+try:
+    import xxhash
+except ImportError:
+    pass
+else:
+    HASHERS['xxh64'] = xxhash.xxh64
+    HASHERS['xxh3'] = xxhash.xxh3_128
+
+try:
+    import blake3
+except ImportError:
+    pass
+else:
+    HASHERS['blake3'] = blake3.blake3
+
+
+def register_hasher(name: str, factory: Callable[[], Any]) -> None:
+    HASHERS[name.lower()] = factory
+
+
+def hasher(name: str):
+    """Фабрика хешера по имени из HASHERS; ValueError со списком имён, если такого нет."""
+    try:
+        return HASHERS[name.lower()]
+    except KeyError:
+        raise ValueError(f"algo: {'|'.join(HASHERS)}") from None
+
+
+def bench_hashers(size: int = 256 * 1024 * 1024, rounds: int = 3) -> Dict[str, float]:
+    """Пропускная способность каждого хешера в GB/s на буфере в памяти (лучший из rounds)."""
+    buf = memoryview(os.urandom(CHUNK) * max(1, size // CHUNK))
+    result = {}
+    for name, factory in HASHERS.items():
+        best = float('inf')
+        for _ in range(rounds):
+            h = factory()
+            t0 = time.perf_counter()
+            for i in range(0, len(buf), CHUNK):
+                h.update(buf[i:i + CHUNK])
+            h.hexdigest()
+            best = min(best, time.perf_counter() - t0)
+        result[name] = len(buf) / best / 1e9
+    return result
+
+
+def _fadvise(fd: int, offset: int, length: int, advice: str) -> None:
+    # подсказки ядру; на платформах без posix_fadvise просто ничего не делаем
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, offset, length, getattr(os, 'POSIX_FADV_' + advice))
+        except OSError:
+            pass
+
+
+def _drop_behind(fd: int, dropped: int, pos: int, fadvise: bool) -> int:
+    if fadvise and pos - dropped >= DROP_EVERY:
+        _fadvise(fd, dropped, pos - dropped, 'DONTNEED')
+        return pos
+    return dropped
+
+
+def _buffer(size: int) -> bytearray:
+    buf = getattr(_local, 'buf', None)
+    if buf is None or len(buf) != size:
+        buf = _local.buf = bytearray(size)
+    return buf
+
+
+def hash_file(p: str, algo: str, chunk: int = CHUNK, reader: str = 'readinto', fadvise: bool = True) -> str:
+    """Полный хеш файла.
+
+    reader: read — новый bytes на каждый кусок; readinto — один bytearray
+    на поток, без копий; mmap — отображение файла и срезы memoryview.
+    fadvise: SEQUENTIAL при открытии и DONTNEED на уже прочитанное каждые
+    DROP_EVERY байт, чтобы большой архив не вытеснял полезный page cache.
+    """
+    if reader not in READERS:
+        raise ValueError(f"reader: {'|'.join(READERS)}")
+    h = hasher(algo)()
+    with open(p, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        if fadvise:
+            _fadvise(fd, 0, 0, 'SEQUENTIAL')
+        pos = dropped = 0
+        if reader == 'mmap':
+            size = os.fstat(fd).st_size
+            if size:
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    with memoryview(mm) as view:
+                        for pos in range(0, size, chunk):
+                            h.update(view[pos:pos + chunk])
+                            dropped = _drop_behind(fd, dropped, pos, fadvise)
+        elif reader == 'readinto':
+            buf = _buffer(chunk)
+            with memoryview(buf) as view:
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    h.update(view[:n])
+                    pos += n
+                    dropped = _drop_behind(fd, dropped, pos, fadvise)
+        else:
+            while True:
+                b = f.read(chunk)
+                if not b:
+                    break
+                h.update(b)
+                pos += len(b)
+                dropped = _drop_behind(fd, dropped, pos, fadvise)
+        if fadvise:
+            _fadvise(fd, dropped, 0, 'DONTNEED')
     return h.hexdigest()
 
 
-def find_duplicates(root: Path, min_size: int = 1, algo: str = 'md5') -> List[List[Tuple[Path, int]]]:
-    files = []
-    for p in root.rglob('*'):
-        if p.is_file():
-            try:
-                size = p.stat().st_size
-            except OSError:
-                continue
-            if size >= min_size:
-                files.append((p, size))
-
-    by_size = {}
-    for p, size in files:
-        by_size.setdefault(size, []).append(p)
-
-    groups = []
-    for size, same_size in by_size.items():
-        if len(same_size) < 2:
-            continue
-        by_hash = {}
-        for p in same_size:
+def bench_readers(path: Path, algo: str = 'md5', chunk: int = CHUNK, rounds: int = 3, cold: bool = False) -> Dict[str, float]:
+    """GB/s полного хеширования файла для каждого READERS (лучший из rounds).
+
+    cold — перед каждым прогоном сбрасывать страницы файла через DONTNEED;
+    иначе меряется чтение из page cache.
+    """
+    size = path.stat().st_size
+    result = {}
+    for reader in READERS:
+        best = float('inf')
+        for _ in range(rounds):
+            if cold:
+                with open(path, 'rb') as f:
+                    _fadvise(f.fileno(), 0, 0, 'DONTNEED')
+            t0 = time.perf_counter()
+            hash_file(str(path), algo, chunk, reader, fadvise=cold)
+            best = min(best, time.perf_counter() - t0)
+        result[reader] = size / best / 1e9
+    return result
+
+
+def sample_file(p: str, algo: str) -> str:
+    """Хеш первых и последних SAMPLE байт; файлы до 2*SAMPLE читаются целиком,
+    так что для них это уже точный хеш содержимого."""
+    h = hasher(algo)()
+    with open(p, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(0)
+        if size <= 2 * SAMPLE:
+            h.update(f.read())
+        else:
+            h.update(f.read(SAMPLE))
+            f.seek(-SAMPLE, os.SEEK_END)
+            h.update(f.read(SAMPLE))
+    return h.hexdigest()
+
+
+def _try_digest(fn, p: str, algo: str) -> Optional[str]:
+    try:
+        return fn(p, algo)
+    except OSError:
+        return None
+
+
+def _digest_paths(
+    fn,
+    paths: Sequence[str],
+    algo: str,
+    executor: Optional[Executor] = None,
+    tick: Optional[Callable[[str], None]] = None,
+) -> List[Optional[str]]:
+    if executor is None or len(paths) < 2:
+        results = (_try_digest(fn, p, algo) for p in paths)
+    else:
+        # map сохраняет порядок входа, поэтому группы совпадают с последовательным проходом
+        n = len(paths)
+        results = executor.map(_try_digest, [fn] * n, paths, [algo] * n, chunksize=8)
+    if tick is None:
+        return list(results)
+    out = []
+    for p, h in zip(paths, results):
+        out.append(h)
+        tick(p)
+    return out
+
+
+def digest_map(
+    fn,
+    kind: str,
+    files: Sequence[Tuple[str, int]],
+    algo: str,
+    executor: Optional[Executor],
+    cache: Optional[HashCache] = None,
+    stamps: Optional[Dict[str, Stamp]] = None,
+    progress: Optional[ScanProgress] = None,
+) -> Tuple[Dict[str, Optional[str]], int]:
+    """Хеши (path, size) через fn (sample_file/hash_file) с учётом кеша и число
+    реально прочитанных байт; недоступный файл получает None."""
+    known = {}
+    if cache is not None:
+        for p, _ in files:
+            h = cache.get(stamps[p], algo, kind)
+            if h is not None:
+                known[p] = h
+    todo = [(p, size) for p, size in files if p not in known]
+    read = sum(min(size, 2 * SAMPLE) if kind == 'sample' else size for _, size in todo)
+    todo_paths = [p for p, _ in todo]
+    tick = None
+    if progress is not None and kind == 'digest':
+        # полный хеш файла — единица прогресса; выборка начала/конца слишком мелкая
+        sizes = dict(files)
+        for p in known:
+            progress.resolve(sizes[p])
+        tick = lambda p: progress.resolve(sizes[p], sizes[p])
+    fresh = dict(zip(todo_paths, _digest_paths(fn, todo_paths, algo, executor, tick)))
+    if cache is not None:
+        cache.put_many(((stamps[p], h) for p, h in fresh.items() if h is not None), algo, kind)
+    known.update(fresh)
+    return known, read
+
+
+def _split_buckets(
+    fn,
+    kind: str,
+    buckets: List[Tuple[int, List[str]]],
+    algo: str,
+    executor: Optional[Executor],
+    cache: Optional[HashCache] = None,
+    stamps: Optional[Dict[str, Stamp]] = None,
+    progress: Optional[ScanProgress] = None,
+) -> Tuple[List[Tuple[int, List[str]]], int]:
+    # возвращает уточнённые корзины и число реально прочитанных байт
+    flat = [(p, size) for size, bucket in buckets for p in bucket]
+    known, read = digest_map(fn, kind, flat, algo, executor, cache, stamps, progress)
+    out = []
+    for size, bucket in buckets:
+        by_digest = {}
+        for p in bucket:
+            h = known[p]
+            if h is not None:
+                by_digest.setdefault(h, []).append(p)
+        out.extend((size, same) for same in by_digest.values() if len(same) > 1)
+    return out, read
+
+
+def _open_member(p: str):
+    # пропавший или недоступный файл просто выпадает из группы, а нехватка
+    # дескрипторов — ошибка: иначе группа молча «похудеет»
+    try:
+        return open(p, 'rb', buffering=0)
+    except OSError as e:
+        if e.errno in (errno.EMFILE, errno.ENFILE):
+            raise
+        return None
+
+
+def compare_group(paths: Sequence[str], chunk: int = CHUNK, max_open: int = MAX_OPEN) -> Tuple[List[List[str]], int]:
+    """Побайтовое сравнение файлов одного размера в ногу.
+
+    Файлы читаются по chunk байт с одного смещения; как только содержимое
+    расходится, группа делится, а файлы без пары закрываются и дальше не
+    читаются. Каждый файл читается не больше одного раза. Открытыми держится
+    не больше max_open файлов (меньше, если процесс упёрся в лимит
+    дескрипторов), остальные переоткрываются на нужном смещении для каждого
+    куска; EMFILE без своих открытых файлов — ошибка, а не пропуск.
+    Возвращает группы идентичных файлов (порядок путей сохраняется) и число
+    прочитанных байт.
+    """
+    handles = {}
+    order = {p: i for i, p in enumerate(paths)}
+    read = 0
+    done = []
+    pending = [(0, list(paths))] if len(paths) > 1 else []
+
+    def drop(members):
+        for p in members:
+            f = handles.pop(p, None)
+            if f is not None:
+                f.close()
+
+    def reopen(p):
+        # упёрлись в лимит дескрипторов процесса: отдаём половину своих и пробуем снова;
+        # ошибка — только если своих открытых уже нет
+        nonlocal max_open
+        while True:
             try:
-                h = _hash_file(p, algo)
+                return _open_member(p)
             except OSError:
-                continue
-            by_hash.setdefault(h, []).append(p)
-        for h, dupes in by_hash.items():
-            if len(dupes) > 1:
-                groups.append([(p, size) for p in dupes])
-    groups.sort(key=lambda g: g[0][1], reverse=True)
-    return groups
+                if not handles:
+                    raise
+                max_open = len(handles) // 2
+                drop(list(handles)[max_open:])
+
+    try:
+        while pending:
+            offset, group = pending.pop()
+            parts = []  # [(образец куска, [пути])]
+            for p in group:
+                f = handles.get(p)
+                kept = f is not None
+                if not kept:
+                    f = reopen(p)
+                    if f is None:
+                        continue
+                    kept = len(handles) < max_open
+                    if kept:
+                        handles[p] = f
+                try:
+                    if offset and (not kept or f.tell() != offset):
+                        f.seek(offset)
+                    b = f.read(chunk)
+                except OSError:
+                    drop([p])
+                    continue
+                finally:
+                    if not kept:
+                        f.close()
+                read += len(b)
+                for sample, members in parts:
+                    if b == sample:
+                        members.append(p)
+                        break
+                else:
+                    parts.append((b, [p]))
+            for b, members in parts:
+                if len(members) < 2 or not b:
+                    drop(members)
+                if len(members) < 2:
+                    continue
+                if b:
+                    pending.append((offset + len(b), members))
+                else:
+                    done.append(members)
+    finally:
+        drop(list(handles))
+    done.sort(key=lambda g: order[g[0]])
+    return done, read
+
+
+def _compare_buckets(
+    buckets: List[Tuple[int, List[str]]],
+    chunk: int,
+    executor: Optional[Executor],
+    progress: Optional[ScanProgress] = None,
+) -> Tuple[List[Tuple[int, List[str]]], int]:
+    if executor is None or len(buckets) < 2:
+        results = (compare_group(b, chunk) for _, b in buckets)
+    else:
+        results = executor.map(compare_group, [b for _, b in buckets], [chunk] * len(buckets))
+    out = []
+    read = 0
+    for (size, b), (groups, n) in zip(buckets, results):
+        out.extend((size, g) for g in groups)
+        read += n
+        if progress is not None:
+            progress.resolve(size * len(b), n)
+    return out, read
+
+
+def _count(buckets: Iterable[Tuple[int, Sequence]]) -> int:
+    return sum(len(b) for _, b in buckets)
+
+
+def _volume(buckets: Iterable[Tuple[int, Sequence]]) -> int:
+    return sum(size * len(b) for size, b in buckets)
+
+
+class ScanProgress:
+    """Ход скана для прогресс-бара и итоговой сводки.
+
+    Прогресс меряется в байтах: после этапа размера известен объём всех
+    файлов, у которых есть пара по размеру (bytes_total); файл засчитывается
+    в bytes_done, когда отсеян по выборке, взят из кеша или прочитан целиком.
+    callback(self) вызывается не чаще раза в interval секунд и всегда — при
+    смене этапа и в конце (stage == 'done').
+    """
+
+    WORK = ('sample', 'hash', 'compare')
+
+    def __init__(self, callback: Optional[Callable[[ScanProgress], None]] = None, interval: float = 0.2):
+        self.callback = callback
+        self.interval = interval
+        self.stage = 'walk'
+        self.files_walked = 0
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.bytes_read = 0
+        self.timings: Dict[str, float] = {}
+        self.started = self._stage_start = time.perf_counter()
+        self._last = 0.0
+
+    def _emit(self, force: bool = False) -> None:
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            self.callback(self)
+
+    def enter(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.timings[self.stage] = self.timings.get(self.stage, 0.0) + now - self._stage_start
+        self._stage_start = now
+        changed = stage != self.stage
+        self.stage = stage
+        self._emit(force=changed)
+
+    def walked(self) -> None:
+        self.files_walked += 1
+        self._emit()
+
+    def resolve(self, done: int, read: int = 0) -> None:
+        self.bytes_done += done
+        self.bytes_read += read
+        self._emit()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _work_time(self) -> float:
+        t = sum(self.timings.get(s, 0.0) for s in self.WORK)
+        if self.stage in self.WORK:
+            t += time.perf_counter() - self._stage_start
+        return t
+
+    @property
+    def gbps(self) -> float:
+        t = self._work_time()
+        return self.bytes_read / t / 1e9 if t else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        # по темпу разрешения байт, а не чтения: отсев по выборке тоже продвигает скан
+        t = self._work_time()
+        if self.stage == 'done':
+            return 0.0
+        if not t or not self.bytes_done:
+            return None
+        return (self.bytes_total - self.bytes_done) * t / self.bytes_done
+
+    def as_dict(self) -> dict:
+        return {
+            'stage': self.stage,
+            'files_walked': self.files_walked,
+            'bytes_total': self.bytes_total,
+            'bytes_done': self.bytes_done,
+            'bytes_read': self.bytes_read,
+            'elapsed': round(self.elapsed, 3),
+            'gbps': round(self.gbps, 3),
+            'eta': self.eta,
+            'timings': {k: round(v, 3) for k, v in self.timings.items()},
+        }
+
+
+def build_inventory(
+    root: Path,
+    min_size: int = 1,
+    stats: Optional[dict] = None,
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = False,
+    one_filesystem: bool = False,
+    prune: Iterable[str] = PRUNE_DIRS,
+    workers: int = 1,
+    progress: Optional[ScanProgress] = None,
+) -> Inventory:
+    if stats is None:
+        stats = dict.fromkeys(STAT_KEYS, 0)
+    inv = Inventory()
+    inodes = set()
+    for top, name, st in walk_entries(root, exclude, skip_hidden, one_filesystem, prune, workers):
+        if progress is not None:
+            progress.walked()
+        if st.st_size >= min_size:
+            stats['files'] += 1
+            # жёсткие ссылки на уже встреченный inode — это не дубликаты:
+            # их не хешируем и не считаем освобождаемым местом
+            if st.st_nlink > 1:
+                if (st.st_dev, st.st_ino) in inodes:
+                    stats['hardlinked'] += 1
+                    continue
+                inodes.add((st.st_dev, st.st_ino))
+            inv.add(top, name, st.st_size, st.st_dev, st.st_ino, st.st_mtime_ns)
+    return inv
+
+
+def iter_duplicates(
+    root: Path,
+    min_size: int = 1,
+    algo: str = 'md5',
+    workers: int = 1,
+    pool: str = 'thread',
+    stats: Optional[dict] = None,
+    cache: Optional[HashCache] = None,
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = False,
+    one_filesystem: bool = False,
+    prune: Iterable[str] = PRUNE_DIRS,
+    chunk: int = CHUNK,
+    reader: str = 'readinto',
+    fadvise: bool = True,
+    verify: bool = False,
+    progress: Optional[Callable[[ScanProgress], None]] = None,
+) -> Iterator[List[Tuple[Path, int]]]:
+    """Группы дубликатов по мере готовности, от больших файлов к меньшим.
+
+    После обхода дерева корзины одного размера обрабатываются пачками по
+    BATCH файлов, и группа отдаётся сразу, как только её пачка разрешена;
+    готовые группы нигде не накапливаются. stats заполняется по ходу.
+    verify — вместо полного хеша сравнивать кандидатов побайтово (compare_group).
+    progress(ScanProgress) — счётчики, скорость и ETA по ходу скана.
+    """
+    hasher(algo)
+    if reader not in READERS:
+        raise ValueError(f"reader: {'|'.join(READERS)}")
+    full = partial(hash_file, chunk=chunk, reader=reader, fadvise=fadvise)
+    if stats is None:
+        stats = {}
+    stats.update(dict.fromkeys(STAT_KEYS, 0))
+    prog = ScanProgress(progress) if progress is not None else None
+
+    inv = build_inventory(root, min_size, stats, exclude, skip_hidden, one_filesystem, prune, workers, prog)
+
+    size_buckets = deque(inv.size_buckets())
+    stats['size_eliminated'] = len(inv) - _count(size_buckets)
+    if prog is not None:
+        prog.bytes_total = _volume(size_buckets)
+
+    # этапы: размер -> хеш начала+конца -> полный хеш (только то, что ещё совпадает)
+    executor = make_executor(workers, pool)
+    hits0 = cache.hits if cache is not None else 0
+    misses0 = cache.misses if cache is not None else 0
+    try:
+        while size_buckets:
+            indexed = [size_buckets.popleft()]
+            n = len(indexed[0][1])
+            while size_buckets and n + len(size_buckets[0][1]) <= BATCH:
+                n += len(size_buckets[0][1])
+                indexed.append(size_buckets.popleft())
+            # пути и stat-ключи восстанавливаем только для текущей пачки
+            batch = []
+            stamps = {} if cache is not None else None
+            for size, idx in indexed:
+                paths = [inv.path(i) for i in idx]
+                batch.append((size, paths))
+                if stamps is not None:
+                    stamps.update(zip(paths, map(inv.stamp, idx)))
+
+            if prog is not None:
+                prog.enter('sample')
+            sample_buckets, sample_read = _split_buckets(sample_file, 'sample', batch, algo, executor, cache, stamps)
+            if verify:
+                # полный хеш не нужен: побайтовое сравнение и так читает каждый файл один раз
+                exact = []
+                to_hash = sample_buckets
+            else:
+                exact = [b for b in sample_buckets if b[0] <= 2 * SAMPLE]
+                to_hash = [b for b in sample_buckets if b[0] > 2 * SAMPLE]
+            if prog is not None:
+                prog.resolve(_volume(batch) - _volume(to_hash), sample_read)
+                prog.enter('compare' if verify else 'hash')
+            if verify:
+                hash_buckets, hash_read = _compare_buckets(to_hash, chunk, executor, prog)
+            else:
+                hash_buckets, hash_read = _split_buckets(full, 'digest', to_hash, algo, executor, cache, stamps, prog)
+            # пути в группе по имени: group[0] (его оставляет dedupe_group) не зависит от workers и pool
+            found = sorted(((size, sorted(g)) for size, g in exact + hash_buckets), key=lambda b: (-b[0], b[1][0]))
+
+            stats['sample_eliminated'] += n - _count(sample_buckets)
+            stats['hash_eliminated'] += _count(to_hash) - _count(hash_buckets)
+            stats['groups'] += len(found)
+            stats['duplicates'] += _count(found)
+            stats['bytes_sampled'] += sample_read
+            stats['bytes_hashed'] += hash_read
+            if cache is not None:
+                stats['cache_hits'] = cache.hits - hits0
+                stats['cache_misses'] = cache.misses - misses0
+
+            for size, b in found:
+                yield [(Path(p), size) for p in b]
+        if prog is not None:
+            prog.enter('done')
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def find_duplicates(
+    root: Path,
+    min_size: int = 1,
+    algo: str = 'md5',
+    workers: int = 1,
+    pool: str = 'thread',
+    stats: Optional[dict] = None,
+    cache: Optional[HashCache] = None,
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = False,
+    one_filesystem: bool = False,
+    prune: Iterable[str] = PRUNE_DIRS,
+    chunk: int = CHUNK,
+    reader: str = 'readinto',
+    fadvise: bool = True,
+    verify: bool = False,
+    progress: Optional[Callable[[ScanProgress], None]] = None,
+) -> List[List[Tuple[Path, int]]]:
+    return list(iter_duplicates(
+        root, min_size, algo, workers, pool, stats, cache, exclude, skip_hidden, one_filesystem, prune,
+        chunk, reader, fadvise, verify, progress,
+    ))
@@ -0,0 +1,83 @@
+
+from __future__ import annotations
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+
+KINDS = ('sample', 'digest')
+
+# (st_dev, st_ino, st_size, st_mtime_ns)
+Stamp = Tuple[int, int, int, int]
+
+
+def default_cache_path() -> Path:
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'devutils' / 'hashes.sqlite'
+
+
+def stamp_of(st: os.stat_result) -> Stamp:
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class HashCache:
+    """Хеши файлов между запусками dupes.
+
+    Запись ищется по (dev, inode, algo) и считается валидной, только если
+    size и mtime_ns совпадают с текущим stat; иначе она перезаписывается.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(str(path))
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS hashes ('
+            ' dev INTEGER NOT NULL, ino INTEGER NOT NULL, algo TEXT NOT NULL,'
+            ' size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,'
+            ' sample TEXT, digest TEXT,'
+            ' PRIMARY KEY (dev, ino, algo)) WITHOUT ROWID'
+        )
+        self._db.commit()
+
+    def get(self, stamp: Stamp, algo: str, kind: str) -> Optional[str]:
+        if kind not in KINDS:
+            raise ValueError(f"kind: {'|'.join(KINDS)}")
+        dev, ino, size, mtime_ns = stamp
+        row = self._db.execute(
+            f'SELECT {kind} FROM hashes WHERE dev=? AND ino=? AND algo=? AND size=? AND mtime_ns=?',
+            (dev, ino, algo, size, mtime_ns),
+        ).fetchone()
+        if row is None or row[0] is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put_many(self, rows: Iterable[Tuple[Stamp, str]], algo: str, kind: str) -> None:
+        if kind not in KINDS:
+            raise ValueError(f"kind: {'|'.join(KINDS)}")
+        other = KINDS[1 - KINDS.index(kind)]
+        # при смене size/mtime второй хеш той же записи больше не валиден
+        self._db.executemany(
+            f'INSERT INTO hashes (dev, ino, algo, size, mtime_ns, {kind}) VALUES (?, ?, ?, ?, ?, ?) '
+            f'ON CONFLICT (dev, ino, algo) DO UPDATE SET '
+            f'{other} = CASE WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns THEN {other} END, '
+            f'size = excluded.size, mtime_ns = excluded.mtime_ns, {kind} = excluded.{kind}',
+            ((dev, ino, algo, size, mtime_ns, value) for (dev, ino, size, mtime_ns), value in rows),
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> HashCache:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,164 @@
+
+from __future__ import annotations
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# лог-линейные корзины в духе HdrHistogram: значения в микросекундах, на каждую
+# степень двойки SUB корзин одинаковой ширины -> относительная ошибка < 1/SUB
+SUB_BITS = 6
+SUB = 1 << SUB_BITS
+MAX_US = (1 << 36) - 1  # ~19 часов; больше — в последнюю корзину
+_SIZE = (MAX_US.bit_length() - SUB_BITS + 1) * SUB
+PERCENTILES = {50: 'p50_ms', 90: 'p90_ms', 99: 'p99_ms', 99.9: 'p999_ms'}
+
+
+def _index(us: int) -> int:
+    if us < SUB:
+        return us
+    shift = us.bit_length() - SUB_BITS - 1
+    return (shift + 1) * SUB + (us >> shift) - SUB
+
+
+def _bounds(i: int) -> Tuple[int, int]:
+    # [нижняя, верхняя) граница корзины в микросекундах
+    if i < SUB:
+        return i, i + 1
+    shift = i // SUB - 1
+    low = (i % SUB + SUB) << shift
+    return low, low + (1 << shift)
+
+
+class LatencyHistogram:
+    """Потоковая статистика задержек за O(1) памяти (~16 КБ при любом числе замеров).
+
+    Перцентили берутся из лог-линейных корзин с погрешностью < 1/64 (~1.6%);
+    count/min/max/mean точные, stddev — по Уэлфорду, jitter — средний модуль
+    разности соседних замеров (как у ping). Гистограммы можно складывать (merge).
+    """
+
+    __slots__ = ('counts', 'count', 'min', 'max', '_mean', '_m2', '_last', '_jitter_sum')
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * _SIZE))
+        self.count = 0
+        self.min = math.inf
+        self.max = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._last: Optional[float] = None
+        self._jitter_sum = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[_index(min(max(int(ms * 1000), 0), MAX_US))] += 1
+        self.count += 1
+        if ms < self.min:
+            self.min = ms
+        if ms > self.max:
+            self.max = ms
+        delta = ms - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (ms - self._mean)
+        if self._last is not None:
+            self._jitter_sum += abs(ms - self._last)
+        self._last = ms
+
+    def merge(self, other: LatencyHistogram) -> None:
+        if not other.count:
+            return
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        n = self.count + other.count
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / n
+        self._mean += delta * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        # jitter считается внутри каждой серии; стык серий не учитываем
+        self._jitter_sum += other._jitter_sum
+        self._last = other._last
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.count else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def jitter(self) -> float:
+        return self._jitter_sum / (self.count - 1) if self.count > 1 else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Значение q-го перцентиля (0..100), мс: середина корзины, в пределах [min, max]."""
+        return self.percentiles((q,))[q]
+
+    def percentiles(self, qs: Iterable[float]) -> Dict[float, float]:
+        # один проход по корзинам на все перцентили сразу
+        qs = sorted(qs)
+        out = {}
+        if not self.count:
+            return {q: 0.0 for q in qs}
+        ranks = [(q, max(1, math.ceil(q / 100 * self.count))) for q in qs]
+        seen = 0
+        k = 0
+        for i, c in enumerate(self.counts):
+            if not c:
+                continue
+            seen += c
+            while k < len(ranks) and seen >= ranks[k][1]:
+                low, high = _bounds(i)
+                out[ranks[k][0]] = min(max((low + high) / 2000, self.min), self.max)
+                k += 1
+            if k == len(ranks):
+                break
+        return out
+
+    def buckets(self) -> List[Tuple[float, float, int]]:
+        """Непустые корзины: (от, до, число) в мс."""
+        out = []
+        for i, c in enumerate(self.counts):
+            if c:
+                low, high = _bounds(i)
+                out.append((low / 1000, high / 1000, c))
+        return out
+
+    def rows(self, n: int = 12) -> List[Tuple[float, float, int]]:
+        return histogram_rows(self.buckets(), n)
+
+    def summary(self) -> Dict[str, float]:
+        """min/avg/max, перцентили PERCENTILES, stddev и jitter — ключи *_ms, как в stats пинга."""
+        out = {'min_ms': self.min if self.count else 0.0, 'avg_ms': self.mean, 'max_ms': self.max}
+        for q, v in self.percentiles(PERCENTILES).items():
+            out[PERCENTILES[q]] = v
+        out['stddev_ms'] = self.stddev
+        out['jitter_ms'] = self.jitter
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            'unit': 'ms',
+            'sub_buckets': SUB,
+            'count': self.count,
+            'buckets': [[low, high, c] for low, high, c in self.buckets()],
+        }
+
+
+def histogram_rows(buckets: List[Tuple[float, float, int]], n: int = 12) -> List[Tuple[float, float, int]]:
+    """Корзины (от, до, число), слитые в n строк равной ширины в лог-шкале, — для текстовой гистограммы."""
+    if not buckets:
+        return []
+    lo = math.log(max(buckets[0][0], 0.001))
+    hi = math.log(buckets[-1][1])
+    step = (hi - lo) / n or 1.0
+    rows = [[math.exp(lo + k * step), math.exp(lo + (k + 1) * step), 0] for k in range(n)]
+    for low, _, c in buckets:
+        k = min(int((math.log(max(low, 0.001)) - lo) / step), n - 1)
+        rows[k][2] += c
+    rows[0][0] = buckets[0][0]
+    rows[-1][1] = buckets[-1][1]
+    return [tuple(r) for r in rows]
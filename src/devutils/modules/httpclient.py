@@ -0,0 +1,361 @@
+
+from __future__ import annotations
+import asyncio
+import base64
+import os
+import socket
+import ssl
+import time
+import urllib.request
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+
+# минимальный HTTP/1.1-клиент на asyncio-потоках: только то, что нужно пингу —
+# статус и время по фазам; тело читается и выбрасывается. Из поведения requests
+# сохранены перенаправления, прокси из окружения и REQUESTS_CA_BUNDLE
+READ_CHUNK = 64 * 1024
+USER_AGENT = 'devutils-ping'
+METHODS = ('GET', 'HEAD')
+PHASES = ('dns', 'connect', 'tls', 'ttfb')
+REDIRECTS = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 10
+
+_ssl_context: Optional[Tuple[Optional[str], ssl.SSLContext]] = None
+_PROXY_ENV = ('http_proxy', 'https_proxy', 'all_proxy', 'no_proxy')
+_proxy_env: Optional[tuple] = None
+_proxies: Dict[Tuple[str, str], Optional[Proxy]] = {}
+
+Target = Tuple[str, str, int, str]  # (scheme, host, port, путь с query)
+Conn = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+def _ssl() -> ssl.SSLContext:
+    # как в requests: REQUESTS_CA_BUNDLE или CURL_CA_BUNDLE (файл или каталог), иначе системные корни
+    global _ssl_context
+    bundle = os.environ.get('REQUESTS_CA_BUNDLE') or os.environ.get('CURL_CA_BUNDLE') or None
+    if _ssl_context is None or _ssl_context[0] != bundle:
+        if bundle is not None and os.path.isdir(bundle):
+            context = ssl.create_default_context(capath=bundle)
+        else:
+            context = ssl.create_default_context(cafile=bundle)
+        _ssl_context = bundle, context
+    return _ssl_context[1]
+
+
+def parse_url(url: str) -> Target:
+    parts = urlsplit(url if '://' in url else f'http://{url}')
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError(f"url: {url}")
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    return parts.scheme, parts.hostname, port, path
+
+
+def _basic(header: str, url: str) -> str:
+    # логин:пароль из URL — готовая строка заголовка Basic, как делает requests; без логина — ''
+    parts = urlsplit(url if '://' in url else f'http://{url}')
+    if parts.username is None:
+        return ''
+    user = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+    return f"{header}: Basic {base64.b64encode(user.encode()).decode()}\r\n"
+
+
+class Proxy:
+    """HTTP-прокси: адрес и готовый заголовок Proxy-Authorization (если в URL есть логин)."""
+
+    __slots__ = ('url', 'host', 'port', 'auth')
+
+    def __init__(self, url: str):
+        parts = urlsplit(url if '://' in url else f'http://{url}')
+        if parts.scheme != 'http' or not parts.hostname:
+            raise ValueError(f"proxy: только http://host:port, а не {url}")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.auth = _basic('Proxy-Authorization', url)
+
+
+def proxy_for(scheme: str, host: str) -> Optional[Proxy]:
+    """Прокси из окружения (HTTP_PROXY, HTTPS_PROXY, ALL_PROXY с учётом NO_PROXY) или None."""
+    # getproxies + proxy_bypass — ~150 мкс, а это на каждый запрос генератора нагрузки:
+    # решение кешируется по цели, пока те же переменные окружения
+    global _proxy_env
+    env = tuple(os.environ.get(name) or os.environ.get(name.upper()) for name in _PROXY_ENV)
+    if env != _proxy_env:
+        _proxy_env = env
+        _proxies.clear()
+    key = (scheme, host)
+    if key not in _proxies:
+        proxies = urllib.request.getproxies()
+        url = proxies.get(scheme) or proxies.get('all')
+        _proxies[key] = Proxy(url) if url and not urllib.request.proxy_bypass(host) else None
+    return _proxies[key]
+
+
+def check_proxies(urls: Iterable[str]) -> None:
+    """Проверить прокси из окружения для всех целей до первого запроса.
+
+    Неподдерживаемый прокси (https://, socks5://) — ValueError сразу, а не
+    ошибка соединения на каждом замере. Сами неверные URL не проверяются:
+    они остаются ошибками своих целей.
+    """
+    for url in urls:
+        try:
+            scheme, host, _, _ = parse_url(url)
+        except ValueError:
+            continue
+        proxy_for(scheme, host)
+
+
+class ConnectionPool:
+    """Keep-alive соединения по (scheme, host, port): стек простаивающих на ключ.
+
+    Живёт в одном event loop. Соединение возвращается в пул, только если
+    ответ дочитан до конца и сервер не просил Connection: close.
+    """
+
+    def __init__(self, max_idle: int = 8):
+        self.max_idle = max_idle
+        self._idle: Dict[tuple, List[Conn]] = {}
+
+    def get(self, key: tuple) -> Optional[Conn]:
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+
+    def put(self, key: tuple, conn: Conn) -> None:
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.max_idle:
+            idle.append(conn)
+        else:
+            conn[1].close()
+
+    def close(self) -> None:
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+def _ms(since: float) -> float:
+    return (time.perf_counter() - since) * 1000.0
+
+
+async def _tunnel(sock: socket.socket, host: str, port: int, proxy: Proxy) -> None:
+    # CONNECT на сыром сокете; ответ прокси читаем только до пустой строки —
+    # дальше по туннелю пойдёт TLS
+    loop = asyncio.get_running_loop()
+    authority = f'[{host}]:{port}' if ':' in host else f'{host}:{port}'
+    await loop.sock_sendall(sock, (
+        f"CONNECT {authority} HTTP/1.1\r\nHost: {authority}\r\n{proxy.auth}\r\n"
+    ).encode('latin-1'))
+    data = b''
+    while b'\r\n\r\n' not in data:
+        part = await loop.sock_recv(sock, 4096)
+        if not part or len(data) > 65536:
+            raise OSError(f"прокси {proxy.host}:{proxy.port} оборвал CONNECT")
+        data += part
+    line = data.split(b'\r\n', 1)[0]
+    fields = line.split(None, 2)
+    if len(fields) < 2 or fields[1] != b'200':
+        raise OSError(f"прокси {proxy.host}:{proxy.port}: CONNECT {line[:80]!r}")
+
+
+async def _connect(scheme: str, host: str, port: int, timings: Dict[str, float], proxy: Optional[Proxy] = None) -> Conn:
+    # фазы по отдельности: getaddrinfo, TCP connect, TLS-рукопожатие на готовом сокете;
+    # через прокси dns и connect — до прокси, CONNECT-туннель входит в connect
+    loop = asyncio.get_running_loop()
+    peer = (host, port) if proxy is None else (proxy.host, proxy.port)
+    t = time.perf_counter()
+    infos = await loop.getaddrinfo(*peer, type=socket.SOCK_STREAM)
+    timings['dns'] = _ms(t)
+    t = time.perf_counter()
+    sock = None
+    error: Optional[OSError] = None
+    for family, type_, proto, _, addr in infos:
+        sock = socket.socket(family, type_, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, addr)
+            break
+        except BaseException as e:
+            sock.close()
+            sock = None
+            if not isinstance(e, OSError):
+                raise
+            error = e
+    if sock is None:
+        raise error or OSError(f"нет адресов для {peer[0]}")
+    try:
+        if proxy is not None and scheme == 'https':
+            await _tunnel(sock, host, port, proxy)
+        timings['connect'] = _ms(t)
+        t = time.perf_counter()
+        if scheme == 'https':
+            conn = await asyncio.open_connection(sock=sock, ssl=_ssl(), server_hostname=host)
+            timings['tls'] = _ms(t)
+            return conn
+        return await asyncio.open_connection(sock=sock)
+    except BaseException:
+        sock.close()
+        raise
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+    line = await reader.readline()
+    fields = line.split(None, 2)
+    if len(fields) < 2 or not fields[0].startswith(b'HTTP/') or not fields[1].isdigit():
+        raise ValueError(f"плохая строка статуса: {line[:80]!r}")
+    status = int(fields[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return status, headers
+
+
+async def _discard(reader: asyncio.StreamReader, n: int) -> None:
+    while n > 0:
+        data = await reader.read(min(n, READ_CHUNK))
+        if not data:
+            raise ValueError("соединение закрыто посреди тела")
+        n -= len(data)
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str], method: str, status: int) -> bool:
+    """Прочитать и выбросить тело; True, если соединение можно использовать повторно."""
+    if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        return True
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+            if not size:
+                # трейлеры до пустой строки
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return True
+            await _discard(reader, size + 2)
+    length = headers.get('content-length')
+    if length is not None:
+        await _discard(reader, int(length))
+        return True
+    while await reader.read(READ_CHUNK):
+        pass
+    return False
+
+
+async def _fetch(url: str, method: str, pool: Optional[ConnectionPool], timings: dict) -> Tuple[int, Optional[str]]:
+    # один обмен без перенаправлений: (статус, Location)
+    scheme, host, port, path = parse_url(url)
+    proxy = proxy_for(scheme, host)
+    key = (scheme, host, port, proxy and proxy.url)
+    authority = f'[{host}]' if ':' in host else host
+    if port != (443 if scheme == 'https' else 80):
+        authority += f':{port}'
+    target, extra = path, _basic('Authorization', url)
+    if proxy is not None and scheme == 'http':
+        # обычный HTTP через прокси — абсолютный URL в строке запроса, без туннеля
+        target, extra = f'http://{authority}{path}', extra + proxy.auth
+    head = (
+        f"{method} {target} HTTP/1.1\r\nHost: {authority}\r\nUser-Agent: {USER_AGENT}\r\nAccept: */*\r\n{extra}"
+        f"Connection: {'keep-alive' if pool is not None else 'close'}\r\n\r\n"
+    ).encode('latin-1')
+    timings.update(dict.fromkeys(PHASES, 0.0), reused=0)
+
+    async def exchange(conn: Conn) -> Tuple[int, bool, Optional[str]]:
+        reader, writer = conn
+        writer.write(head)
+        await writer.drain()
+        t = time.perf_counter()
+        status, headers = await _read_headers(reader)
+        timings['ttfb'] = _ms(t)
+        reusable = await _read_body(reader, headers, method, status)
+        return status, reusable and headers.get('connection', '').lower() != 'close', headers.get('location')
+
+    conn = pool.get(key) if pool is not None else None
+    if conn is not None:
+        try:
+            status, reusable, location = await exchange(conn)
+            timings['reused'] = 1
+        except (OSError, ValueError):
+            # сервер успел закрыть простаивающее соединение — пробуем на новом
+            conn[1].close()
+            conn = None
+        except BaseException:
+            conn[1].close()
+            raise
+    if conn is None:
+        conn = await _connect(scheme, host, port, timings, proxy)
+        try:
+            status, reusable, location = await exchange(conn)
+        except BaseException:
+            conn[1].close()
+            raise
+    if pool is not None and reusable:
+        pool.put(key, conn)
+    else:
+        conn[1].close()
+    return status, location
+
+
+async def request(
+    url: str,
+    method: str = 'GET',
+    timeout: float = 3.0,
+    pool: Optional[ConnectionPool] = None,
+    timings: Optional[dict] = None,
+    max_redirects: int = MAX_REDIRECTS,
+) -> int:
+    """Один запрос; возвращает HTTP-статус (после перенаправлений — конечный).
+
+    timings заполняется по ходу (мс): dns, connect, tls — на новом соединении
+    (при повторном из pool остаются нулями и reused = 1), ttfb — от отправки
+    запроса до строки статуса. Заполненные фазы остаются и при ошибке.
+    Без pool соединение закрывается после ответа (Connection: close).
+
+    Перенаправления (301/302/303/307/308 с Location) выполняются, как в
+    requests, но не больше max_redirects (0 — вернуть сам 3xx): фазы в
+    timings — суммы по переходам, timings['hops'] — url, статус и фазы
+    каждого перехода, timings['redirects'] — их число. timeout — на весь
+    запрос вместе с переходами. Прокси (HTTP_PROXY, HTTPS_PROXY, ALL_PROXY,
+    NO_PROXY) и REQUESTS_CA_BUNDLE берутся из окружения, как в requests;
+    логин и пароль из url уходят заголовком Authorization: Basic.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method: {'|'.join(METHODS)}")
+    if timings is None:
+        timings = {}
+    timings.update(dict.fromkeys(PHASES, 0.0), reused=0, redirects=0)
+    hops: List[dict] = []
+    timings['hops'] = hops
+
+    async def run() -> int:
+        current = url if '://' in url else f'http://{url}'
+        while True:
+            hop = {'url': current, 'status': None}
+            hops.append(hop)
+            try:
+                status, location = await _fetch(current, method, pool, hop)
+            finally:
+                for phase in PHASES:
+                    timings[phase] += hop.get(phase, 0.0)
+                timings['reused'] = int(all(h.get('reused') for h in hops))
+            hop['status'] = status
+            if status not in REDIRECTS or not location or not max_redirects:
+                return status
+            if len(hops) > max_redirects:
+                raise ValueError(f"больше {max_redirects} перенаправлений: {url}")
+            timings['redirects'] += 1
+            current = urljoin(current, location)
+
+    return await asyncio.wait_for(run(), timeout)
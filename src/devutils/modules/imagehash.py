@@ -0,0 +1,187 @@
+
+from __future__ import annotations
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from devutils.modules.pools import make_executor
+from devutils.modules.walker import PRUNE_DIRS, walk_entries
+
+
+PHASHES = ('ahash', 'dhash', 'phash')
+IMAGE_EXTS = frozenset(('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tif', '.tiff'))
+
+# pHash: DCT-II по 32x32, берём угол 8x8 низких частот
+_DCT_N = 32
+_DCT = tuple(
+    tuple(math.cos(math.pi * (2 * x + 1) * u / (2 * _DCT_N)) for x in range(_DCT_N))
+    for u in range(8)
+)
+
+Group = List[Tuple[Path, int]]
+
+
+def _gray(img: Image.Image, w: int, h: int) -> List[int]:
+    # draft: JPEG декодируется сразу в уменьшенном масштабе (1/2..1/8) — в разы быстрее
+    img.draft('L', (w * 4, h * 4))
+    return list(img.convert('L').resize((w, h), Image.Resampling.BOX).getdata())
+
+
+def _bits(flags: Iterable[bool]) -> int:
+    h = 0
+    for f in flags:
+        h = (h << 1) | f
+    return h
+
+
+def _ahash(img: Image.Image) -> int:
+    px = _gray(img, 8, 8)
+    mean = sum(px) / 64
+    return _bits(p > mean for p in px)
+
+
+def _dhash(img: Image.Image) -> int:
+    px = _gray(img, 9, 8)
+    return _bits(px[r * 9 + c] > px[r * 9 + c + 1] for r in range(8) for c in range(8))
+
+
+def _phash(img: Image.Image) -> int:
+    px = _gray(img, _DCT_N, _DCT_N)
+    rows = [px[y * _DCT_N:(y + 1) * _DCT_N] for y in range(_DCT_N)]
+    # раздельная DCT: сначала по строкам (8 коэффициентов), затем по столбцам
+    by_row = [[sum(c * p for c, p in zip(basis, row)) for basis in _DCT] for row in rows]
+    low = [sum(basis[y] * by_row[y][u] for y in range(_DCT_N)) for basis in _DCT for u in range(8)]
+    med = sorted(low)[32]
+    return _bits(v > med for v in low)
+
+
+_METHODS = {'ahash': _ahash, 'dhash': _dhash, 'phash': _phash}
+
+
+def image_hash(path: str, method: str = 'dhash') -> int:
+    """64-битный перцептивный хеш изображения."""
+    fn = _METHODS.get(method)
+    if fn is None:
+        raise ValueError(f"method: {'|'.join(PHASHES)}")
+    with Image.open(path) as img:
+        return fn(img)
+
+
+def _try_image_hash(args: Tuple[str, str]) -> Optional[int]:
+    try:
+        return image_hash(*args)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+class BKTree:
+    """BK-дерево по расстоянию Хэмминга между 64-битными хешами.
+
+    Поиск в радиусе r обходит только поддеревья с расстоянием до узла в
+    [d - r, d + r] (неравенство треугольника), так что при малых r он
+    просматривает долю дерева, а не все N хешей. Одинаковые хеши
+    собираются в один узел.
+    """
+
+    __slots__ = ('_root', 'size')
+
+    def __init__(self):
+        self._root: Optional[list] = None
+        self.size = 0
+
+    def add(self, h: int, item) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = [h, [item], {}]
+            return
+        node = self._root
+        while True:
+            d = (h ^ node[0]).bit_count()
+            if not d:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [h, [item], {}]
+                return
+            node = child
+
+    def search(self, h: int, radius: int) -> List[Tuple[int, object]]:
+        """Все элементы на расстоянии не больше radius: [(расстояние, элемент)]."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            d = (h ^ node[0]).bit_count()
+            if d <= radius:
+                found.extend((d, item) for item in node[1])
+            for dist, child in node[2].items():
+                if d - radius <= dist <= d + radius:
+                    stack.append(child)
+        return found
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_similar_images(
+    root: Path,
+    method: str = 'dhash',
+    distance: int = 6,
+    min_size: int = 1,
+    workers: int = 1,
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = False,
+    one_filesystem: bool = False,
+    prune: Iterable[str] = PRUNE_DIRS,
+) -> Iterator[Group]:
+    """Группы похожих изображений (перекодированные, пережатые, уменьшенные копии).
+
+    Файлы попадают в одну группу, если связаны цепочкой пар с расстоянием
+    Хэмминга хешей не больше distance. Декодирование идёт в пуле процессов
+    (workers > 1); каждый новый хеш ищет соседей в BKTree до вставки.
+    Группы — от больших файлов к меньшим, внутри группы первым идёт самый
+    крупный файл (обычно оригинал).
+    """
+    if method not in _METHODS:
+        raise ValueError(f"method: {'|'.join(PHASHES)}")
+    files: List[Tuple[str, int]] = []
+    for top, name, st in walk_entries(root, exclude, skip_hidden, one_filesystem, prune, workers):
+        if st.st_size >= min_size and os.path.splitext(name)[1].lower() in IMAGE_EXTS:
+            files.append((os.path.join(top, name), st.st_size))
+
+    tree = BKTree()
+    parent = list(range(len(files)))
+    executor = make_executor(workers, 'process')
+    try:
+        jobs = [(p, method) for p, _ in files]
+        hashes = executor.map(_try_image_hash, jobs, chunksize=16) if executor is not None else map(_try_image_hash, jobs)
+        for i, h in enumerate(hashes):
+            if h is None:
+                continue
+            for _, j in tree.search(h, distance):
+                a, b = _find(parent, i), _find(parent, j)
+                if a != b:
+                    parent[a] = b
+            tree.add(h, i)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    members: Dict[int, List[int]] = {}
+    for i in range(len(files)):
+        members.setdefault(_find(parent, i), []).append(i)
+    groups = []
+    for ids in members.values():
+        if len(ids) > 1:
+            ids.sort(key=lambda i: files[i][1], reverse=True)
+            groups.append([(Path(files[i][0]), files[i][1]) for i in ids])
+    groups.sort(key=lambda g: g[0][1], reverse=True)
+    yield from groups
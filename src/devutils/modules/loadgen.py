@@ -0,0 +1,195 @@
+
+from __future__ import annotations
+import asyncio
+import contextlib
+import multiprocessing
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional
+
+from devutils.modules.histogram import LatencyHistogram
+from devutils.modules.httpclient import METHODS, ConnectionPool, check_proxies, request
+
+
+_RATE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(?:/\s*(s|sec|m|min|h))?\s*$')
+_DURATION = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$')
+_PER_SECOND = {None: 1, 's': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600}
+_SECONDS = {None: 1, 'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_rate(text: str) -> float:
+    """'500/s', '30000/m', '20' -> запросов в секунду."""
+    m = _RATE.match(text)
+    if not m or not float(m.group(1)):
+        raise ValueError(f"rate: N/s|N/m|N/h, а не {text!r}")
+    return float(m.group(1)) / _PER_SECOND[m.group(2)]
+
+
+def parse_duration(text: str) -> float:
+    """'60s', '5m', '1500ms', '90' -> секунды."""
+    m = _DURATION.match(text)
+    if not m or not float(m.group(1)):
+        raise ValueError(f"duration: Nms|Ns|Nm|Nh, а не {text!r}")
+    return float(m.group(1)) * _SECONDS[m.group(2)]
+
+
+async def load_async(
+    url: str,
+    rate: float,
+    duration: float,
+    workers: int = 64,
+    timeout: float = 3.0,
+    keepalive: bool = True,
+    method: str = 'GET',
+) -> dict:
+    if method not in METHODS:
+        raise ValueError(f"method: {'|'.join(METHODS)}")
+    check_proxies([url])
+    queue: asyncio.Queue = asyncio.Queue()
+    latency = LatencyHistogram()
+    service = LatencyHistogram()
+    statuses: Dict[str, int] = {}
+    counters = {'sent': 0, 'received': 0, 'backlog_max': 0}
+    pool = ConnectionPool(max_idle=workers) if keepalive else None
+
+    async def schedule(start: float) -> None:
+        # открытый цикл: i-й запрос назначен на start + i/rate независимо от того,
+        # успели ли ответить на предыдущие; отставание копится в очереди
+        i = 0
+        end = start + duration
+        while True:
+            due = start + i / rate
+            if due >= end:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            queue.put_nowait(due)
+            counters['backlog_max'] = max(counters['backlog_max'], queue.qsize())
+            i += 1
+
+    async def worker() -> None:
+        while True:
+            due = await queue.get()
+            if due is None:
+                return
+            began = time.perf_counter()
+            status = None
+            try:
+                status = await request(url, method=method, timeout=timeout, pool=pool)
+            except (OSError, asyncio.TimeoutError, ValueError):
+                pass
+            done = time.perf_counter()
+            # задержка от назначенного времени, а не от фактической отправки:
+            # очередь перед занятыми воркерами тоже входит (без coordinated omission)
+            latency.add((done - due) * 1000.0)
+            service.add((done - began) * 1000.0)
+            counters['sent'] += 1
+            key = str(status) if status is not None else 'error'
+            statuses[key] = statuses.get(key, 0) + 1
+            if status is not None and status < 400:
+                counters['received'] += 1
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    start = time.perf_counter()
+    try:
+        await schedule(start)
+        for _ in tasks:
+            queue.put_nowait(None)
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+        if pool is not None:
+            pool.close()
+    elapsed = time.perf_counter() - start
+    sent = counters['sent']
+    return {
+        'target_rps': rate,
+        'achieved_rps': sent / elapsed if elapsed else 0.0,
+        'duration_s': elapsed,
+        'sent': sent,
+        'received': counters['received'],
+        'loss': (sent - counters['received']) / sent if sent else 0.0,
+        'backlog_max': counters['backlog_max'],
+        'statuses': statuses,
+        'latency': latency.summary(),
+        'service': service.summary(),
+        'histogram': latency.to_dict(),
+    }
+
+
+def load_test(
+    url: str,
+    rate: float,
+    duration: float,
+    workers: int = 64,
+    timeout: float = 3.0,
+    keepalive: bool = True,
+    method: str = 'GET',
+) -> dict:
+    """Нагрузка с постоянной частотой rate запросов/с в течение duration секунд.
+
+    Планировщик открытого цикла назначает запросы по расписанию и кладёт их
+    в очередь, workers корутин их выполняют. latency меряется от назначенного
+    времени (учитывает ожидание свободного воркера), service — от фактической
+    отправки. achieved_rps ниже target_rps и растущий backlog_max означают,
+    что сервер или сам генератор не держит заданную частоту.
+    """
+    return asyncio.run(load_async(url, rate, duration, workers, timeout, keepalive, method))
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # заголовки и тело уходят разными write: без этого Nagle + delayed ACK дают +40 мс
+    disable_nagle_algorithm = True
+    delay = 0.0
+    body = b'ok\n'
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, with_body: bool) -> None:
+        if self.delay:
+            time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(self.body)
+
+    def do_GET(self):
+        self._reply(True)
+
+    def do_HEAD(self):
+        self._reply(False)
+
+
+def _serve_stub(conn, delay: float) -> None:
+    handler = type('Handler', (_StubHandler,), {'delay': delay})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    conn.send(server.server_address[1])
+    conn.close()
+    server.serve_forever()
+
+
+@contextlib.contextmanager
+def stub_server(delay: float = 0.0) -> Iterator[str]:
+    """Локальный HTTP-сервер-заглушка в отдельном процессе (чтобы не делить GIL с генератором).
+
+    Отвечает 200 на GET/HEAD через delay секунд; отдаёт базовый URL.
+    """
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_serve_stub, args=(child, delay), daemon=True)
+    proc.start()
+    try:
+        port: Optional[int] = parent.recv() if parent.poll(10) else None
+        if port is None:
+            raise OSError("заглушка не запустилась")
+        yield f'http://127.0.0.1:{port}/'
+    finally:
+        proc.terminate()
+        proc.join()
@@ -0,0 +1,145 @@
+
+from __future__ import annotations
+import socket
+import threading
+from array import array
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+
+# границы корзин гистограммы, секунды (le); +Inf — последняя корзина
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = 'devutils_ping'
+OPENMETRICS = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _Series:
+    """Счётчики одной цели. Пишет только поток замеров, поэтому без блокировок:
+    скрейп читает копии массивов и может отстать на замер, но не испортить их."""
+
+    __slots__ = ('buckets', 'sum', 'success', 'codes', 'up')
+
+    def __init__(self):
+        self.buckets = array('Q', bytes(8 * (len(BUCKETS) + 1)))
+        self.sum = 0.0
+        self.success = 0
+        self.codes: Dict[str, int] = {}
+        self.up = 0
+
+
+class PingMetrics:
+    """Реестр метрик пинга: гистограмма задержек, успехи и коды ответа по целям."""
+
+    def __init__(self):
+        self._series: Dict[str, _Series] = {}
+        # блокировка только на появление новой цели, не на каждый замер
+        self._lock = threading.Lock()
+
+    def observe(self, url: str, ms: float, status: int) -> None:
+        """Замер: ms — время запроса, status — HTTP-статус (0 — ошибка соединения/таймаут)."""
+        s = self._series.get(url)
+        if s is None:
+            with self._lock:
+                s = self._series.setdefault(url, _Series())
+        seconds = ms / 1000.0
+        s.buckets[bisect_left(BUCKETS, seconds)] += 1
+        s.sum += seconds
+        ok = 0 < status < 400
+        s.success += ok
+        s.up = int(ok)
+        code = str(status) if status else 'error'
+        s.codes[code] = s.codes.get(code, 0) + 1
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Текстовый формат экспозиции Prometheus 0.0.4 или OpenMetrics 1.0."""
+        with self._lock:
+            series = list(self._series.items())
+        snap: List[Tuple[str, List[int], float, int, Dict[str, int], int]] = []
+        for url, s in series:
+            # copy атомарна под GIL; count берём из корзин, чтобы совпадал с +Inf
+            snap.append((_escape(url), s.buckets.tolist(), s.sum, s.success, dict(s.codes), s.up))
+        total = '' if openmetrics else '_total'
+        out = [
+            f'# HELP {PREFIX}_duration_seconds Время HTTP-запроса.',
+            f'# TYPE {PREFIX}_duration_seconds histogram',
+        ]
+        for url, buckets, total_s, _, _, _ in snap:
+            acc = 0
+            for le, c in zip(BUCKETS, buckets):
+                acc += c
+                out.append(f'{PREFIX}_duration_seconds_bucket{{target="{url}",le="{le}"}} {acc}')
+            acc += buckets[-1]
+            out.append(f'{PREFIX}_duration_seconds_bucket{{target="{url}",le="+Inf"}} {acc}')
+            out.append(f'{PREFIX}_duration_seconds_sum{{target="{url}"}} {total_s:.6f}')
+            out.append(f'{PREFIX}_duration_seconds_count{{target="{url}"}} {acc}')
+        out += [
+            f'# HELP {PREFIX}_probes{total} Отправлено запросов.',
+            f'# TYPE {PREFIX}_probes{total} counter',
+        ]
+        out += [f'{PREFIX}_probes_total{{target="{url}"}} {sum(b)}' for url, b, _, _, _, _ in snap]
+        out += [
+            f'# HELP {PREFIX}_success{total} Ответов со статусом < 400.',
+            f'# TYPE {PREFIX}_success{total} counter',
+        ]
+        out += [f'{PREFIX}_success_total{{target="{url}"}} {ok}' for url, _, _, ok, _, _ in snap]
+        out += [
+            f'# HELP {PREFIX}_responses{total} Ответы по HTTP-коду (error — нет ответа).',
+            f'# TYPE {PREFIX}_responses{total} counter',
+        ]
+        for url, _, _, _, codes, _ in snap:
+            for code, c in sorted(codes.items()):
+                out.append(f'{PREFIX}_responses_total{{target="{url}",code="{code}"}} {c}')
+        out += [
+            f'# HELP {PREFIX}_up Последний замер успешен (1) или нет (0).',
+            f'# TYPE {PREFIX}_up gauge',
+        ]
+        out += [f'{PREFIX}_up{{target="{url}"}} {up}' for url, _, _, _, _, up in snap]
+        if openmetrics:
+            out.append('# EOF')
+        return '\n'.join(out) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def parse_listen(text: str) -> Tuple[str, int]:
+    """':9100' -> ('0.0.0.0', 9100); '127.0.0.1:9100', '[::1]:9100'."""
+    host, sep, port = text.rpartition(':')
+    if not sep or not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"listen: [host]:port, а не {text!r}")
+    return host.strip('[]') or '0.0.0.0', int(port)
+
+
+def serve_metrics(metrics: PingMetrics, host: str = '0.0.0.0', port: int = 9100) -> ThreadingHTTPServer:
+    """HTTP-экспортер /metrics в фоновом потоке; остановить — server.shutdown().
+
+    Формат выбирается по Accept: OpenMetrics, если скрейпер его просит,
+    иначе текстовый формат Prometheus.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+            body = metrics.render(openmetrics).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', OPENMETRICS if openmetrics else PROMETHEUS)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server_cls = ThreadingHTTPServer
+    if ':' in host:
+        server_cls = type('Server6', (ThreadingHTTPServer,), {'address_family': socket.AF_INET6})
+    server = server_cls((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
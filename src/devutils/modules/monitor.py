@@ -0,0 +1,294 @@
+
+from __future__ import annotations
+import asyncio
+import math
+import random
+import struct
+import time
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from devutils.modules.histogram import LatencyHistogram
+from devutils.modules.httpclient import METHODS, ConnectionPool, check_proxies
+from devutils.modules.ping import probe
+
+
+# журнал: заголовок, дальше записи двух видов —
+#   b'T' id:u16 len:u16 url — объявление цели (один раз на цель)
+#   b'S' id:u16 ts:f64 ms:f32 status:u16 — замер (status 0 — ошибка), 17 байт
+LOG_MAGIC = b'DUMON1\n'
+_TARGET = struct.Struct('<HH')
+_SAMPLE = struct.Struct('<HdfH')
+
+Sample = Tuple[float, float, int]  # (unix-время, мс, статус; 0 — ошибка)
+
+
+class RingBuffer:
+    """Последние capacity замеров в трёх заранее выделенных массивах: память не растёт."""
+
+    __slots__ = ('capacity', '_ts', '_ms', '_status', '_next', '_len')
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity: >= 1")
+        self.capacity = capacity
+        self._ts = array('d', bytes(8 * capacity))
+        self._ms = array('f', bytes(4 * capacity))
+        self._status = array('H', bytes(2 * capacity))
+        self._next = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, ts: float, ms: float, status: int) -> None:
+        i = self._next
+        self._ts[i] = ts
+        self._ms[i] = ms
+        self._status[i] = status
+        self._next = (i + 1) % self.capacity
+        self._len = min(self._len + 1, self.capacity)
+
+    def __iter__(self) -> Iterator[Sample]:
+        # от старых к новым
+        start = (self._next - self._len) % self.capacity
+        for k in range(self._len):
+            i = (start + k) % self.capacity
+            yield self._ts[i], self._ms[i], self._status[i]
+
+    def last(self) -> Optional[Sample]:
+        if not self._len:
+            return None
+        i = (self._next - 1) % self.capacity
+        return self._ts[i], self._ms[i], self._status[i]
+
+    def since(self, ts: float) -> List[Sample]:
+        return [s for s in self if s[0] >= ts]
+
+
+def _stats(h: LatencyHistogram, received: int) -> dict:
+    return {
+        'sent': h.count,
+        'received': received,
+        'loss': (h.count - received) / h.count if h.count else 0.0,
+        **h.summary(),
+    }
+
+
+def window_stats(samples: Iterable[Sample]) -> dict:
+    """stats в формате http_ping (sent/received/loss/min/avg/p50.../jitter) по замерам окна."""
+    h = LatencyHistogram()
+    received = 0
+    for _, ms, status in samples:
+        h.add(ms)
+        received += 0 < status < 400
+    return _stats(h, received)
+
+
+class MonitorLog:
+    """Дописываемый бинарный журнал замеров; после сбоя недописанный хвост отбрасывается при чтении."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._ids: Dict[str, int] = {}
+        self._fh: BinaryIO = open(self.path, 'a+b')
+        self._fh.seek(0)
+        if self._fh.read(1):
+            # восстановить id целей и отрезать оборванную последнюю запись
+            self._fh.seek(0)
+            for _ in _records(self._fh, self.path, self._ids):
+                pass
+            self._fh.truncate(self._fh.tell())
+        else:
+            self._fh.write(LOG_MAGIC)
+
+    def write(self, url: str, ts: float, ms: float, status: int) -> None:
+        tid = self._ids.get(url)
+        if tid is None:
+            tid = self._ids[url] = len(self._ids)
+            raw = url.encode('utf-8')
+            self._fh.write(b'T' + _TARGET.pack(tid, len(raw)) + raw)
+        self._fh.write(b'S' + _SAMPLE.pack(tid, ts, ms, status))
+
+    def flush(self) -> None:
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> MonitorLog:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _records(f: BinaryIO, path: Path, ids: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, Sample]]:
+    # по выходе файл стоит сразу за последней целой записью
+    names: Dict[int, str] = {}
+    if f.read(len(LOG_MAGIC)) != LOG_MAGIC:
+        raise ValueError(f"не журнал монитора: {path}")
+    while True:
+        good = f.tell()
+        kind = f.read(1)
+        if kind == b'S':
+            raw = f.read(_SAMPLE.size)
+            if len(raw) == _SAMPLE.size:
+                tid, ts, ms, status = _SAMPLE.unpack(raw)
+                yield names[tid], (ts, ms, status)
+                continue
+        elif kind == b'T':
+            raw = f.read(_TARGET.size)
+            if len(raw) == _TARGET.size:
+                tid, n = _TARGET.unpack(raw)
+                url = f.read(n)
+                if len(url) == n:
+                    names[tid] = url.decode('utf-8')
+                    if ids is not None:
+                        ids[names[tid]] = tid
+                    continue
+        # конец файла или оборванная запись
+        f.seek(good)
+        return
+
+
+def _read_log(path: Path) -> Iterator[Tuple[str, Sample]]:
+    with open(path, 'rb') as f:
+        yield from _records(f, path)
+
+
+def replay_log(path: Path, since: float = 0.0) -> Iterator[Tuple[str, Sample]]:
+    """Замеры из журнала по порядку записи: (url, (ts, ms, status)), начиная с момента since."""
+    for url, sample in _read_log(path):
+        if sample[0] >= since:
+            yield url, sample
+
+
+def replay_stats(path: Path, since: float = 0.0) -> Dict[str, dict]:
+    """window_stats по каждой цели журнала; гистограмма потоковая — память не зависит от длины журнала."""
+    hists: Dict[str, List] = {}
+    for url, (_, ms, status) in replay_log(path, since):
+        entry = hists.get(url)
+        if entry is None:
+            entry = hists[url] = [LatencyHistogram(), 0]
+        entry[0].add(ms)
+        entry[1] += 0 < status < 400
+    return {url: _stats(h, received) for url, (h, received) in hists.items()}
+
+
+class Target:
+    """Состояние цели монитора: кольцевой буфер последних замеров и счётчики за всё время."""
+
+    __slots__ = ('url', 'history', 'sent', 'received')
+
+    def __init__(self, url: str, capacity: int):
+        self.url = url
+        self.history = RingBuffer(capacity)
+        self.sent = 0
+        self.received = 0
+
+    def stats(self, window: float, now: Optional[float] = None) -> dict:
+        now = time.time() if now is None else now
+        stats = window_stats(self.history.since(now - window))
+        stats['total_sent'] = self.sent
+        stats['total_received'] = self.received
+        last = self.history.last()
+        stats['last_status'] = last[2] if last else None
+        return stats
+
+
+async def monitor_async(
+    urls: Iterable[str],
+    interval: float = 1.0,
+    window: float = 60.0,
+    jitter: float = 0.1,
+    timeout: float = 3.0,
+    method: str = 'GET',
+    keepalive: bool = False,
+    concurrency: int = 100,
+    log: Optional[MonitorLog] = None,
+    on_sample: Optional[Callable[[Target, Sample], None]] = None,
+    duration: Optional[float] = None,
+) -> Dict[str, Target]:
+    if method not in METHODS:
+        raise ValueError(f"method: {'|'.join(METHODS)}")
+    if interval <= 0 or not 0 <= jitter < 1:
+        raise ValueError("interval > 0, 0 <= jitter < 1")
+    # с запасом: интервал с jitter бывает короче номинального
+    capacity = max(16, math.ceil(window / (interval * (1 - jitter))) + 1)
+    targets = {u: Target(u, capacity) for u in dict.fromkeys(urls)}
+    check_proxies(targets)
+    limit = asyncio.Semaphore(concurrency)
+    pool = ConnectionPool() if keepalive else None
+    loop = asyncio.get_running_loop()
+    end = None if duration is None else loop.time() + duration
+
+    async def run(target: Target) -> None:
+        # случайный сдвиг старта и jitter интервала — чтобы цели не стреляли разом
+        due = loop.time() + random.uniform(0, interval)
+        while end is None or due < end:
+            await asyncio.sleep(max(0.0, due - loop.time()))
+            async with limit:
+                s = await probe(target.url, timeout, method, pool)
+            sample = (time.time(), s['ms'], s['status'] or 0)
+            target.history.append(*sample)
+            target.sent += 1
+            target.received += s['ok']
+            if log is not None:
+                log.write(target.url, *sample)
+            if on_sample is not None:
+                on_sample(target, sample)
+            due += interval * random.uniform(1 - jitter, 1 + jitter)
+            # не догоняем пропущенные тики, если замер дольше интервала
+            due = max(due, loop.time())
+
+    async def flusher() -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            log.flush()
+
+    tasks = [asyncio.create_task(run(t)) for t in targets.values()]
+    flush = asyncio.create_task(flusher()) if log is not None else None
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+        if flush is not None:
+            flush.cancel()
+            log.flush()
+        if pool is not None:
+            pool.close()
+    return targets
+
+
+def monitor(
+    urls: Iterable[str],
+    interval: float = 1.0,
+    window: float = 60.0,
+    jitter: float = 0.1,
+    timeout: float = 3.0,
+    method: str = 'GET',
+    keepalive: bool = False,
+    concurrency: int = 100,
+    log_path: Optional[Path] = None,
+    on_sample: Optional[Callable[[Target, Sample], None]] = None,
+    duration: Optional[float] = None,
+) -> Dict[str, Target]:
+    """Непрерывный мониторинг: каждая цель опрашивается раз в interval ± jitter.
+
+    Для каждой цели в памяти — только кольцевой буфер на окно window секунд
+    (Target.stats(window) — скользящая статистика) и счётчики за всё время.
+    Полная история пишется в дописываемый журнал log_path (17 байт на
+    замер), который читается replay_log/replay_stats. Без duration работает
+    до отмены (Ctrl+C).
+    """
+    log = MonitorLog(log_path) if log_path is not None else None
+    try:
+        return asyncio.run(monitor_async(
+            urls, interval, window, jitter, timeout, method, keepalive, concurrency, log, on_sample, duration,
+        ))
+    finally:
+        if log is not None:
+            log.close()
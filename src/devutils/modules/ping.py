@@ -1,32 +1,199 @@
 
 from __future__ import annotations
+import asyncio
+import contextlib
 import time
-import requests
-from statistics import mean
+from pathlib import Path
+from typing import AsyncContextManager, Callable, Dict, Iterable, List, Optional
 
+from devutils.modules.histogram import LatencyHistogram
+from devutils.modules.httpclient import METHODS, PHASES, ConnectionPool, check_proxies, parse_url, request
 
-def http_ping(url: str, count: int = 4, timeout: float = 3.0) -> dict:
+
+class _Tally:
+    """Итоги по одной цели по ходу замеров: гистограмма, получено, суммы фаз."""
+
+    __slots__ = ("hist", "received", "phases")
+
+    def __init__(self):
+        self.hist = LatencyHistogram()
+        self.received = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+    def add(self, sample: dict) -> None:
+        self.hist.add(sample["ms"])
+        self.received += sample["ok"]
+        for phase in PHASES:
+            self.phases[phase] += sample[f"{phase}_ms"]
+
+    def stats(self, count: int) -> dict:
+        h = self.hist
+        stats = {
+            "sent": count,
+            "received": self.received,
+            "loss": (count - self.received) / count if count else 0.0,
+            **h.summary(),
+        }
+        for phase in PHASES:
+            stats[f"avg_{phase}_ms"] = self.phases[phase] / h.count if h.count else 0.0
+        return stats
+
+
+async def probe(url: str, timeout: float, method: str, pool: Optional[ConnectionPool]) -> dict:
+    """Один замер: {'ok', 'status', 'ms', фазы *_ms, 'redirects'}; ошибка соединения — status None.
+
+    Перенаправления выполняются (status — конечный, фазы — суммы по переходам,
+    'hops' — фазы каждого перехода, если они были).
+    """
+    timings: dict = {}
+    t0 = time.perf_counter()
+    status = None
+    try:
+        status = await request(url, method=method, timeout=timeout, pool=pool, timings=timings)
+    except (OSError, asyncio.TimeoutError, ValueError):
+        pass
+    sample = {"ok": status is not None and status < 400, "status": status, "ms": (time.perf_counter() - t0) * 1000.0}
+    for phase in PHASES:
+        sample[f"{phase}_ms"] = timings.get(phase, 0.0)
+    sample["reused"] = bool(timings.get("reused"))
+    sample["redirects"] = timings.get("redirects", 0)
+    if sample["redirects"]:
+        # фазы каждого перехода; у обычных замеров ключа нет, чтобы не раздувать сэмплы
+        sample["hops"] = timings["hops"]
+    return sample
+
+
+async def _ping_target(
+    url: str,
+    count: int,
+    timeout: float,
+    method: str = "GET",
+    pool: Optional[ConnectionPool] = None,
+    slot: Callable[[tuple], AsyncContextManager] = lambda host: contextlib.nullcontext(),
+    keep_samples: bool = True,
+) -> dict:
+    if method not in METHODS:
+        raise ValueError(f"method: {'|'.join(METHODS)}")
     samples = []
+    tally = _Tally()
+    try:
+        host = parse_url(url)[1:3]
+    except ValueError:
+        host = None
     for _ in range(count):
-        t0 = time.perf_counter()
-        ok = False
-        status = None
-        try:
-            r = requests.get(url, timeout=timeout)
-            status = r.status_code
-            ok = r.ok
-        except requests.RequestException:
-            ok = False
-        dt = (time.perf_counter() - t0) * 1000.0
-        samples.append({"ok": ok, "status": status, "ms": dt})
-    received = sum(1 for s in samples if s["ok"])
-    ms_values = [s["ms"] for s in samples]
-    stats = {
-        "sent": count,
-        "received": received,
-        "loss": (count - received) / count if count else 0.0,
-        "min_ms": min(ms_values) if ms_values else 0.0,
-        "avg_ms": mean(ms_values) if ms_values else 0.0,
-        "max_ms": max(ms_values) if ms_values else 0.0,
-    }
-    return {"samples": samples, "stats": stats}
+        if host is None:
+            sample = {"ok": False, "status": None, "ms": 0.0, **{f"{p}_ms": 0.0 for p in PHASES}, "reused": False, "redirects": 0}
+        else:
+            async with slot(host):
+                sample = await probe(url, timeout, method, pool)
+        tally.add(sample)
+        if keep_samples:
+            samples.append(sample)
+    return {"samples": samples, "stats": tally.stats(count), "histogram": tally.hist.to_dict()}
+
+
+async def _http_ping_async(url: str, count: int, timeout: float, keepalive: bool, method: str, keep_samples: bool) -> dict:
+    check_proxies([url])
+    pool = ConnectionPool() if keepalive else None
+    try:
+        return await _ping_target(url, count, timeout, method, pool, keep_samples=keep_samples)
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def http_ping(
+    url: str,
+    count: int = 4,
+    timeout: float = 3.0,
+    keepalive: bool = False,
+    method: str = "GET",
+    keep_samples: bool = True,
+) -> dict:
+    """count запросов к url по очереди: {"samples": [...], "stats": {...}, "histogram": {...}}.
+
+    В каждом сэмпле кроме полного ms — фазы dns/connect/tls/ttfb_ms. С
+    keepalive соединение держится между запросами, и после первого сэмпла
+    остаётся чистое время сервера (ttfb) без рукопожатий. method — GET
+    (тело читается потоком и выбрасывается) или HEAD. Неподдерживаемый
+    прокси в окружении — ValueError до первого запроса.
+
+    stats считаются потоково (LatencyHistogram): p50/p90/p99/p999, stddev и
+    jitter; при keep_samples=False сэмплы не хранятся и память не растёт с count.
+    """
+    return asyncio.run(_http_ping_async(url, count, timeout, keepalive, method, keep_samples))
+
+
+def load_targets(urls: Iterable[str] = (), path: Optional[Path] = None) -> List[str]:
+    """URL из аргументов и файла (по одному в строке, # — комментарий), без повторов."""
+    out = list(urls)
+    if path is not None:
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                out.append(line)
+    return list(dict.fromkeys(out))
+
+
+async def ping_many_async(
+    urls: Iterable[str],
+    count: int = 4,
+    timeout: float = 3.0,
+    concurrency: int = 100,
+    per_host: int = 6,
+    on_result: Optional[Callable[[str, dict], None]] = None,
+    keepalive: bool = False,
+    method: str = "GET",
+    keep_samples: bool = True,
+) -> Dict[str, dict]:
+    urls = list(urls)
+    check_proxies(urls)
+    limit = asyncio.Semaphore(concurrency)
+    hosts: Dict[tuple, asyncio.Semaphore] = {}
+    pool = ConnectionPool(max_idle=per_host) if keepalive else None
+
+    @contextlib.asynccontextmanager
+    async def slot(host: tuple):
+        sem = hosts.get(host)
+        if sem is None:
+            sem = hosts[host] = asyncio.Semaphore(per_host)
+        # сначала лимит хоста: пока ждём свой хост, общий слот не занят
+        async with sem, limit:
+            yield
+
+    async def one(url: str):
+        res = await _ping_target(url, count, timeout, method, pool, slot, keep_samples)
+        if on_result is not None:
+            on_result(url, res)
+        return url, res
+
+    try:
+        done = dict(await asyncio.gather(*(one(u) for u in urls)))
+    finally:
+        if pool is not None:
+            pool.close()
+    return {u: done[u] for u in urls}
+
+
+def ping_many(
+    urls: Iterable[str],
+    count: int = 4,
+    timeout: float = 3.0,
+    concurrency: int = 100,
+    per_host: int = 6,
+    on_result: Optional[Callable[[str, dict], None]] = None,
+    keepalive: bool = False,
+    method: str = "GET",
+    keep_samples: bool = True,
+) -> Dict[str, dict]:
+    """http_ping для многих URL сразу: {url: {"samples": ..., "stats": ...}} в порядке входа.
+
+    Запросы идут конкурентно в asyncio: одновременно не больше concurrency
+    всего и не больше per_host на один host:port. Запросы к одной цели
+    последовательны, как в http_ping; перенаправления выполняются, status —
+    конечный, ok — конечный статус < 400.
+    on_result(url, result) вызывается по мере готовности целей.
+    """
+    return asyncio.run(ping_many_async(
+        urls, count, timeout, concurrency, per_host, on_result, keepalive, method, keep_samples,
+    ))
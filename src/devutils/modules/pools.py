@@ -0,0 +1,22 @@
+
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+
+POOLS = ('thread', 'process')
+
+
+def make_executor(workers: int, pool: str = 'thread') -> Optional[Executor]:
+    """Пул для workers > 1, иначе None (вызывающий работает последовательно).
+
+    thread — для I/O (NVMe, сетевые диски): hashlib и binascii отпускают GIL
+    на больших буферах; process — когда упираемся в CPU.
+    """
+    if pool not in POOLS:
+        raise ValueError(f"pool: {'|'.join(POOLS)}")
+    if workers <= 1:
+        return None
+    if pool == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
@@ -0,0 +1,112 @@
+
+from __future__ import annotations
+import gzip
+import heapq
+import os
+import socket
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote, unquote, unquote_to_bytes
+
+from devutils.modules.duplicates import BATCH, build_inventory, digest_map, hash_file, hasher, sample_file
+from devutils.modules.hashcache import HashCache
+from devutils.modules.pools import make_executor
+from devutils.modules.walker import PRUNE_DIRS
+
+
+MAGIC = '#devutils-shard 1'
+
+# (size, digest, sample, host, path)
+Record = Tuple[int, str, str, str, str]
+
+
+def export_shard(
+    root: Path,
+    out: Path,
+    min_size: int = 1,
+    algo: str = 'md5',
+    workers: int = 1,
+    pool: str = 'thread',
+    cache: Optional[HashCache] = None,
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = False,
+    one_filesystem: bool = False,
+    prune: Iterable[str] = PRUNE_DIRS,
+    host: Optional[str] = None,
+) -> int:
+    """Записать индекс всех файлов под root в gzip-шард; вернуть число записей.
+
+    Строка шарда: size, полный хеш, sample-хеш и путь через табуляцию,
+    отсортированные по (size, хеш) — так merge_shards сливает шарды
+    потоково. Хешируется каждый файл (дубли могут быть на другом хосте),
+    поэтому повторные выгрузки стоит делать с cache.
+    """
+    hasher(algo)
+    host = host or socket.gethostname()
+    inv = build_inventory(root, min_size, None, exclude, skip_hidden, one_filesystem, prune, workers)
+    order = inv.order_by_size()
+    executor = make_executor(workers, pool)
+    written = 0
+    try:
+        with gzip.open(out, 'wt', encoding='ascii', newline='\n') as f:
+            f.write(f"{MAGIC}\talgo={algo}\thost={quote(host)}\troot={quote(os.fsencode(os.fspath(root)))}\n")
+            start = 0
+            while start < len(order):
+                # пачка режется только на границе размера, иначе сортировка по хешу нарушится
+                end = min(start + BATCH, len(order))
+                while end < len(order) and inv.sizes[order[end]] == inv.sizes[order[end - 1]]:
+                    end += 1
+                idx = order[start:end]
+                start = end
+                files = [(inv.path(i), inv.sizes[i]) for i in idx]
+                stamps = {p: inv.stamp(i) for (p, _), i in zip(files, idx)} if cache is not None else None
+                samples, _ = digest_map(sample_file, 'sample', files, algo, executor, cache, stamps)
+                digests, _ = digest_map(hash_file, 'digest', files, algo, executor, cache, stamps)
+                rows = sorted(
+                    (size, digests[p], samples[p], p) for p, size in files
+                    if digests[p] is not None and samples[p] is not None
+                )
+                for size, digest, sample, p in rows:
+                    f.write(f"{size}\t{digest}\t{sample}\t{quote(os.fsencode(p))}\n")
+                written += len(rows)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return written
+
+
+def shard_header(path: Path) -> Dict[str, str]:
+    with gzip.open(path, 'rt', encoding='ascii') as f:
+        magic, *fields = f.readline().rstrip('\n').split('\t')
+    if magic != MAGIC:
+        raise ValueError(f"не шард devutils: {path}")
+    header = dict(field.split('=', 1) for field in fields)
+    header['host'] = unquote(header.get('host', ''))
+    return header
+
+
+def iter_shard(path: Path) -> Iterator[Record]:
+    host = shard_header(path)['host']
+    with gzip.open(path, 'rt', encoding='ascii') as f:
+        f.readline()
+        for line in f:
+            size, digest, sample, p = line.rstrip('\n').split('\t')
+            yield int(size), digest, sample, host, os.fsdecode(unquote_to_bytes(p))
+
+
+def merge_shards(paths: Iterable[Path]) -> Iterator[List[Tuple[str, str, int]]]:
+    """Группы одинаковых файлов по всем шардам: [(host, path, size), ...].
+
+    k-way слияние уже отсортированных шардов: в памяти одна строка на шард
+    и текущая группа.
+    """
+    paths = list(paths)
+    algos = {shard_header(p)['algo'] for p in paths}
+    if len(algos) > 1:
+        raise ValueError(f"шарды с разными алгоритмами: {', '.join(sorted(algos))}")
+    merged = heapq.merge(*(iter_shard(p) for p in paths), key=lambda r: (r[0], r[1]))
+    for (size, _), records in groupby(merged, key=lambda r: (r[0], r[1])):
+        group = [(host, p, size) for _, _, _, host, p in records]
+        if len(group) > 1:
+            yield group
@@ -0,0 +1,198 @@
+
+from __future__ import annotations
+import os
+import queue
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import translate
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+PRUNE_DIRS = ('.git', '.hg', '.svn', 'node_modules', '__pycache__', '.venv', '.tox')
+# при workers > 1 поддерево отдаётся пачками через очередь на QUEUE_BATCHES пачек:
+# память ограничена, сколько бы файлов ни было в одном поддереве
+WALK_BATCH = 1024
+QUEUE_BATCHES = 4
+
+
+def _compile(patterns: Iterable[str]) -> Optional[re.Pattern]:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile('|'.join(translate(p) for p in patterns))
+
+
+class _Walker:
+    def __init__(self, exclude, skip_hidden, root_dev, prune):
+        self.exclude = _compile(exclude)
+        self.skip_hidden = skip_hidden
+        self.root_dev = root_dev
+        self.prune = frozenset(prune)
+
+    def _skip_name(self, name: str, path: str) -> bool:
+        if self.skip_hidden and name.startswith('.'):
+            return True
+        return self.exclude is not None and (
+            self.exclude.match(name) is not None or self.exclude.match(path) is not None
+        )
+
+    def _skip(self, entry: os.DirEntry) -> bool:
+        return self._skip_name(entry.name, entry.path)
+
+    def allows(self, root: str, path: str, is_dir: bool = False) -> bool:
+        # тот же фильтр, что и при обходе, но для отдельного пути (события watch):
+        # проверяются и сам файл, и все каталоги между ним и root
+        rel = os.path.relpath(path, root)
+        if rel == os.curdir or rel.split(os.sep, 1)[0] == os.pardir:
+            return False
+        parts = rel.split(os.sep)
+        cur = root
+        for i, name in enumerate(parts):
+            cur = os.path.join(cur, name)
+            if (is_dir or i < len(parts) - 1) and name in self.prune:
+                return False
+            if self._skip_name(name, cur):
+                return False
+        return True
+
+    def scan(self, top: str, dirs: List[str]) -> Iterator[Tuple[str, str, os.stat_result]]:
+        # один проход scandir: d_type отвечает на is_dir/is_file без syscall,
+        # stat() у DirEntry кешируется и нужен только файлам.
+        # подкаталоги добавляются в dirs отсортированными по имени
+        found: List[str] = []
+        try:
+            it = os.scandir(top)
+        except OSError:
+            return
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in self.prune or self._skip(entry):
+                            continue
+                        if self.root_dev is not None and entry.stat(follow_symlinks=False).st_dev != self.root_dev:
+                            continue
+                        found.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if self._skip(entry):
+                            continue
+                        yield top, entry.name, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+        found.sort()
+        dirs.extend(found)
+
+    def tree(self, top: str) -> Iterator[Tuple[str, str, os.stat_result]]:
+        # прямой обход в глубину, подкаталоги по имени: порядок не зависит ни от
+        # порядка scandir, ни от числа потоков (group[0] в дубликатах — по нему)
+        stack = [top]
+        while stack:
+            dirs: List[str] = []
+            yield from self.scan(stack.pop(), dirs)
+            stack.extend(reversed(dirs))
+
+    def tree_into(self, top: str, out: queue.Queue, stop: threading.Event) -> None:
+        # поддерево пачками в ограниченную очередь; None — конец
+        batch = []
+        try:
+            for item in self.tree(top):
+                batch.append(item)
+                if len(batch) >= WALK_BATCH:
+                    if not _put(out, batch, stop):
+                        return
+                    batch = []
+            if batch:
+                _put(out, batch, stop)
+        finally:
+            _put(out, None, stop)
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    # потребитель мог бросить генератор — тогда stop, и поток не висит на полной очереди
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def walk_entries(
+    root: Union[str, Path],
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = False,
+    one_filesystem: bool = False,
+    prune: Iterable[str] = PRUNE_DIRS,
+    workers: int = 1,
+) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """Обычные файлы под root как (каталог, имя, stat); симлинки не раскрываются.
+
+    Строка каталога — один и тот же объект для всех файлов в нём, так что её
+    можно интернировать без копий (см. Inventory).
+
+    exclude — glob-шаблоны по имени или полному пути (и для файлов, и для
+    каталогов), prune — имена каталогов, в которые не заходим. При workers > 1
+    поддеревья верхнего уровня обходятся параллельно в потоках; порядок
+    выдачи тот же, что при workers=1 (в глубину, подкаталоги по имени).
+    """
+    root = os.fspath(root)
+    root_dev = os.stat(root).st_dev if one_filesystem else None
+    walker = _Walker(exclude, skip_hidden, root_dev, prune)
+    if workers <= 1:
+        yield from walker.tree(root)
+        return
+
+    top_dirs: List[str] = []
+    yield from walker.scan(root, top_dirs)
+    # поддеревья запускаются по порядку, с окном в 2*workers; читаем их тоже по
+    # порядку — самое раннее незаконченное поддерево всегда уже выполняется
+    todo = iter(top_dirs)
+    pending: deque = deque()
+    stop = threading.Event()
+    ex = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while len(pending) < 2 * workers:
+                top = next(todo, None)
+                if top is None:
+                    break
+                q: queue.Queue = queue.Queue(maxsize=QUEUE_BATCHES)
+                ex.submit(walker.tree_into, top, q, stop)
+                pending.append(q)
+            if not pending:
+                break
+            q = pending.popleft()
+            for batch in iter(q.get, None):
+                yield from batch
+    finally:
+        stop.set()
+        ex.shutdown(cancel_futures=True)
+
+
+def walk_files(
+    root: Union[str, Path],
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = False,
+    one_filesystem: bool = False,
+    prune: Iterable[str] = PRUNE_DIRS,
+    workers: int = 1,
+) -> Iterator[Tuple[str, os.stat_result]]:
+    """То же, что walk_entries, но с полным путём: (path, stat)."""
+    for top, name, st in walk_entries(root, exclude, skip_hidden, one_filesystem, prune, workers):
+        yield os.path.join(top, name), st
+
+
+def path_filter(
+    root: Union[str, Path],
+    exclude: Iterable[str] = (),
+    skip_hidden: bool = False,
+    prune: Iterable[str] = PRUNE_DIRS,
+) -> Callable[..., bool]:
+    """Предикат f(path, is_dir=False): попал бы path в обход walk_entries(root, ...)."""
+    root = os.fspath(root)
+    walker = _Walker(exclude, skip_hidden, None, prune)
+    return lambda path, is_dir=False: walker.allows(root, path, is_dir)
@@ -0,0 +1,89 @@
+import base64
+import binascii
+import io
+import random
+
+import pytest
+
+from devutils.modules.base64util import (
+    CODECS, decode_bytes, decode_file, decode_stream, encode_bytes, encode_file, encode_stream,
+)
+
+# эталон из стандартной библиотеки для каждого кодека
+STDLIB = {
+    'b64': base64.b64encode,
+    'b64url': base64.urlsafe_b64encode,
+    'mime': base64.encodebytes,
+    'b32': base64.b32encode,
+    'b85': base64.b85encode,
+    'a85': base64.a85encode,
+    'hex': binascii.hexlify,
+}
+SIZES = (0, 1, 2, 3, 4, 5, 57, 76, 100, 4097)
+
+
+def _data(n, seed=0):
+    rng = random.Random(seed)
+    # нули посередине — чтобы ascii85 сжимал группы в 'z'
+    return rng.randbytes(n // 2) + bytes(n // 4) + rng.randbytes(n - n // 2 - n // 4)
+
+
+def test_all_codecs_have_reference():
+    assert set(CODECS) == set(STDLIB)
+
+
+@pytest.mark.parametrize('codec', sorted(STDLIB))
+@pytest.mark.parametrize('size', SIZES)
+def test_roundtrip_matches_stdlib(codec, size):
+    data = _data(size)
+    encoded = encode_bytes(data, codec)
+    assert encoded == STDLIB[codec](data)
+    assert decode_bytes(encoded, codec) == data
+
+
+@pytest.mark.parametrize('codec', sorted(STDLIB))
+@pytest.mark.parametrize('chunk', [1, 7, 64])
+def test_stream_chunk_boundaries(codec, chunk):
+    data = _data(1000, seed=chunk)
+    encoded = io.BytesIO()
+    encode_stream(io.BytesIO(data), encoded, chunk=chunk, codec=codec)
+    assert encoded.getvalue() == STDLIB[codec](data)
+    decoded = io.BytesIO()
+    decode_stream(io.BytesIO(encoded.getvalue()), decoded, chunk=chunk, codec=codec)
+    assert decoded.getvalue() == data
+
+
+def test_decode_skips_non_alphabet_like_stdlib():
+    for text in (b'aGV!sbG8=', b'aGVs\n bG8g!d29y*bGQ=\r\n', b'aG-Vs_bG8='):
+        assert decode_bytes(text) == base64.b64decode(text)
+    wrapped = base64.encodebytes(_data(500))
+    assert decode_bytes(wrapped, 'mime') == decode_bytes(wrapped.replace(b'\n', b'\r\n'), 'b64')
+
+
+def test_decode_truncated():
+    with pytest.raises(binascii.Error):
+        decode_bytes(b'aGVsbG8')
+    # b64url и base85 допускают неполную последнюю группу
+    assert decode_bytes(b'aGVsbG8', 'b64url') == b'hello'
+
+
+@pytest.mark.parametrize('codec', ['b64', 'mime', 'a85', 'hex'])
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_files_match_stdlib(tmp_path, codec, jobs):
+    data = _data(200_003)
+    src, enc, out = tmp_path / 'src', tmp_path / 'enc', tmp_path / 'out'
+    src.write_bytes(data)
+    # маленький region — несколько участков на процесс даже для небольшого файла
+    size = encode_file(src, enc, jobs=jobs, region=16 * 1024, codec=codec)
+    assert enc.read_bytes() == STDLIB[codec](data)
+    assert size == enc.stat().st_size
+    assert decode_file(enc, out, jobs=jobs, region=16 * 1024, codec=codec) == len(data)
+    assert out.read_bytes() == data
+
+
+def test_decode_file_error_leaves_no_output(tmp_path):
+    src, out = tmp_path / 'src', tmp_path / 'out'
+    src.write_bytes(base64.b64encode(b'hello world')[:-1])
+    with pytest.raises(ValueError):
+        decode_file(src, out, jobs=1)
+    assert not out.exists()
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from devutils.modules import chunks
+from devutils.modules.chunks import analyze_chunks, chunk_file
+
+
+def _data(n, seed=0):
+    return random.Random(seed).randbytes(n)
+
+
+@pytest.fixture
+def no_numpy(monkeypatch):
+    monkeypatch.setattr(chunks, 'np', None)
+
+
+def test_numpy_cut_points_match_python(monkeypatch):
+    pytest.importorskip('numpy')
+    data = memoryview(_data(300_000))
+    expected = list(chunks._candidates_py(data))
+    assert len(expected) > 2
+    assert list(chunks._candidates_np(data)) == expected
+    # блок меньше файла: окно хеша должно переходить через границу блока
+    monkeypatch.setattr(chunks, 'BLOCK', 4099)
+    assert list(chunks._candidates_np(data)) == expected
+
+
+def test_chunk_file_same_with_and_without_numpy(tmp_path):
+    path = tmp_path / 'f'
+    path.write_bytes(_data(1_000_000, seed=1) + bytes(600_000))
+    hashes, sizes = chunk_file(str(path))
+    assert (hashes, sizes) == chunk_file(str(path), use_numpy=False)
+    assert sum(sizes) == 1_600_000
+    assert all(chunks.MIN_CHUNK <= s <= chunks.MAX_CHUNK for s in sizes[:-1])
+    (tmp_path / 'empty').write_bytes(b'')
+    assert [len(a) for a in chunk_file(str(tmp_path / 'empty'))] == [0, 0]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    shared = _data(700_000, seed=2)
+    (tmp_path / 'a').write_bytes(shared)
+    (tmp_path / 'b').write_bytes(shared)
+    (tmp_path / 'c').write_bytes(_data(300_000, seed=3))
+    return tmp_path
+
+
+def _check(r, root):
+    assert r['files'] == 3
+    assert r['total_bytes'] == 1_700_000
+    # b целиком повторяет a: общие байты — ровно её размер
+    assert r['shared_bytes'] == 700_000
+    assert r['unique_bytes'] == 1_000_000
+    assert [(sorted(pair[:2]), pair[2]) for pair in r['pairs']] == [([str(root / 'a'), str(root / 'b')], 700_000)]
+
+
+def test_shared_bytes(tree):
+    _check(analyze_chunks(tree), tree)
+
+
+def test_shared_bytes_without_numpy(tree, no_numpy):
+    _check(analyze_chunks(tree), tree)
+
+
+@pytest.mark.parametrize('pool', ['thread', 'process'])
+def test_shared_bytes_parallel(tree, pool):
+    _check(analyze_chunks(tree, workers=2, pool=pool), tree)
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from devutils.cli import app
+from devutils.modules.duplicates import find_duplicates
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'data'
+    for name, data in (('a1', b'a' * 300), ('a2', b'a' * 300), ('sub/a,3\n"x"', b'a' * 300),
+                       ('b1', b'b' * 20), ('b2', b'b' * 20), ('u', b'u' * 20)):
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_bytes(data)
+    return root
+
+
+def _dupes(*args):
+    r = CliRunner().invoke(app, ['dupes', *map(str, args), '--no-cache', '--no-progress'])
+    assert r.exit_code == 0, r.output
+    return r.output
+
+
+def _expected(root):
+    return [[str(p) for p, _ in g] for g in find_duplicates(root)]
+
+
+def test_ndjson(tree):
+    records = [json.loads(line) for line in _dupes(tree, '--format', 'ndjson').splitlines()]
+    assert [r['paths'] for r in records] == _expected(tree)
+    assert [(r['group'], r['size']) for r in records] == [(1, 300), (2, 20)]
+    assert all('reclaimed' not in r for r in records)
+
+
+def test_csv(tree):
+    rows = list(csv.reader(io.StringIO(_dupes(tree, '--format', 'csv'))))
+    assert rows[0] == ['group', 'size', 'path']
+    # имя с запятой, кавычками и переводом строки читается обратно целиком
+    assert [r[2] for r in rows[1:]] == [p for g in _expected(tree) for p in g]
+    assert [(r[0], r[1]) for r in rows[1:]] == [('1', '300')] * 3 + [('2', '20')] * 2
+
+
+def test_json(tree, tmp_path):
+    records = json.loads(_dupes(tree, '--format', 'json'))
+    assert [r['paths'] for r in records] == _expected(tree)
+    empty = tmp_path / 'empty'
+    empty.mkdir()
+    assert json.loads(_dupes(empty, '--format', 'json')) == []
+
+
+def test_ndjson_reports_reclaimed(tree):
+    records = [json.loads(line) for line in _dupes(tree, '--format', 'ndjson', '--action', 'delete').splitlines()]
+    assert [r['reclaimed'] for r in records] == [600, 20]
+    assert sorted(p.name for p in tree.rglob('*') if p.is_file()) == ['a1', 'b1', 'u']
+
+
+def test_unknown_format(tree):
+    r = CliRunner().invoke(app, ['dupes', str(tree), '--format', 'xml', '--no-cache'])
+    assert r.exit_code != 0
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from devutils.modules.dedupe import ACTIONS, dedupe_group
+
+DATA = b'duplicate content\n' * 1000
+
+
+@pytest.fixture
+def group(tmp_path):
+    # keep, две копии, жёсткая ссылка на keep и копия, у которой есть вторая ссылка вне группы
+    keep = tmp_path / 'keep'
+    keep.write_bytes(DATA)
+    copies = []
+    for name in ('d1', 'd2', 'linked'):
+        (tmp_path / name).write_bytes(DATA)
+        copies.append(tmp_path / name)
+    os.link(tmp_path / 'linked', tmp_path / 'outside')
+    alias = tmp_path / 'alias'
+    os.link(keep, alias)
+    return [(p, len(DATA)) for p in [keep, *copies, alias]]
+
+
+def _inode(path):
+    st = path.stat()
+    return st.st_dev, st.st_ino
+
+
+def test_report_changes_nothing(group):
+    before = [_inode(p) for p, _ in group]
+    assert dedupe_group(group, 'report') == (0, [])
+    assert [_inode(p) for p, _ in group] == before
+
+
+def test_delete(group):
+    keep, d1, d2, linked, alias = (p for p, _ in group)
+    reclaimed, errors = dedupe_group(group, 'delete')
+    assert errors == []
+    # у linked осталась вторая ссылка, место освобождают только d1 и d2
+    assert reclaimed == 2 * len(DATA)
+    assert not d1.exists() and not d2.exists() and not linked.exists()
+    assert alias.exists() and _inode(alias) == _inode(keep)
+    assert (linked.parent / 'outside').read_bytes() == DATA
+
+
+def test_hardlink(group):
+    keep, d1, d2, linked, alias = (p for p, _ in group)
+    reclaimed, errors = dedupe_group(group, 'hardlink')
+    assert errors == []
+    assert reclaimed == 2 * len(DATA)
+    for p in (d1, d2, linked, alias):
+        assert _inode(p) == _inode(keep)
+    assert keep.stat().st_nlink == 5
+    # вторая ссылка старого inode не тронута
+    assert (linked.parent / 'outside').read_bytes() == DATA
+    # повторный проход: все уже ссылки на keep
+    assert dedupe_group(group, 'hardlink') == (0, [])
+
+
+def test_symlink(group):
+    keep, d1, d2, linked, alias = (p for p, _ in group)
+    reclaimed, errors = dedupe_group(group, 'symlink')
+    assert errors == []
+    assert reclaimed == 2 * len(DATA)
+    for p in (d1, d2, linked):
+        assert p.is_symlink() and os.readlink(p) == os.path.abspath(keep)
+        assert p.read_bytes() == DATA
+    assert not alias.is_symlink()
+
+
+def test_reflink(group):
+    keep, d1, d2, linked, alias = (p for p, _ in group)
+    reclaimed, errors = dedupe_group(group, 'reflink')
+    if errors:
+        # ФС без FICLONE: ошибка на каждый файл, сами файлы не тронуты
+        assert [p for p, _ in errors] == [d1, d2, linked]
+        assert reclaimed == 0
+    else:
+        assert reclaimed == 2 * len(DATA)
+        assert _inode(d1) != _inode(keep)
+    for p in (d1, d2, linked):
+        assert p.read_bytes() == DATA
+    assert not any(p.name.endswith('.tmp') for p in keep.parent.iterdir())
+
+
+def test_unknown_action(group):
+    with pytest.raises(ValueError):
+        dedupe_group(group, 'shred')
+    assert 'shred' not in ACTIONS
@@ -0,0 +1,117 @@
+import os
+import queue
+import threading
+
+import pytest
+
+from devutils.modules import dupewatch
+from devutils.modules.dupewatch import DuplicateIndex, watch_duplicates
+from devutils.modules.duplicates import find_duplicates
+from devutils.modules.hashcache import HashCache
+
+
+def _names(groups):
+    return [[p.name for p, _ in g] for g in groups]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for name, data in (('b_orig', b'same' * 100), ('c_orig', b'same' * 100), ('other', b'diff' * 100),
+                       ('small', b'tiny'), ('small2', b'tiny')):
+        (tmp_path / name).write_bytes(data)
+    return tmp_path
+
+
+@pytest.mark.parametrize('workers,pool', [(1, 'thread'), (2, 'thread'), (2, 'process')])
+def test_build_matches_scan(tree, workers, pool):
+    index = DuplicateIndex(tree)
+    assert list(index.build(workers, pool)) == find_duplicates(tree)
+    assert list(index.groups()) == find_duplicates(tree)
+
+
+def test_new_file_is_not_kept(tree):
+    index = DuplicateIndex(tree)
+    list(index.build())
+    # имя меньше, чем у уже известных копий, но оставляется файл из индекса
+    (tree / 'a_new').write_bytes(b'same' * 100)
+    assert _names(index.update(str(tree / 'a_new'))) == [['b_orig', 'c_orig', 'a_new']]
+    # изменённый файл сохраняет своё место в группе
+    (tree / 'other').write_bytes(b'same' * 100)
+    assert _names(index.update(str(tree / 'other'))) == [['b_orig', 'c_orig', 'other', 'a_new']]
+
+
+def test_unchanged_group_not_reemitted(tree):
+    index = DuplicateIndex(tree)
+    list(index.build())
+    os.utime(tree / 'b_orig', ns=(1, 1))
+    assert index.update(str(tree / 'b_orig')) == []
+    os.chmod(tree / 'c_orig', 0o600)
+    assert index.update(str(tree / 'c_orig')) == []
+    # содержимое поменялось — группа распалась, новой нет
+    (tree / 'c_orig').write_bytes(b'cccc' * 100)
+    assert index.update(str(tree / 'c_orig')) == []
+    assert _names(index.groups()) == [['small', 'small2']]
+
+
+def test_removed_file(tree):
+    index = DuplicateIndex(tree)
+    list(index.build())
+    (tree / 'small2').unlink()
+    assert index.update(str(tree / 'small2')) == []
+    assert str(tree / 'small2') not in index
+    assert _names(index.groups()) == [['b_orig', 'c_orig']]
+
+
+def test_one_digest_per_built_group(tree, monkeypatch):
+    index = DuplicateIndex(tree)
+    list(index.build())
+    hashed = []
+    real = dupewatch.hash_file
+    monkeypatch.setattr(dupewatch, 'hash_file', lambda p, *args: hashed.append(os.path.basename(p)) or real(p, *args))
+    (tree / 'new').write_bytes(b'same' * 100)
+    assert _names(index.update(str(tree / 'new'))) == [['b_orig', 'c_orig', 'new']]
+    # от группы из build() читается только первый член
+    assert sorted(hashed) == ['b_orig', 'new', 'other']
+
+
+def test_verify_splits_collisions(tree, monkeypatch):
+    index = DuplicateIndex(tree, verify=True)
+    list(index.build())
+    (tree / 'evil').write_bytes(b'evil' * 100)
+    # подделанный хеш совпадает с группой, побайтовое сравнение — нет
+    monkeypatch.setattr(index, '_digest', lambda p: index._digests.setdefault(p, 'x'))
+    assert index.update(str(tree / 'evil')) == []
+    (tree / 'good').write_bytes(b'same' * 100)
+    assert _names(index.update(str(tree / 'good'))) == [['b_orig', 'c_orig', 'good']]
+
+
+def test_cache_reused(tree, tmp_path_factory):
+    path = tmp_path_factory.mktemp('cache') / 'cache.db'
+    with HashCache(path) as cache:
+        index = DuplicateIndex(tree, cache=cache)
+        list(index.build())
+        (tree / 'new').write_bytes(b'same' * 100)
+        assert _names(index.update(str(tree / 'new'))) == [['b_orig', 'c_orig', 'new']]
+
+
+@pytest.mark.parametrize('poll', [True, False])
+def test_watch_reports_new_copy(tree, poll):
+    index = DuplicateIndex(tree)
+    list(index.build())
+    stop = threading.Event()
+    found = queue.Queue()
+
+    def run():
+        for g in watch_duplicates(index, interval=0.1, poll=poll, stop=stop):
+            found.put(g)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    try:
+        # inotify ставит наблюдение не сразу после старта потока
+        threading.Event().wait(0.3)
+        (tree / 'copy').write_bytes(b'same' * 100)
+        assert _names([found.get(timeout=5)]) == [['b_orig', 'c_orig', 'copy']]
+    finally:
+        stop.set()
+        t.join(5)
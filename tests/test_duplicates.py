@@ -0,0 +1,170 @@
+import errno
+import hashlib
+import os
+import random
+
+import pytest
+
+from devutils.modules import duplicates
+from devutils.modules.duplicates import HASHERS, READERS, compare_group, find_duplicates, hash_file, register_hasher
+from devutils.modules.hashcache import HashCache
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path):
+    rng = random.Random(0)
+    a = rng.randbytes(50_000)
+    # отличается от a в середине: размер и выборка начала/конца те же, хеш — нет
+    b = bytearray(a)
+    b[25_000] ^= 0xFF
+    for name in ('a1', 'a2', 'sub/a3', 'sub/deep/a4'):
+        _write(tmp_path / name, a)
+    for name in ('b1', 'sub/b2'):
+        _write(tmp_path / name, bytes(b))
+    _write(tmp_path / 'c1', b'x' * 100)
+    _write(tmp_path / 'sub/c2', b'x' * 100)
+    _write(tmp_path / 'unique', rng.randbytes(50_000))
+    os.link(tmp_path / 'a1', tmp_path / 'a1.link')
+    return tmp_path
+
+
+def _names(groups, root):
+    return [[str(p.relative_to(root)) for p, _ in g] for g in groups]
+
+
+def test_groups(tree):
+    groups = _names(find_duplicates(tree), tree)
+    assert len(groups) == 3
+    a, b, c = groups
+    # жёсткая ссылка на уже встреченный inode — не дубликат
+    assert len(a) == 4 and not ({'a1', 'a1.link'} <= set(a))
+    assert sorted(b) == ['b1', 'sub/b2']
+    assert sorted(c) == ['c1', 'sub/c2']
+
+
+@pytest.mark.parametrize('workers,pool', [(2, 'thread'), (4, 'thread'), (2, 'process'), (4, 'process')])
+def test_parallel_matches_serial(tree, workers, pool):
+    # порядок обхода детерминирован: совпадают и группы, и первый (сохраняемый) файл
+    serial = find_duplicates(tree)
+    assert find_duplicates(tree, workers=workers, pool=pool) == serial
+    assert find_duplicates(tree, workers=workers, pool=pool, verify=True) == serial
+
+
+def test_unknown_pool(tree):
+    with pytest.raises(ValueError):
+        find_duplicates(tree, workers=2, pool='fiber')
+
+
+def test_compare_group_splits(tree):
+    paths = [str(tree / n) for n in ('a1', 'b1', 'a2', 'sub/b2', 'unique')]
+    groups, read = compare_group(paths, chunk=4096)
+    assert sorted(groups) == sorted([[paths[0], paths[2]], [paths[1], paths[3]]])
+    # unique расходится с остальными на первом куске и дальше не читается
+    assert read == 4 * 50_000 + 4096
+
+
+def test_compare_group_early_exit(tmp_path):
+    paths = [str(_write(tmp_path / str(i), bytes([i]) * 1_000_000)) for i in range(3)]
+    groups, read = compare_group(paths, chunk=4096)
+    assert groups == []
+    assert read == 3 * 4096
+
+
+@pytest.mark.parametrize('max_open', [1, 2, 64])
+def test_compare_group_bounded_handles(tree, max_open):
+    paths = [str(tree / n) for n in ('a1', 'a2', 'sub/a3', 'sub/deep/a4', 'b1', 'sub/b2')]
+    groups, read = compare_group(paths, chunk=4096, max_open=max_open)
+    assert groups == [paths[:4], paths[4:]]
+    assert read == 6 * 50_000
+
+
+def test_compare_group_missing_member(tree):
+    paths = [str(tree / n) for n in ('a1', 'a2', 'missing')]
+    assert compare_group(paths)[0] == [paths[:2]]
+
+
+def test_compare_group_emfile(tree, monkeypatch):
+    def no_fds(*args, **kwargs):
+        raise OSError(errno.EMFILE, 'Too many open files')
+
+    monkeypatch.setattr(duplicates, 'open', no_fds, raising=False)
+    with pytest.raises(OSError) as e:
+        compare_group([str(tree / 'a1'), str(tree / 'a2')])
+    assert e.value.errno == errno.EMFILE
+
+
+@pytest.mark.parametrize('verify', [False, True])
+def test_progress_totals(tree, verify):
+    seen = []
+    stats = {}
+    find_duplicates(tree, stats=stats, verify=verify, progress=seen.append)
+    p = seen[-1]
+    assert p.stage == 'done' and p.eta == 0.0
+    assert p.files_walked == 10
+    # всё, у чего есть пара по размеру: 7 файлов по 50 000 и c1, c2; жёсткая ссылка не в счёт
+    assert p.bytes_total == 7 * 50_000 + 2 * 100
+    assert p.bytes_done == p.bytes_total
+    assert p.bytes_read == stats['bytes_sampled'] + stats['bytes_hashed']
+    assert set(p.timings) == {'walk', 'sample', 'compare' if verify else 'hash'}
+    assert p.as_dict()['bytes_done'] == p.bytes_total
+
+
+def test_progress_totals_from_cache(tree, tmp_path_factory):
+    with HashCache(tmp_path_factory.mktemp('cache') / 'cache.db') as cache:
+        find_duplicates(tree, cache=cache)
+        seen = []
+        find_duplicates(tree, cache=cache, progress=seen.append)
+    # из кеша ничего не читается, но все байты разрешены
+    assert seen[-1].bytes_done == seen[-1].bytes_total == 7 * 50_000 + 2 * 100
+    assert seen[-1].bytes_read == 0
+
+
+@pytest.mark.parametrize('algo', sorted(HASHERS))
+def test_every_algo_same_groups(tree, algo):
+    assert find_duplicates(tree, algo=algo) == find_duplicates(tree)
+
+
+def test_unknown_algo(tree):
+    for call in (lambda: find_duplicates(tree, algo='crc32'), lambda: hash_file(str(tree / 'a1'), 'crc32')):
+        with pytest.raises(ValueError) as e:
+            call()
+        # в сообщении — список доступных имён
+        assert 'md5' in str(e.value)
+    assert find_duplicates(tree, algo='MD5') == find_duplicates(tree)
+
+
+def test_register_hasher(tree):
+    register_hasher('Sha1-Copy', hashlib.sha1)
+    try:
+        assert hash_file(str(tree / 'a1'), 'sha1-copy') == hashlib.sha1((tree / 'a1').read_bytes()).hexdigest()
+    finally:
+        del HASHERS['sha1-copy']
+
+
+@pytest.mark.parametrize('reader', READERS)
+@pytest.mark.parametrize('size', [0, 1, 4095, 4096, 4097, 100_000])
+@pytest.mark.parametrize('fadvise', [True, False])
+def test_readers_same_digest(tmp_path, monkeypatch, reader, size, fadvise):
+    # сброс прочитанного из page cache — каждые 8 КиБ, чтобы он тоже попал под проверку
+    monkeypatch.setattr(duplicates, 'DROP_EVERY', 8192)
+    data = random.Random(size).randbytes(size)
+    path = _write(tmp_path / 'f', data)
+    assert hash_file(str(path), 'sha256', chunk=4096, reader=reader, fadvise=fadvise) == hashlib.sha256(data).hexdigest()
+
+
+def test_unknown_reader(tree):
+    with pytest.raises(ValueError):
+        hash_file(str(tree / 'a1'), 'md5', reader='aio')
+    with pytest.raises(ValueError):
+        find_duplicates(tree, reader='aio')
+
+
+@pytest.mark.parametrize('reader', READERS)
+def test_reader_scan_matches(tree, reader):
+    assert find_duplicates(tree, reader=reader, chunk=4096) == find_duplicates(tree)
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from devutils.modules.duplicates import find_duplicates
+from devutils.modules.hashcache import HashCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with HashCache(tmp_path / 'cache' / 'hashes.sqlite') as c:
+        yield c
+
+
+def test_hit_only_on_same_stat(cache):
+    stamp = (1, 2, 100, 5_000)
+    cache.put_many([(stamp, 'aa')], 'md5', 'digest')
+    assert cache.get(stamp, 'md5', 'digest') == 'aa'
+    assert cache.get((1, 2, 101, 5_000), 'md5', 'digest') is None
+    assert cache.get((1, 2, 100, 5_001), 'md5', 'digest') is None
+    assert cache.get(stamp, 'sha1', 'digest') is None
+    assert cache.get(stamp, 'md5', 'sample') is None
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_other_kind_dropped_on_change(cache):
+    stamp = (1, 2, 100, 5_000)
+    cache.put_many([(stamp, 's1')], 'md5', 'sample')
+    cache.put_many([(stamp, 'd1')], 'md5', 'digest')
+    assert cache.get(stamp, 'md5', 'sample') == 's1'
+    # файл изменился: новая выборка, а старый полный хеш больше не годится
+    changed = (1, 2, 100, 6_000)
+    cache.put_many([(changed, 's2')], 'md5', 'sample')
+    assert cache.get(changed, 'md5', 'sample') == 's2'
+    assert cache.get(changed, 'md5', 'digest') is None
+    assert cache.get(stamp, 'md5', 'digest') is None
+
+
+def test_kind_checked(cache):
+    with pytest.raises(ValueError):
+        cache.get((1, 2, 3, 4), 'md5', 'full')
+
+
+def test_rescan_sees_rewritten_file(tmp_path, cache):
+    root = tmp_path / 'data'
+    root.mkdir()
+    for name in ('a', 'b'):
+        (root / name).write_bytes(b'x' * 10_000)
+    assert len(find_duplicates(root, cache=cache)) == 1
+    stats = {}
+    assert len(find_duplicates(root, cache=cache, stats=stats)) == 1
+    assert stats['cache_misses'] == 0 and stats['cache_hits'] > 0
+    # тот же размер, другое содержимое и mtime: запись из кеша не должна сработать
+    (root / 'b').write_bytes(b'x' * 9_999 + b'y')
+    st = os.stat(root / 'b')
+    os.utime(root / 'b', ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert find_duplicates(root, cache=cache, stats=stats) == []
+    assert stats['cache_misses'] > 0
@@ -0,0 +1,85 @@
+import math
+import random
+import statistics
+
+import pytest
+
+from devutils.modules.histogram import MAX_US, PERCENTILES, SUB, LatencyHistogram, _bounds, _index
+
+
+def _samples(n=20_000, seed=0):
+    rng = random.Random(seed)
+    # длинный хвост, как у реальных задержек: от ~1 мс до секунд
+    return [rng.lognormvariate(3, 1) + 1 for _ in range(n)]
+
+
+def _exact(values, q):
+    # nearest-rank, как в LatencyHistogram.percentiles
+    return sorted(values)[max(1, math.ceil(q / 100 * len(values))) - 1]
+
+
+def _hist(values):
+    h = LatencyHistogram()
+    for v in values:
+        h.add(v)
+    return h
+
+
+def test_bucket_bounds():
+    rng = random.Random(1)
+    for us in list(range(200)) + [rng.randrange(MAX_US) for _ in range(2000)] + [MAX_US]:
+        low, high = _bounds(_index(us))
+        assert low <= us < high
+        if us >= SUB:
+            assert (high - low) / low <= 1 / SUB
+
+
+def test_percentiles_vs_exact():
+    values = _samples()
+    h = _hist(values)
+    for q in list(PERCENTILES) + [0, 1, 25, 75, 100]:
+        exact = _exact(values, q)
+        assert h.percentile(q) == pytest.approx(exact, rel=1 / SUB)
+    assert h.percentile(100) <= h.max == max(values)
+    assert h.percentile(0) >= h.min == min(values)
+
+
+def test_moments_vs_exact():
+    values = _samples(seed=2)
+    h = _hist(values)
+    assert h.count == len(values)
+    assert h.mean == pytest.approx(statistics.fmean(values), rel=1e-12)
+    assert h.stddev == pytest.approx(statistics.stdev(values), rel=1e-9)
+    assert h.jitter == pytest.approx(statistics.fmean(abs(a - b) for a, b in zip(values, values[1:])), rel=1e-9)
+    s = h.summary()
+    assert s['avg_ms'] == h.mean and s['stddev_ms'] == h.stddev
+    assert sum(c for _, _, c in h.buckets()) == h.to_dict()['count'] == len(values)
+
+
+def test_merge_equals_single_pass():
+    a, b = _samples(5000, seed=3), _samples(7000, seed=4)
+    merged = _hist(a)
+    merged.merge(_hist(b))
+    whole = _hist(a + b)
+    assert merged.counts == whole.counts
+    assert (merged.count, merged.min, merged.max) == (whole.count, whole.min, whole.max)
+    assert merged.mean == pytest.approx(whole.mean, rel=1e-12)
+    assert merged.stddev == pytest.approx(whole.stddev, rel=1e-9)
+    assert merged.percentiles(PERCENTILES) == whole.percentiles(PERCENTILES)
+
+
+def test_empty_and_single():
+    empty = LatencyHistogram()
+    assert set(empty.summary().values()) == {0.0}
+    assert empty.rows() == []
+    one = _hist([12.5])
+    assert one.summary()['p99_ms'] == 12.5
+    assert one.stddev == one.jitter == 0.0
+
+
+def test_rows_keep_counts():
+    h = _hist(_samples(1000, seed=5))
+    rows = h.rows(8)
+    assert len(rows) == 8
+    assert sum(c for _, _, c in rows) == 1000
+    assert rows[0][0] <= h.min and rows[-1][1] >= h.max
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from devutils.modules.imagehash import PHASHES, BKTree, find_similar_images, image_hash
+
+
+def test_bktree_matches_brute_force():
+    rng = random.Random(1)
+    base = [rng.getrandbits(64) for _ in range(40)]
+    # соседи базовых хешей на 1..8 бит и точные повторы
+    hashes = base + [h ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for h in base] + base[:5]
+    tree = BKTree()
+    for i, h in enumerate(hashes):
+        tree.add(h, i)
+    assert tree.size == len(hashes)
+    for q in base[:10] + [rng.getrandbits(64)]:
+        for radius in (0, 2, 6, 20):
+            expected = sorted(((h ^ q).bit_count(), i) for i, h in enumerate(hashes) if (h ^ q).bit_count() <= radius)
+            assert sorted(tree.search(q, radius)) == expected
+
+
+def test_bktree_empty():
+    assert BKTree().search(0, 64) == []
+
+
+def _picture(size, seed):
+    rng = random.Random(seed)
+    img = Image.new('RGB', (256, 192))
+    draw = ImageDraw.Draw(img)
+    for x in range(256):
+        draw.line([(x, 0), (x, 191)], fill=(x, 255 - x, 128))
+    for _ in range(6):
+        x, y = rng.randrange(200), rng.randrange(140)
+        draw.ellipse([x, y, x + 50, y + 50], fill=tuple(rng.randrange(256) for _ in range(3)))
+    return img.resize(size)
+
+
+@pytest.fixture
+def images(tmp_path):
+    _picture((1024, 768), 1).save(tmp_path / 'orig.png')
+    _picture((1024, 768), 1).resize((320, 240)).save(tmp_path / 'small.jpg', quality=70)
+    _picture((1024, 768), 1).save(tmp_path / 'sub_copy.jpg', quality=40)
+    _picture((1024, 768), 2).transpose(Image.Transpose.FLIP_TOP_BOTTOM).save(tmp_path / 'other.png')
+    (tmp_path / 'broken.jpg').write_bytes(b'not an image')
+    (tmp_path / 'notes.txt').write_text('text')
+    return tmp_path
+
+
+@pytest.mark.parametrize('method', PHASHES)
+def test_near_duplicates_grouped(images, method):
+    groups = list(find_similar_images(images, method=method))
+    assert len(groups) == 1
+    names = [p.name for p, _ in groups[0]]
+    # первым — самый крупный файл, обычно оригинал
+    assert names[0] == 'orig.png'
+    assert sorted(names) == ['orig.png', 'small.jpg', 'sub_copy.jpg']
+    sizes = [size for _, size in groups[0]]
+    assert sizes == sorted(sizes, reverse=True)
+
+
+def test_parallel_matches_serial(images):
+    assert list(find_similar_images(images, workers=2)) == list(find_similar_images(images))
+
+
+def test_unknown_method(images):
+    with pytest.raises(ValueError):
+        image_hash(str(images / 'orig.png'), 'whash')
+    with pytest.raises(ValueError):
+        list(find_similar_images(images, method='whash'))
@@ -0,0 +1,36 @@
+import os
+
+from devutils.modules.inventory import Inventory, bench_inventory
+
+
+def test_path_and_stamp_roundtrip():
+    inv = Inventory()
+    entries = [
+        ('/data/a', 'x.bin', 10, 1, 100, 1_700_000_000_123_456_789),
+        ('/data/a', 'имя с пробелом', 0, 1, 101, -5),
+        ('/data/b', 'x.bin', 10, 2, 2**40, 0),
+        ('/data/a', os.fsdecode(b'bad\xff'), 2**40, 2**63, 7, 1),
+    ]
+    for i, (d, name, size, dev, ino, mtime) in enumerate(entries):
+        assert inv.add(d, name, size, dev, ino, mtime) == i
+    assert len(inv) == 4
+    for i, (d, name, size, dev, ino, mtime) in enumerate(entries):
+        assert inv.path(i) == os.path.join(d, name)
+        assert inv.stamp(i) == (dev, ino, size, mtime)
+    # имя не в UTF-8 возвращается теми же байтами
+    assert os.fsencode(inv.path(3)).endswith(b'bad\xff')
+    # каталоги интернированы
+    assert inv._dirs == ['/data/a', '/data/b']
+
+
+def test_size_buckets():
+    inv = Inventory()
+    for i, size in enumerate((5, 7, 5, 9, 7, 5)):
+        inv.add('/d', f'f{i}', size)
+    assert [(size, list(idx)) for size, idx in inv.size_buckets()] == [(7, [1, 4]), (5, [0, 2, 5])]
+    assert [inv.sizes[i] for i in inv.order_by_size()] == [5, 5, 5, 7, 7, 9]
+
+
+def test_bench_inventory_smaller():
+    r = bench_inventory(files=20_000, per_dir=100)
+    assert r['inventory'] < r['path_list']
@@ -0,0 +1,51 @@
+import pytest
+
+from devutils.modules.loadgen import load_test, parse_duration, parse_rate, stub_server
+
+
+@pytest.fixture(scope='module')
+def stub():
+    with stub_server() as url:
+        yield url
+
+
+def test_parse():
+    assert parse_rate('500/s') == 500
+    assert parse_rate('30000/m') == 500
+    assert parse_rate('20') == 20
+    assert parse_duration('1500ms') == 1.5
+    assert parse_duration('5m') == 300
+    for bad in ('', '0', 'fast', '10/d'):
+        with pytest.raises(ValueError):
+            parse_rate(bad)
+    with pytest.raises(ValueError):
+        parse_duration('1y')
+
+
+@pytest.mark.parametrize('keepalive', [True, False])
+def test_load_against_stub(stub, keepalive):
+    r = load_test(stub, rate=100, duration=1.0, workers=8, keepalive=keepalive)
+    # открытый цикл: ровно rate * duration запросов, независимо от скорости ответов
+    assert r['sent'] == 100
+    assert r['received'] == 100
+    assert r['statuses'] == {'200': 100}
+    assert r['loss'] == 0
+    assert r['achieved_rps'] > 50
+    assert 0 < r['latency']['min_ms'] <= r['latency']['p50_ms'] <= r['latency']['max_ms']
+
+
+def test_latency_counts_queueing():
+    # один воркер и ответ за 50 мс при 40 запросах/с: очередь растёт, и задержка
+    # от назначенного времени больше времени обслуживания
+    with stub_server(delay=0.05) as url:
+        r = load_test(url, rate=40, duration=1.0, workers=1)
+    assert r['sent'] == 40
+    assert r['backlog_max'] > 1
+    assert r['latency']['max_ms'] > r['service']['max_ms']
+
+
+def test_load_errors_are_counted():
+    r = load_test('http://127.0.0.1:9/', rate=20, duration=0.5, workers=4, timeout=0.5)
+    assert r['sent'] == 10
+    assert r['received'] == 0
+    assert r['statuses'] == {'error': 10}
@@ -0,0 +1,108 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from devutils.modules.metrics import BUCKETS, OPENMETRICS, PREFIX, PROMETHEUS, PingMetrics, parse_listen, serve_metrics
+
+
+def _samples(text):
+    """Строки значений экспозиции: {имя{метки}: значение}."""
+    out = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        key, value = line.rsplit(' ', 1)
+        out[key] = float(value)
+    return out
+
+
+@pytest.fixture
+def metrics():
+    m = PingMetrics()
+    for ms, status in ((3, 200), (40, 200), (40, 301), (700, 503), (12_000, 0)):
+        m.observe('http://a/', ms, status)
+    m.observe('http://b/"x"\\\n', 1, 200)
+    return m
+
+
+def test_histogram_cumulative(metrics):
+    s = _samples(metrics.render())
+    t = 'target="http://a/"'
+    counts = [s[f'{PREFIX}_duration_seconds_bucket{{{t},le="{le}"}}'] for le in BUCKETS]
+    assert counts == sorted(counts)
+    assert s[f'{PREFIX}_duration_seconds_bucket{{{t},le="0.005"}}'] == 1
+    assert s[f'{PREFIX}_duration_seconds_bucket{{{t},le="0.05"}}'] == 3
+    assert s[f'{PREFIX}_duration_seconds_bucket{{{t},le="10.0"}}'] == 4
+    assert s[f'{PREFIX}_duration_seconds_bucket{{{t},le="+Inf"}}'] == 5
+    assert s[f'{PREFIX}_duration_seconds_count{{{t}}}'] == 5
+    assert s[f'{PREFIX}_duration_seconds_sum{{{t}}}'] == pytest.approx(12.783)
+
+
+def test_counters_and_codes(metrics):
+    s = _samples(metrics.render())
+    t = 'target="http://a/"'
+    assert s[f'{PREFIX}_probes_total{{{t}}}'] == 5
+    assert s[f'{PREFIX}_success_total{{{t}}}'] == 3
+    assert s[f'{PREFIX}_responses_total{{{t},code="200"}}'] == 2
+    assert s[f'{PREFIX}_responses_total{{{t},code="error"}}'] == 1
+    # последний замер — таймаут
+    assert s[f'{PREFIX}_up{{{t}}}'] == 0
+
+
+def test_label_escaping(metrics):
+    text = metrics.render()
+    assert f'{PREFIX}_up{{target="http://b/\\"x\\"\\\\\\n"}} 1' in text.splitlines()
+
+
+def test_type_lines():
+    m = PingMetrics()
+    m.observe('http://a/', 1, 200)
+    prom, om = m.render(), m.render(openmetrics=True)
+    assert f'# TYPE {PREFIX}_probes_total counter' in prom
+    assert f'# TYPE {PREFIX}_duration_seconds histogram' in prom
+    assert not prom.rstrip().endswith('# EOF')
+    # в OpenMetrics у counter в TYPE имя без _total, в конце — # EOF
+    assert f'# TYPE {PREFIX}_probes counter' in om
+    assert om.endswith('# EOF\n')
+    assert _samples(prom) == _samples(om)
+
+
+def test_empty_registry():
+    text = PingMetrics().render()
+    assert _samples(text) == {}
+    assert text.endswith('\n')
+
+
+@pytest.mark.parametrize('text, expected', [
+    (':9100', ('0.0.0.0', 9100)),
+    ('127.0.0.1:8080', ('127.0.0.1', 8080)),
+    ('[::1]:9100', ('::1', 9100)),
+])
+def test_parse_listen(text, expected):
+    assert parse_listen(text) == expected
+
+
+@pytest.mark.parametrize('text', ['9100', 'host:', 'host:abc', ':0', ':70000'])
+def test_parse_listen_invalid(text):
+    with pytest.raises(ValueError):
+        parse_listen(text)
+
+
+def test_serve_metrics(metrics):
+    server = serve_metrics(metrics, '127.0.0.1', 0)
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        with urllib.request.urlopen(f'{base}/metrics') as r:
+            assert r.headers['Content-Type'] == PROMETHEUS
+            assert r.read().decode() == metrics.render()
+        req = urllib.request.Request(f'{base}/metrics', headers={'Accept': 'application/openmetrics-text'})
+        with urllib.request.urlopen(req) as r:
+            assert r.headers['Content-Type'] == OPENMETRICS
+            assert r.read().decode().endswith('# EOF\n')
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(f'{base}/other')
+        assert e.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
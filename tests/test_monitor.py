@@ -0,0 +1,99 @@
+import pytest
+
+from devutils.modules.loadgen import stub_server
+from devutils.modules.monitor import LOG_MAGIC, MonitorLog, RingBuffer, monitor, replay_log, replay_stats
+
+# ms хранится как float32: значения, точные в нём
+SAMPLES = [
+    ('http://a/', 100.0, 12.5, 200),
+    ('http://b/', 100.5, 250.25, 503),
+    ('http://a/', 101.0, 13.0, 0),
+    ('http://a/', 102.0, 11.75, 200),
+]
+
+
+def _write(path, samples):
+    with MonitorLog(path) as log:
+        for s in samples:
+            log.write(*s)
+
+
+def _flat(path, since=0.0):
+    return [(url, *sample) for url, sample in replay_log(path, since)]
+
+
+def test_ring_buffer():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+    r = RingBuffer(3)
+    assert r.last() is None and list(r) == []
+    for i in range(5):
+        r.append(float(i), i * 2.0, 200)
+    assert len(r) == 3
+    assert list(r) == [(2.0, 4.0, 200), (3.0, 6.0, 200), (4.0, 8.0, 200)]
+    assert r.last() == (4.0, 8.0, 200)
+    assert r.since(3.0) == [(3.0, 6.0, 200), (4.0, 8.0, 200)]
+
+
+def test_log_roundtrip(tmp_path):
+    path = tmp_path / 'mon.log'
+    _write(path, SAMPLES)
+    assert _flat(path) == SAMPLES
+    assert _flat(path, since=101.0) == SAMPLES[2:]
+    # объявление цели — один раз, дальше 17 байт на замер
+    assert path.stat().st_size == len(LOG_MAGIC) + 2 * 5 + len('http://a/') + len('http://b/') + 4 * 17
+
+
+@pytest.mark.parametrize('cut', range(1, 17))
+def test_truncated_tail_recovered(tmp_path, cut):
+    path = tmp_path / 'mon.log'
+    _write(path, SAMPLES)
+    size = path.stat().st_size
+    with open(path, 'r+b') as f:
+        f.truncate(size - cut)
+    # оборванная последняя запись при чтении отбрасывается
+    assert _flat(path) == SAMPLES[:-1]
+    # при открытии на дозапись хвост отрезается, id целей восстанавливаются
+    _write(path, [('http://b/', 103.0, 9.5, 200), ('http://c/', 104.0, 1.0, 200)])
+    assert _flat(path) == SAMPLES[:-1] + [('http://b/', 103.0, 9.5, 200), ('http://c/', 104.0, 1.0, 200)]
+
+
+def test_truncated_target_record(tmp_path):
+    path = tmp_path / 'mon.log'
+    _write(path, SAMPLES[:1])
+    with open(path, 'ab') as f:
+        f.write(b'T\x01\x00\x20\x00http://half')
+    assert _flat(path) == SAMPLES[:1]
+    _write(path, SAMPLES[1:2])
+    assert _flat(path) == SAMPLES[:2]
+
+
+def test_not_a_log(tmp_path):
+    path = tmp_path / 'junk'
+    path.write_bytes(b'hello world')
+    with pytest.raises(ValueError):
+        list(replay_log(path))
+    with pytest.raises(ValueError):
+        MonitorLog(path)
+
+
+def test_replay_stats(tmp_path):
+    path = tmp_path / 'mon.log'
+    _write(path, SAMPLES)
+    stats = replay_stats(path)
+    assert (stats['http://a/']['sent'], stats['http://a/']['received']) == (3, 2)
+    assert stats['http://a/']['max_ms'] == 13.0
+    assert (stats['http://b/']['sent'], stats['http://b/']['received']) == (1, 0)
+    assert replay_stats(path, since=101.5)['http://a/']['sent'] == 1
+
+
+def test_monitor_writes_log(tmp_path):
+    path = tmp_path / 'mon.log'
+    with stub_server() as url:
+        targets = monitor([url], interval=0.1, window=10, log_path=path, duration=1.0)
+    target = targets[url]
+    assert target.sent >= 5 and target.received == target.sent
+    assert len(target.history) == target.sent
+    stats = replay_stats(path)[url]
+    assert stats['sent'] == target.sent and stats['loss'] == 0
+    assert target.stats(10)['total_sent'] == target.sent
@@ -0,0 +1,70 @@
+import gzip
+
+import pytest
+
+from devutils.modules.hashcache import HashCache
+from devutils.modules.shards import export_shard, iter_shard, merge_shards, shard_header
+
+
+@pytest.fixture
+def hosts(tmp_path):
+    a, b = tmp_path / 'a', tmp_path / 'b'
+    for root, files in (
+        (a, {'x': b'shared between hosts', 'y': b'same content, other name', 'only_a': b'a only',
+             'name with\ttab and space': b'odd name'}),
+        (b, {'x': b'shared between hosts', 'sub/z': b'same content, other name', 'c1': b'twice on b',
+             'c2': b'twice on b', 'odd': b'odd name'}),
+    ):
+        for name, data in files.items():
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_bytes(data)
+    return a, b
+
+
+def _export(root, out, host, **kwargs):
+    export_shard(root, out, host=host, **kwargs)
+    return out
+
+
+def _groups(groups, tmp_path):
+    return sorted(sorted((host, str(p).replace(str(tmp_path), '')) for host, p, _ in g) for g in groups)
+
+
+def test_export_and_merge(hosts, tmp_path):
+    a, b = hosts
+    shards = [_export(a, tmp_path / 'a.shard', 'host-a'), _export(b, tmp_path / 'b.shard', 'host-b')]
+    assert shard_header(shards[0])['host'] == 'host-a'
+    assert shard_header(shards[0])['algo'] == 'md5'
+    assert _groups(merge_shards(shards), tmp_path) == [
+        [('host-a', '/a/name with\ttab and space'), ('host-b', '/b/odd')],
+        [('host-a', '/a/x'), ('host-b', '/b/x')],
+        [('host-a', '/a/y'), ('host-b', '/b/sub/z')],
+        [('host-b', '/b/c1'), ('host-b', '/b/c2')],
+    ]
+
+
+def test_shard_sorted_and_stable(hosts, tmp_path):
+    a, _ = hosts
+    serial = list(iter_shard(_export(a, tmp_path / '1.shard', 'h')))
+    assert serial == sorted(serial)
+    assert len(serial) == 4
+    # параллельное хеширование и кеш дают тот же шард
+    assert list(iter_shard(_export(a, tmp_path / '2.shard', 'h', workers=3))) == serial
+    with HashCache(tmp_path / 'cache.db') as cache:
+        for name in ('3.shard', '4.shard'):
+            assert list(iter_shard(_export(a, tmp_path / name, 'h', cache=cache))) == serial
+
+
+def test_merge_rejects_mixed_algos(hosts, tmp_path):
+    a, b = hosts
+    shards = [_export(a, tmp_path / 'a.shard', 'h', algo='md5'), _export(b, tmp_path / 'b.shard', 'h', algo='sha1')]
+    with pytest.raises(ValueError):
+        list(merge_shards(shards))
+
+
+def test_not_a_shard(tmp_path):
+    path = tmp_path / 'junk.gz'
+    with gzip.open(path, 'wt') as f:
+        f.write('hello\n')
+    with pytest.raises(ValueError):
+        shard_header(path)